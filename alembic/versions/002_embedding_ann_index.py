@@ -0,0 +1,45 @@
+"""Add half-precision companion column and ANN index for embeddings.
+
+Revision ID: 002
+Revises: 001
+Create Date: 2025-02-03
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from pgvector.sqlalchemy import HALFVEC
+
+# revision identifiers
+revision = "002"
+down_revision = "001"
+branch_labels = None
+depends_on = None
+
+INDEX_DIMENSION = 2048
+
+
+def upgrade() -> None:
+    """Add the indexable embedding column, backfill it and build the HNSW index."""
+    op.add_column("embeddings", sa.Column("embedding_index", HALFVEC(INDEX_DIMENSION)))
+
+    op.execute(
+        f"UPDATE embeddings "
+        f"SET embedding_index = subvector(embedding, 1, {INDEX_DIMENSION})::halfvec({INDEX_DIMENSION}) "
+        f"WHERE embedding_index IS NULL"
+    )
+
+    op.create_index(
+        "ix_embeddings_embedding_index_ann",
+        "embeddings",
+        ["embedding_index"],
+        postgresql_using="hnsw",
+        postgresql_with={"m": 16, "ef_construction": 64},
+        postgresql_ops={"embedding_index": "halfvec_cosine_ops"},
+    )
+
+
+def downgrade() -> None:
+    """Drop the ANN index and the companion column."""
+    op.drop_index("ix_embeddings_embedding_index_ann", table_name="embeddings")
+    op.drop_column("embeddings", "embedding_index")
@@ -0,0 +1,34 @@
+"""Add content-addressed embedding cache table.
+
+Revision ID: 003
+Revises: 002
+Create Date: 2025-02-10
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from pgvector.sqlalchemy import Vector
+
+# revision identifiers
+revision = "003"
+down_revision = "002"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Create the embedding cache table."""
+    op.create_table(
+        "embedding_cache",
+        sa.Column("model", sa.String(255), nullable=False),
+        sa.Column("content_hash", sa.String(64), nullable=False),
+        sa.Column("embedding", Vector(8192), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.text("CURRENT_TIMESTAMP")),
+        sa.PrimaryKeyConstraint("model", "content_hash"),
+    )
+
+
+def downgrade() -> None:
+    """Drop the embedding cache table."""
+    op.drop_table("embedding_cache")
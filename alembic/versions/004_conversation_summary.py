@@ -0,0 +1,31 @@
+"""Add rolling summary columns to conversations.
+
+Revision ID: 004
+Revises: 003
+Create Date: 2025-02-17
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers
+revision = "004"
+down_revision = "003"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Add the summary text and the number of messages it covers."""
+    op.add_column("conversations", sa.Column("summary", sa.Text()))
+    op.add_column(
+        "conversations",
+        sa.Column("summary_message_count", sa.Integer(), nullable=False, server_default="0"),
+    )
+
+
+def downgrade() -> None:
+    """Drop the summary columns."""
+    op.drop_column("conversations", "summary_message_count")
+    op.drop_column("conversations", "summary")
@@ -0,0 +1,44 @@
+"""Add full-text search vector and GIN index for embeddings.
+
+Revision ID: 005
+Revises: 004
+Create Date: 2025-02-24
+
+"""
+
+from alembic import op
+
+# revision identifiers
+revision = "005"
+down_revision = "004"
+branch_labels = None
+depends_on = None
+
+# Must match EMBEDDING_TEXT_SEARCH_CONFIGS, which hybrid search queries with.
+# Numbers, such as article numbers, are indexed verbatim by every configuration.
+CONTENT_TSV_EXPRESSION = (
+    "to_tsvector('arabic', content) || "
+    "to_tsvector('french', content) || "
+    "to_tsvector('english', content)"
+)
+
+
+def upgrade() -> None:
+    """Add the generated tsvector column and index it."""
+    op.execute(
+        f"ALTER TABLE embeddings ADD COLUMN content_tsv tsvector "
+        f"GENERATED ALWAYS AS ({CONTENT_TSV_EXPRESSION}) STORED"
+    )
+
+    op.create_index(
+        "ix_embeddings_content_tsv",
+        "embeddings",
+        ["content_tsv"],
+        postgresql_using="gin",
+    )
+
+
+def downgrade() -> None:
+    """Drop the full-text index and column."""
+    op.drop_index("ix_embeddings_content_tsv", table_name="embeddings")
+    op.drop_column("embeddings", "content_tsv")
@@ -1,60 +1,151 @@
-"""FastAPI dependencies for authentication and authorization."""
+"""FastAPI dependencies for authentication, authorization and shared clients."""
 
+import hashlib
+import hmac
 import logging
-
-from fastapi import Depends, Request
-from fastapi.security import HTTPBasic, HTTPBasicCredentials
-from sqlalchemy.orm import Session
-
-from app.database import get_db
+import secrets
+from collections.abc import Mapping
+from typing import Any
+from uuid import UUID
+
+from fastapi import Depends, HTTPException, Request, status
+from fastapi.security import (
+    HTTPAuthorizationCredentials,
+    HTTPBasic,
+    HTTPBasicCredentials,
+    HTTPBearer,
+)
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.cache import TTLCache
+from app.config import get_settings
+from app.database import get_async_db
 from app.exceptions import AuthenticationException, AuthorizationException
 from app.models import UserRole
-from app.repositories import UserRepository
-from app.security import decode_access_token
+from app.repositories import AsyncUserRepository
+from app.security import averify_password, decode_access_token
+from app.services import OpenRouterClients, OpenRouterService, get_openrouter_clients
 
 logger = logging.getLogger(__name__)
-
-security = HTTPBasic()
-
-
-def get_current_user(
-    request: Request,
-    credentials: HTTPBasicCredentials = Depends(security),
-    db: Session = Depends(get_db),
+settings = get_settings()
+
+security = HTTPBasic(auto_error=False)
+bearer_security = HTTPBearer(auto_error=False)
+
+token_user_cache = TTLCache(
+    "token_user",
+    maxsize=settings.jwt_user_cache_size,
+    ttl_seconds=settings.jwt_user_cache_ttl_seconds,
+)
+verified_credential_cache = TTLCache(
+    "basic_auth_credentials",
+    maxsize=settings.basic_auth_cache_size,
+    ttl_seconds=settings.basic_auth_cache_ttl_seconds,
+)
+_credential_cache_key = secrets.token_bytes(32)
+
+
+async def get_current_user(
+    bearer: HTTPAuthorizationCredentials | None = Depends(bearer_security),
+    credentials: HTTPBasicCredentials | None = Depends(security),
+    db: AsyncSession = Depends(get_async_db),
 ) -> dict:
-    """Get current authenticated user from Basic Auth or JWT."""
-    user = _authenticate_user(credentials, db)
-
-    auth_header = request.headers.get("Authorization")
-    if auth_header and auth_header.startswith("Bearer "):
-        token = auth_header[7:]
+    """Get current authenticated user from a JWT bearer token or Basic Auth.
+
+    A valid bearer token authenticates the request on its own; Basic Auth is
+    kept as a fallback. The user is read on every Basic Auth call, but bcrypt
+    only runs on a cache miss: a verified credential pair is remembered, keyed
+    by an HMAC that includes the stored hash, for ``basic_auth_cache_ttl_seconds``,
+    so changing the password invalidates it at once.
+    """
+    if bearer is not None:
+        return await _authenticate_token(bearer.credentials, db)
+
+    if credentials is not None:
+        return await _authenticate_user(credentials, db)
+
+    raise HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Not authenticated",
+        headers={"WWW-Authenticate": "Basic, Bearer"},
+    )
+
+
+async def _authenticate_token(token: str, db: AsyncSession) -> dict[str, Any]:
+    """Authenticate user from the claims of a JWT access token.
+
+    When ``jwt_verify_user`` is enabled the user is re-read from the database,
+    at most once per ``jwt_user_cache_ttl_seconds``, so that deleted users and
+    role changes take effect before the token expires.
+    """
+    try:
+        claims = decode_access_token(token)
+    except ValueError as e:
+        raise AuthenticationException(str(e)) from e
+
+    user_id = claims.get("sub")
+    if not user_id or "email" not in claims or "role" not in claims:
+        raise AuthenticationException("Invalid token")
+
+    if not settings.jwt_verify_user:
+        return {"id": user_id, "email": claims["email"], "role": claims["role"]}
+
+    user = token_user_cache.get(user_id)
+    if user is None:
         try:
-            token_data = decode_access_token(token)
-            if token_data.get("sub") != str(user["id"]):
-                raise AuthorizationException("Token does not match user")
-        except ValueError:
-            pass
+            user_uuid = UUID(str(user_id))
+        except ValueError as e:
+            raise AuthenticationException("Invalid token") from e
+        row = await AsyncUserRepository(db).find_by_id(user_uuid)
+        if row is None:
+            raise AuthenticationException("User no longer exists")
+
+        user = _to_principal(row)
+        token_user_cache.set(user_id, user)
 
     return user
 
 
-def _authenticate_user(
+async def _authenticate_user(
     credentials: HTTPBasicCredentials,
-    db: Session,
-) -> dict:
+    db: AsyncSession,
+) -> dict[str, Any]:
     """Authenticate user with Basic Auth credentials."""
-    user_repository = UserRepository(db)
-    user = user_repository.find_by_email(credentials.username)
+    user_repository = AsyncUserRepository(db)
+    user = await user_repository.find_by_email(credentials.username)
 
     if user is None:
         raise AuthenticationException("Invalid email or password")
 
-    from app.security import verify_password
+    cache_key = _credential_fingerprint(
+        credentials.username, credentials.password, user["password_hash"]
+    )
+    if verified_credential_cache.get(cache_key) is None:
+        if not await averify_password(credentials.password, user["password_hash"]):
+            raise AuthenticationException("Invalid email or password")
+        verified_credential_cache.set(cache_key, True)
 
-    if not verify_password(credentials.password, user["password_hash"]):
-        raise AuthenticationException("Invalid email or password")
+    return _to_principal(user)
 
-    return user
+
+def _credential_fingerprint(email: str, password: str, password_hash: str) -> str:
+    """HMAC of a credential pair and the stored hash it was verified against.
+
+    The key is random per process, so fingerprints cannot be brute-forced
+    offline. Including the hash makes entries stale as soon as it changes.
+    """
+    message = "\x00".join((email, password, password_hash)).encode("utf-8")
+    return hmac.new(_credential_cache_key, message, hashlib.sha256).hexdigest()
+
+
+def _to_principal(user: Mapping[Any, Any]) -> dict[str, Any]:
+    """Reduce a user row to the fields carried by access tokens."""
+    role = user["role"]
+    return {
+        "id": str(user["id"]),
+        "email": user["email"],
+        "role": role.value if isinstance(role, UserRole) else role,
+    }
 
 
 def require_role(required_role: UserRole):
@@ -81,3 +172,9 @@ def require_role(required_role: UserRole):
 def get_current_admin(user: dict = Depends(require_role(UserRole.ADMIN))) -> dict:
     """Require admin role."""
     return user
+
+
+def get_openrouter_service(request: Request) -> OpenRouterService:
+    """Get an OpenRouter service backed by the application-wide clients."""
+    clients: OpenRouterClients | None = getattr(request.app.state, "openrouter_clients", None)
+    return OpenRouterService(clients or get_openrouter_clients())
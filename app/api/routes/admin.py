@@ -1,15 +1,16 @@
 """Admin API routes."""
 
 import logging
+from typing import Any
+from uuid import UUID
 
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
 
 from app.api.deps import get_current_admin
+from app.api.schemas import TrainingJobResponse
+from app.cache import get_cache_stats
 from app.config import get_settings
-from app.database import get_db
-from app.repositories import TrainedDocumentRepository
-from app.services import EmbeddingService, PdfService
+from app.services import TrainingJobManager, get_training_job_manager
 
 logger = logging.getLogger(__name__)
 
@@ -18,18 +19,19 @@ router = APIRouter(prefix="/admin", tags=["admin"])
 settings = get_settings()
 
 
-@router.post("/train", responses={200: {"description": "Training started"}})
+@router.post(
+    "/train",
+    response_model=TrainingJobResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+    responses={202: {"description": "Training job queued"}},
+)
 def train_documents(
     user: dict = Depends(get_current_admin),
-    db: Session = Depends(get_db),
-) -> dict:
-    """Train embeddings on PDFs in the resources folder."""
+    job_manager: TrainingJobManager = Depends(get_training_job_manager),
+) -> TrainingJobResponse:
+    """Queue a job that trains embeddings on PDFs in the resources folder."""
     logger.info(f"Admin {user['id']} starting document training")
 
-    pdf_service = PdfService()
-    embedding_service = EmbeddingService(db)
-    document_repository = TrainedDocumentRepository(db)
-
     pdf_folder = settings.resources_path / "pdfs"
     if not pdf_folder.exists():
         raise HTTPException(
@@ -37,48 +39,56 @@ def train_documents(
             detail="PDFs folder not found",
         )
 
-    pdf_files = list(pdf_folder.glob("*.pdf"))
+    pdf_files = sorted(pdf_folder.glob("*.pdf"))
     if not pdf_files:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="No PDF files found in resources folder",
         )
 
-    trained_count = 0
-    skipped_count = 0
+    job = job_manager.submit(pdf_files)
+    return TrainingJobResponse(**job.to_dict())
+
 
-    for pdf_file in pdf_files:
-        logger.info(f"Processing: {pdf_file.name}")
+@router.get("/train/{job_id}", response_model=TrainingJobResponse)
+def get_training_job(
+    job_id: UUID,
+    user: dict[str, Any] = Depends(get_current_admin),  # noqa: ARG001
+    job_manager: TrainingJobManager = Depends(get_training_job_manager),
+) -> TrainingJobResponse:
+    """Get the progress of a training job."""
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Training job not found",
+        )
 
-        file_content = pdf_file.read_bytes()
-        checksum = pdf_service.calculate_checksum(file_content)
+    return TrainingJobResponse(**job.to_dict())
 
-        existing_doc = document_repository.find_by_checksum(checksum)
-        if existing_doc:
-            logger.info(f"Skipping {pdf_file.name} - already trained")
-            skipped_count += 1
-            continue
 
-        text = pdf_service.extract_text(file_content, pdf_file.name)
-        chunks = pdf_service.chunk_text(text, pdf_file.name)
+@router.post("/train/{job_id}/cancel", response_model=TrainingJobResponse)
+def cancel_training_job(
+    job_id: UUID,
+    user: dict[str, Any] = Depends(get_current_admin),
+    job_manager: TrainingJobManager = Depends(get_training_job_manager),
+) -> TrainingJobResponse:
+    """Cancel a training job."""
+    logger.info(f"Admin {user['id']} cancelling training job {job_id}")
 
-        document = document_repository.create(
-            filename=pdf_file.name,
-            checksum=checksum,
-            chunk_count=0,
+    job = job_manager.cancel(job_id)
+    if job is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Training job not found",
         )
 
-        embedding_service.store_embeddings(
-            trained_document_id=document["id"],
-            chunks=chunks,
-        )
+    return TrainingJobResponse(**job.to_dict())
 
-        trained_count += 1
-        logger.info(f"Trained {pdf_file.name}: {len(chunks)} chunks")
 
-    return {
-        "message": "Training complete",
-        "trained": trained_count,
-        "skipped": skipped_count,
-        "total": len(pdf_files),
-    }
+@router.get("/cache/stats")
+def cache_stats(
+    user: dict[str, Any] = Depends(get_current_admin),  # noqa: ARG001
+) -> dict[str, dict[str, Any]]:
+    """Get cache hit/miss statistics and counters such as prompt token usage."""
+    return get_cache_stats()
@@ -47,6 +47,7 @@ def signup(request: SignupRequest, db: Session = Depends(get_db)) -> AuthRespons
         user_id=str(user["id"]),
         email=user["email"],
         role=role_value,
+        access_token=auth_service.generate_token(user),
     )
 
 
@@ -79,6 +80,7 @@ def login(request: LoginRequest, db: Session = Depends(get_db)) -> AuthResponse:
         user_id=str(user["id"]),
         email=user["email"],
         role=role_value,
+        access_token=auth_service.generate_token(user),
     )
 
 
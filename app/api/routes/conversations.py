@@ -2,12 +2,15 @@
 
 import json
 import logging
+from collections.abc import AsyncIterator
+from typing import Any
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
-from app.api.deps import get_current_user
+from app.api.deps import get_current_user, get_openrouter_service
 from app.api.schemas import (
     AskQuestionRequest,
     AskQuestionResponse,
@@ -16,10 +19,10 @@ from app.api.schemas import (
     ConversationResponse,
     MessageResponse,
 )
-from app.database import get_db
+from app.database import AsyncUnitOfWork, get_async_db, get_async_session_factory
 from app.models import MessageRole
-from app.repositories import ConversationRepository, MessageRepository
-from app.services import RAGService
+from app.repositories import AsyncConversationRepository, AsyncMessageRepository
+from app.services import OpenRouterService, RAGService, compact_conversation
 
 logger = logging.getLogger(__name__)
 
@@ -27,19 +30,20 @@ router = APIRouter(prefix="/conversations", tags=["conversations"])
 
 
 @router.post("", response_model=ConversationResponse, status_code=status.HTTP_201_CREATED)
-def create_conversation(
+async def create_conversation(
     request: ConversationCreateRequest,
     user: dict = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ) -> ConversationResponse:
     """Create a new conversation."""
     logger.info(f"Creating conversation for user: {user['id']}")
 
-    conversation_repository = ConversationRepository(db)
-    conversation = conversation_repository.create(
-        user_id=UUID(user["id"]),
-        title=request.title,
-    )
+    conversation_repository = AsyncConversationRepository(db)
+    async with AsyncUnitOfWork(db):
+        conversation = await conversation_repository.create(
+            user_id=UUID(user["id"]),
+            title=request.title,
+        )
 
     return ConversationResponse(
         id=conversation["id"],
@@ -51,15 +55,15 @@ def create_conversation(
 
 
 @router.get("", response_model=list[ConversationResponse])
-def list_conversations(
+async def list_conversations(
     user: dict = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ) -> list[ConversationResponse]:
     """List all conversations for the current user."""
     logger.info(f"Listing conversations for user: {user['id']}")
 
-    conversation_repository = ConversationRepository(db)
-    conversations = conversation_repository.find_by_user(UUID(user["id"]))
+    conversation_repository = AsyncConversationRepository(db)
+    conversations = await conversation_repository.find_by_user(UUID(user["id"]))
 
     return [
         ConversationResponse(
@@ -74,25 +78,25 @@ def list_conversations(
 
 
 @router.get("/{conversation_id}", response_model=ConversationDetailResponse)
-def get_conversation(
+async def get_conversation(
     conversation_id: UUID,
     user: dict = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ) -> ConversationDetailResponse:
     """Get a conversation with all messages."""
     logger.info(f"Getting conversation {conversation_id} for user: {user['id']}")
 
-    conversation_repository = ConversationRepository(db)
-    message_repository = MessageRepository(db)
+    conversation_repository = AsyncConversationRepository(db)
+    message_repository = AsyncMessageRepository(db)
 
-    conversation = conversation_repository.find_by_id(conversation_id, UUID(user["id"]))
+    conversation = await conversation_repository.find_by_id(conversation_id, UUID(user["id"]))
     if conversation is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Conversation not found",
         )
 
-    messages = message_repository.find_by_conversation(conversation_id)
+    messages = await message_repository.find_by_conversation(conversation_id)
 
     return ConversationDetailResponse(
         id=conversation["id"],
@@ -115,16 +119,17 @@ def get_conversation(
 
 
 @router.delete("/{conversation_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_conversation(
+async def delete_conversation(
     conversation_id: UUID,
     user: dict = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ) -> None:
     """Delete a conversation."""
     logger.info(f"Deleting conversation {conversation_id} for user: {user['id']}")
 
-    conversation_repository = ConversationRepository(db)
-    deleted = conversation_repository.delete(conversation_id, UUID(user["id"]))
+    conversation_repository = AsyncConversationRepository(db)
+    async with AsyncUnitOfWork(db):
+        deleted = await conversation_repository.delete(conversation_id, UUID(user["id"]))
 
     if not deleted:
         raise HTTPException(
@@ -134,20 +139,31 @@ def delete_conversation(
 
 
 @router.post("/{conversation_id}/message", response_model=AskQuestionResponse)
-def ask_question(
+async def ask_question(
     conversation_id: UUID,
     request: AskQuestionRequest,
+    background_tasks: BackgroundTasks,
     user: dict = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
+    session_factory: async_sessionmaker[AsyncSession] = Depends(get_async_session_factory),
+    openrouter_service: OpenRouterService = Depends(get_openrouter_service),
 ) -> AskQuestionResponse:
-    """Ask a question in a conversation."""
+    """Ask a question in a conversation, compacting its memory after the response."""
     logger.info(f"Question in conversation {conversation_id} from user: {user['id']}")
 
-    rag_service = RAGService(db)
-    answer, citations, actual_conversation_id = rag_service.ask_question(
+    rag_service = RAGService(db, openrouter_service)
+    answer, citations, actual_conversation_id = await rag_service.ask_question(
         question=request.question,
         user_id=UUID(user["id"]),
         conversation_id=conversation_id,
+        diversify=request.diversify,
+    )
+    background_tasks.add_task(
+        compact_conversation,
+        session_factory,
+        openrouter_service,
+        actual_conversation_id,
+        UUID(user["id"]),
     )
 
     return AskQuestionResponse(
@@ -155,3 +171,52 @@ def ask_question(
         answer=answer,
         citations=citations,
     )
+
+
+@router.post(
+    "/{conversation_id}/message/stream",
+    response_class=StreamingResponse,
+    responses={200: {"content": {"text/event-stream": {}}, "description": "Answer event stream"}},
+)
+async def ask_question_stream(
+    conversation_id: UUID,
+    request: AskQuestionRequest,
+    background_tasks: BackgroundTasks,
+    user: dict[str, Any] = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+    session_factory: async_sessionmaker[AsyncSession] = Depends(get_async_session_factory),
+    openrouter_service: OpenRouterService = Depends(get_openrouter_service),
+) -> StreamingResponse:
+    """Ask a question in a conversation, streaming the answer as server-sent events.
+
+    The conversation memory is compacted once the stream has ended.
+    """
+    logger.info(f"Streaming question in conversation {conversation_id} from user: {user['id']}")
+
+    rag_service = RAGService(db, openrouter_service)
+    events = await rag_service.stream_question(
+        question=request.question,
+        user_id=UUID(user["id"]),
+        conversation_id=conversation_id,
+        diversify=request.diversify,
+    )
+    background_tasks.add_task(
+        compact_conversation,
+        session_factory,
+        openrouter_service,
+        conversation_id,
+        UUID(user["id"]),
+    )
+
+    return StreamingResponse(
+        _format_sse(events),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+async def _format_sse(events: AsyncIterator[dict[str, Any]]) -> AsyncIterator[str]:
+    """Serialize RAG events in server-sent events format."""
+    async for event in events:
+        data = json.dumps(event["data"], ensure_ascii=False)
+        yield f"event: {event['event']}\ndata: {data}\n\n"
@@ -1,19 +1,22 @@
 """Embedding API routes."""
 
 import logging
+from typing import Any
 
 from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.api.deps import get_current_user
+from app.api.deps import get_current_user, get_openrouter_service
 from app.api.schemas import (
+    BatchSearchRequest,
+    BatchSearchResponse,
     EmbeddingRequest,
     EmbeddingResponse,
     SearchRequest,
     SearchResponse,
     SearchResult,
 )
-from app.database import get_db
+from app.database import get_async_db
 from app.services import EmbeddingService, OpenRouterService
 
 logger = logging.getLogger(__name__)
@@ -22,15 +25,18 @@ router = APIRouter(prefix="/embedding", tags=["embeddings"])
 
 
 @router.post("/generate", response_model=EmbeddingResponse)
-def generate_embedding(
+async def generate_embedding(
     request: EmbeddingRequest,
-    db: Session = Depends(get_db),  # noqa: ARG001
+    openrouter_service: OpenRouterService = Depends(get_openrouter_service),
 ) -> EmbeddingResponse:
-    """Generate embedding for text."""
+    """Generate embedding for text.
+
+    The vector comes straight from the provider: ad-hoc texts are not written
+    to the persistent embedding cache, which only training should grow.
+    """
     logger.info(f"Generating embedding for text ({len(request.text)} chars)")
 
-    openrouter_service = OpenRouterService()
-    embedding = openrouter_service.generate_embedding(request.text)
+    embedding = await openrouter_service.agenerate_embedding(request.text)
 
     return EmbeddingResponse(
         embedding=embedding,
@@ -39,21 +45,56 @@ def generate_embedding(
 
 
 @router.post("/search", response_model=SearchResponse)
-def search_similar(
+async def search_similar(
     request: SearchRequest,
-    user: dict = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    user: dict[str, Any] = Depends(get_current_user),  # noqa: ARG001
+    db: AsyncSession = Depends(get_async_db),
+    openrouter_service: OpenRouterService = Depends(get_openrouter_service),
 ) -> SearchResponse:
     """Search for similar embeddings."""
     logger.info(f"Searching for: {request.query[:100]}...")
 
-    embedding_service = EmbeddingService(db)
-    results = embedding_service.similarity_search(
+    embedding_service = EmbeddingService(db, openrouter_service)
+    results = await embedding_service.similarity_search(
         query=request.query,
         max_results=request.max_results,
         similarity_threshold=request.similarity_threshold,
+        search_mode=request.search_mode,
+        diversify=request.diversify,
+        mmr_lambda=request.mmr_lambda,
+    )
+
+    return _to_search_response(request.query, results)
+
+
+@router.post("/search/batch", response_model=BatchSearchResponse)
+async def search_similar_batch(
+    request: BatchSearchRequest,
+    user: dict[str, Any] = Depends(get_current_user),  # noqa: ARG001
+    db: AsyncSession = Depends(get_async_db),
+    openrouter_service: OpenRouterService = Depends(get_openrouter_service),
+) -> BatchSearchResponse:
+    """Search for similar embeddings for several queries in one request."""
+    logger.info(f"Batch search for {len(request.queries)} queries")
+
+    embedding_service = EmbeddingService(db, openrouter_service)
+    results = await embedding_service.batch_similarity_search(
+        queries=request.queries,
+        max_results=request.max_results,
+        similarity_threshold=request.similarity_threshold,
+        search_mode=request.search_mode,
     )
 
+    return BatchSearchResponse(
+        results=[
+            _to_search_response(query, query_results)
+            for query, query_results in zip(request.queries, results, strict=True)
+        ],
+    )
+
+
+def _to_search_response(query: str, results: list[dict[str, Any]]) -> SearchResponse:
+    """Build the response for the results of one query."""
     return SearchResponse(
         results=[
             SearchResult(
@@ -65,5 +106,5 @@ def search_similar(
             )
             for r in results
         ],
-        query=request.query,
+        query=query,
     )
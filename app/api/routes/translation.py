@@ -3,11 +3,10 @@
 import logging
 
 from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
 
+from app.api.deps import get_openrouter_service
 from app.api.schemas import TranslationRequest, TranslationResponse
-from app.database import get_db
-from app.services import TranslationService
+from app.services import OpenRouterService, TranslationService
 
 logger = logging.getLogger(__name__)
 
@@ -15,15 +14,15 @@ router = APIRouter(prefix="/translation", tags=["translation"])
 
 
 @router.post("", response_model=TranslationResponse)
-def translate(
+async def translate(
     request: TranslationRequest,
-    db: Session = Depends(get_db),  # noqa: ARG001
+    openrouter_service: OpenRouterService = Depends(get_openrouter_service),
 ) -> TranslationResponse:
     """Translate text between languages."""
     logger.info(f"Translation request: {request.source} -> {request.target}")
 
-    translation_service = TranslationService()
-    translated_text = translation_service.translate(
+    translation_service = TranslationService(openrouter_service)
+    translated_text = await translation_service.translate(
         text=request.text,
         source=request.source,
         target=request.target,
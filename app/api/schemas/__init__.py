@@ -1,5 +1,6 @@
 """API schemas package."""
 
+from app.api.schemas.admin import TrainingDocumentProgress, TrainingJobResponse
 from app.api.schemas.auth import AuthResponse, ErrorResponse, LoginRequest, SignupRequest
 from app.api.schemas.conversation import (
     AskQuestionRequest,
@@ -10,6 +11,8 @@ from app.api.schemas.conversation import (
     MessageResponse,
 )
 from app.api.schemas.embedding import (
+    BatchSearchRequest,
+    BatchSearchResponse,
     EmbeddingRequest,
     EmbeddingResponse,
     SearchRequest,
@@ -25,6 +28,8 @@ __all__ = [
     "SignupRequest",
     "EmbeddingRequest",
     "EmbeddingResponse",
+    "BatchSearchRequest",
+    "BatchSearchResponse",
     "SearchRequest",
     "SearchResponse",
     "SearchResult",
@@ -36,4 +41,6 @@ __all__ = [
     "AskQuestionResponse",
     "TranslationRequest",
     "TranslationResponse",
+    "TrainingDocumentProgress",
+    "TrainingJobResponse",
 ]
@@ -0,0 +1,37 @@
+"""Pydantic schemas for admin endpoints."""
+
+from datetime import datetime
+from uuid import UUID
+
+from pydantic import BaseModel
+
+
+class TrainingDocumentProgress(BaseModel):
+    """Training progress of a single document."""
+
+    filename: str
+    status: str
+    chunks: int
+    error: str | None = None
+    started_at: datetime | None = None
+    finished_at: datetime | None = None
+
+
+class TrainingJobResponse(BaseModel):
+    """Training job status response schema."""
+
+    job_id: UUID
+    status: str
+    created_at: datetime
+    started_at: datetime | None = None
+    finished_at: datetime | None = None
+    error: str | None = None
+    total_documents: int
+    processed_documents: int
+    trained: int
+    skipped: int
+    failed: int
+    chunks_embedded: int
+    elapsed_seconds: float | None = None
+    chunks_per_second: float | None = None
+    documents: list[TrainingDocumentProgress]
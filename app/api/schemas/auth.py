@@ -30,6 +30,8 @@ class AuthResponse(BaseModel):
     user_id: str
     email: str
     role: str
+    access_token: str | None = None
+    token_type: str = "bearer"
 
 
 class ErrorResponse(BaseModel):
@@ -49,6 +49,10 @@ class AskQuestionRequest(BaseModel):
 
     question: str = Field(..., min_length=1)
     conversation_id: UUID | None = None
+    diversify: bool | None = Field(
+        default=None,
+        description="Diversify the retrieved context (MMR); defaults to the configured setting",
+    )
 
 
 class AskQuestionResponse(BaseModel):
@@ -1,5 +1,6 @@
 """Pydantic schemas for embedding endpoints."""
 
+from typing import Annotated, Literal
 
 from pydantic import BaseModel, Field
 
@@ -33,6 +34,16 @@ class SearchRequest(BaseModel):
     query: str = Field(..., min_length=1)
     max_results: int = Field(default=5, ge=1, le=20)
     similarity_threshold: float = Field(default=0.7, ge=0.0, le=1.0)
+    search_mode: Literal["exact", "ann", "hybrid"] | None = Field(
+        default=None, description="Search strategy; defaults to the configured mode"
+    )
+    diversify: bool | None = Field(
+        default=None,
+        description="Re-rank results for diversity (MMR); defaults to the configured setting",
+    )
+    mmr_lambda: float | None = Field(
+        default=None, ge=0.0, le=1.0, description="MMR trade-off: 1 favours relevance, 0 diversity"
+    )
 
 
 class SearchResponse(BaseModel):
@@ -40,3 +51,20 @@ class SearchResponse(BaseModel):
 
     results: list[SearchResult]
     query: str
+
+
+class BatchSearchRequest(BaseModel):
+    """Batched similarity search request schema."""
+
+    queries: list[Annotated[str, Field(min_length=1)]] = Field(..., min_length=1, max_length=100)
+    max_results: int = Field(default=5, ge=1, le=20)
+    similarity_threshold: float = Field(default=0.7, ge=0.0, le=1.0)
+    search_mode: Literal["exact", "ann"] | None = Field(
+        default=None, description="Search strategy; defaults to the configured mode"
+    )
+
+
+class BatchSearchResponse(BaseModel):
+    """Batched similarity search response schema, one entry per query in request order."""
+
+    results: list[SearchResponse]
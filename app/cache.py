@@ -0,0 +1,294 @@
+"""Shared caching utilities, hit/miss statistics and operational counters."""
+
+import hashlib
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from collections.abc import Hashable
+from typing import Any, TypeVar
+
+import numpy as np
+
+_WHITESPACE_PATTERN = re.compile(r"\s+")
+
+
+def normalize_text(text: str) -> str:
+    """Normalize text for cache keys (Unicode NFKC, collapsed whitespace)."""
+    return _WHITESPACE_PATTERN.sub(" ", unicodedata.normalize("NFKC", text)).strip()
+
+
+def text_fingerprint(text: str) -> str:
+    """SHA-256 hex digest of the normalized text."""
+    return hashlib.sha256(normalize_text(text).encode("utf-8")).hexdigest()
+
+
+def vector_fingerprint(vector: list[float]) -> str:
+    """SHA-256 hex digest of a vector's float32 representation."""
+    return hashlib.sha256(np.asarray(vector, dtype=np.float32).tobytes()).hexdigest()
+
+
+class CacheStats:
+    """Thread-safe hit/miss counters for a cache."""
+
+    def __init__(self, name: str) -> None:
+        """Start counting the hits and misses of the cache ``name``."""
+        self.name = name
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def record_hits(self, count: int = 1) -> None:
+        """Record cache hits."""
+        with self._lock:
+            self.hits += count
+
+    def record_misses(self, count: int = 1) -> None:
+        """Record cache misses."""
+        with self._lock:
+            self.misses += count
+
+    @property
+    def hit_rate(self) -> float:
+        """Fraction of lookups served from the cache."""
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def snapshot(self) -> dict[str, Any]:
+        """Return the current counters."""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+            }
+
+
+class TTLCache:
+    """Thread-safe in-process LRU cache whose entries expire after a TTL.
+
+    A ``maxsize`` of 0 disables the cache.
+    """
+
+    def __init__(self, name: str, maxsize: int, ttl_seconds: float) -> None:
+        """Create an empty cache whose statistics are registered under ``name``."""
+        self.maxsize = maxsize
+        self.ttl_seconds = ttl_seconds
+        self.stats = register_cache_stats(name)
+        self._entries: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Any | None:
+        """Return the cached value, or None if it is missing or expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] <= time.monotonic():
+                del self._entries[key]
+                entry = None
+
+            if entry is None:
+                self.stats.record_misses()
+                return None
+
+            self._entries.move_to_end(key)
+            self.stats.record_hits()
+            return entry[1]
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """Store a value, evicting the least recently used entries if full."""
+        if self.maxsize <= 0:
+            return
+
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Remove all entries."""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        """Return the number of stored entries, including expired ones not yet evicted."""
+        with self._lock:
+            return len(self._entries)
+
+
+class SemanticCache:
+    """Thread-safe in-process cache keyed by embedding similarity.
+
+    A lookup returns the value of the most similar stored vector if its cosine
+    similarity reaches ``threshold``. Every entry is tagged with a version and
+    only entries of the requested version can match, so bumping the version
+    invalidates everything stored before. Entries expire after a TTL and the
+    least recently used one is evicted when full. Vectors are kept normalized
+    in one matrix, so a lookup is a single matrix-vector product. A ``maxsize``
+    of 0 disables the cache.
+    """
+
+    def __init__(self, name: str, maxsize: int, ttl_seconds: float, threshold: float) -> None:
+        """Create an empty cache of ``maxsize`` vectors with statistics under ``name``."""
+        self.maxsize = maxsize
+        self.ttl_seconds = ttl_seconds
+        self.threshold = threshold
+        self.stats = register_cache_stats(name)
+        self._vectors: np.ndarray | None = None
+        self._versions: list[Hashable | None] = [None] * maxsize
+        self._values: list[Any] = [None] * maxsize
+        self._expires = np.zeros(maxsize)
+        self._last_used = np.zeros(maxsize, dtype=np.int64)
+        self._clock = 0
+        self._lock = threading.Lock()
+
+    def get(self, vector: list[float], version: Hashable) -> Any | None:
+        """Return the value of the closest entry of this version, or None if none is close."""
+        query = _unit_vector(vector)
+        with self._lock:
+            valid = self._valid_slots(version)
+            if self._vectors is None or not valid.any() or self._vectors.shape[1] != len(query):
+                self.stats.record_misses()
+                return None
+
+            similarities = self._vectors @ query
+            similarities[~valid] = -np.inf
+            slot = int(np.argmax(similarities))
+            if similarities[slot] < self.threshold:
+                self.stats.record_misses()
+                return None
+
+            self._touch(slot)
+            self.stats.record_hits()
+            return self._values[slot]
+
+    def set(self, vector: list[float], version: Hashable, value: Any) -> None:
+        """Store a value, replacing an invalid entry or the least recently used one."""
+        if self.maxsize <= 0:
+            return
+
+        key = _unit_vector(vector)
+        with self._lock:
+            if self._vectors is None or self._vectors.shape[1] != len(key):
+                self._vectors = np.zeros((self.maxsize, len(key)), dtype=np.float32)
+                self._versions = [None] * self.maxsize
+
+            invalid = np.flatnonzero(~self._valid_slots(version))
+            slot = int(invalid[0]) if len(invalid) else int(np.argmin(self._last_used))
+
+            self._vectors[slot] = key
+            self._versions[slot] = version
+            self._values[slot] = value
+            self._expires[slot] = time.monotonic() + self.ttl_seconds
+            self._touch(slot)
+
+    def clear(self) -> None:
+        """Remove all entries."""
+        with self._lock:
+            self._versions = [None] * self.maxsize
+            self._values = [None] * self.maxsize
+
+    def __len__(self) -> int:
+        """Return the number of stored entries, including expired ones not yet replaced."""
+        with self._lock:
+            return sum(1 for version in self._versions if version is not None)
+
+    def _touch(self, slot: int) -> None:
+        """Mark an entry as the most recently used."""
+        self._clock += 1
+        self._last_used[slot] = self._clock
+
+    def _valid_slots(self, version: Hashable) -> np.ndarray:
+        """Mask of the unexpired entries of a version."""
+        same_version = np.fromiter(
+            (v is not None and v == version for v in self._versions), dtype=bool, count=self.maxsize
+        )
+        return same_version & (self._expires > time.monotonic())
+
+
+def _unit_vector(vector: list[float]) -> np.ndarray:
+    """Normalize a vector to unit length for cosine similarity."""
+    array = np.asarray(vector, dtype=np.float32)
+    return array / max(float(np.linalg.norm(array)), 1e-12)
+
+
+class VersionCounter:
+    """Thread-safe counter identifying the current generation of some data."""
+
+    def __init__(self) -> None:
+        """Start at version 0."""
+        self._value = 0
+        self._lock = threading.Lock()
+
+    @property
+    def value(self) -> int:
+        """The current version."""
+        with self._lock:
+            return self._value
+
+    def bump(self) -> int:
+        """Start a new version and return it."""
+        with self._lock:
+            self._value += 1
+            return self._value
+
+
+class Counters:
+    """Thread-safe named counters for a component that is not a cache."""
+
+    def __init__(self, name: str) -> None:
+        """Create an empty set of counters reported under ``name``."""
+        self.name = name
+        self._values: dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def increment(self, key: str, amount: float = 1) -> None:
+        """Add to a counter."""
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def get(self, key: str) -> float:
+        """Return the current value of a counter."""
+        with self._lock:
+            return self._values.get(key, 0)
+
+    def snapshot(self) -> dict[str, float]:
+        """Return the current counters."""
+        with self._lock:
+            return dict(self._values)
+
+
+_Component = TypeVar("_Component", CacheStats, Counters)
+
+_registry: dict[str, CacheStats | Counters] = {}
+_registry_lock = threading.Lock()
+
+
+def _register(name: str, kind: type[_Component]) -> _Component:
+    """Get or create the registered statistics of a named component."""
+    with _registry_lock:
+        component = _registry.get(name)
+        if component is None:
+            component = _registry[name] = kind(name)
+        if not isinstance(component, kind):
+            raise TypeError(f"{name} is already registered as {type(component).__name__}")
+        return component
+
+
+def register_cache_stats(name: str) -> CacheStats:
+    """Get or create the statistics object for a named cache."""
+    return _register(name, CacheStats)
+
+
+def register_counters(name: str) -> Counters:
+    """Get or create the counters for a named component."""
+    return _register(name, Counters)
+
+
+def get_cache_stats() -> dict[str, dict[str, Any]]:
+    """Return a snapshot of all registered cache statistics and counters."""
+    with _registry_lock:
+        components = list(_registry.values())
+    return {component.name: component.snapshot() for component in components}
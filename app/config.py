@@ -18,29 +18,139 @@ class Settings(BaseSettings):
     database_name: str = Field(default="lwyr_db", validation_alias="DATABASE_NAME")
     database_user: str = Field(default="lwyr_user", validation_alias="DATABASE_USER")
     database_password: str = Field(default="lwyr_password", validation_alias="DATABASE_PASSWORD")
+    database_async_pool_size: int = Field(default=20, validation_alias="DATABASE_ASYNC_POOL_SIZE")
+    database_async_max_overflow: int = Field(
+        default=20, validation_alias="DATABASE_ASYNC_MAX_OVERFLOW"
+    )
 
     @property
     def database_url(self) -> str:
         """Generate database URL for SQLAlchemy."""
         return f"postgresql://{self.database_user}:{self.database_password}@{self.database_host}:{self.database_port}/{self.database_name}"
 
+    @property
+    def async_database_url(self) -> str:
+        """Generate asyncpg database URL for the async SQLAlchemy engine."""
+        return f"postgresql+asyncpg://{self.database_user}:{self.database_password}@{self.database_host}:{self.database_port}/{self.database_name}"
+
     openrouter_api_key: str = Field(default="", validation_alias="OPENROUTER_API_KEY")
     openrouter_base_url: str = Field(default="https://openrouter.ai/api/v1", validation_alias="OPENROUTER_BASE_URL")
     openrouter_chat_model: str = Field(default="qwen/qwen3-0.6b:free", validation_alias="OPENROUTER_CHAT_MODEL")
     openrouter_embedding_model: str = Field(default="qwen/qwen3-embedding-0.6b", validation_alias="OPENROUTER_EMBEDDING_MODEL")
     openrouter_temperature: float = Field(default=0.7, validation_alias="OPENROUTER_TEMPERATURE")
     openrouter_max_tokens: int = Field(default=2000, validation_alias="OPENROUTER_MAX_TOKENS")
+    openrouter_embedding_batch_size: int = Field(
+        default=64, validation_alias="OPENROUTER_EMBEDDING_BATCH_SIZE"
+    )
+    openrouter_embedding_max_concurrency: int = Field(
+        default=4, validation_alias="OPENROUTER_EMBEDDING_MAX_CONCURRENCY"
+    )
+    openrouter_max_retries: int = Field(default=3, validation_alias="OPENROUTER_MAX_RETRIES")
+    openrouter_retry_backoff_seconds: float = Field(
+        default=1.0, validation_alias="OPENROUTER_RETRY_BACKOFF_SECONDS"
+    )
+    openrouter_request_coalescing_enabled: bool = Field(
+        default=True, validation_alias="OPENROUTER_REQUEST_COALESCING_ENABLED"
+    )
+    openrouter_http_max_connections: int = Field(
+        default=100, validation_alias="OPENROUTER_HTTP_MAX_CONNECTIONS"
+    )
+    openrouter_http_max_keepalive_connections: int = Field(
+        default=20, validation_alias="OPENROUTER_HTTP_MAX_KEEPALIVE_CONNECTIONS"
+    )
+    openrouter_http_keepalive_expiry_seconds: float = Field(
+        default=30.0, validation_alias="OPENROUTER_HTTP_KEEPALIVE_EXPIRY_SECONDS"
+    )
+    openrouter_http_connect_timeout_seconds: float = Field(
+        default=10.0, validation_alias="OPENROUTER_HTTP_CONNECT_TIMEOUT_SECONDS"
+    )
+    openrouter_http_read_timeout_seconds: float = Field(
+        default=120.0, validation_alias="OPENROUTER_HTTP_READ_TIMEOUT_SECONDS"
+    )
+    openrouter_http_pool_timeout_seconds: float = Field(
+        default=10.0, validation_alias="OPENROUTER_HTTP_POOL_TIMEOUT_SECONDS"
+    )
 
     jwt_secret_key: str = Field(default="your-super-secret-key-change-in-production", validation_alias="JWT_SECRET_KEY")
     jwt_algorithm: str = Field(default="HS256", validation_alias="JWT_ALGORITHM")
     jwt_expiration_hours: int = Field(default=24, validation_alias="JWT_EXPIRATION_HOURS")
+    jwt_verify_user: bool = Field(default=True, validation_alias="JWT_VERIFY_USER")
+    jwt_user_cache_size: int = Field(default=10000, validation_alias="JWT_USER_CACHE_SIZE")
+    jwt_user_cache_ttl_seconds: float = Field(
+        default=30, validation_alias="JWT_USER_CACHE_TTL_SECONDS"
+    )
+    basic_auth_cache_size: int = Field(default=1024, validation_alias="BASIC_AUTH_CACHE_SIZE")
+    basic_auth_cache_ttl_seconds: float = Field(
+        default=300, validation_alias="BASIC_AUTH_CACHE_TTL_SECONDS"
+    )
+    password_hash_workers: int = Field(default=2, validation_alias="PASSWORD_HASH_WORKERS")
+    password_hash_queue_size: int = Field(default=16, validation_alias="PASSWORD_HASH_QUEUE_SIZE")
+    password_hash_timeout_seconds: float = Field(
+        default=5.0, validation_alias="PASSWORD_HASH_TIMEOUT_SECONDS"
+    )
 
     pdf_chunk_size: int = Field(default=1000, validation_alias="PDF_CHUNK_SIZE")
     pdf_chunk_overlap: int = Field(default=200, validation_alias="PDF_CHUNK_OVERLAP")
+    pdf_extraction_workers: int = Field(default=0, validation_alias="PDF_EXTRACTION_WORKERS")
+    pdf_pages_per_task: int = Field(default=16, validation_alias="PDF_PAGES_PER_TASK")
+    pdf_parallel_min_pages: int = Field(default=32, validation_alias="PDF_PARALLEL_MIN_PAGES")
 
     embedding_dimension: int = Field(default=8192, validation_alias="EMBEDDING_DIMENSION")
     embedding_similarity_threshold: float = Field(default=0.7, validation_alias="EMBEDDING_SIMILARITY_THRESHOLD")
     embedding_max_results: int = Field(default=5, validation_alias="EMBEDDING_MAX_RESULTS")
+    embedding_insert_batch_size: int = Field(
+        default=500, validation_alias="EMBEDDING_INSERT_BATCH_SIZE"
+    )
+    embedding_cache_enabled: bool = Field(default=True, validation_alias="EMBEDDING_CACHE_ENABLED")
+    query_embedding_cache_size: int = Field(
+        default=1024, validation_alias="QUERY_EMBEDDING_CACHE_SIZE"
+    )
+    query_embedding_cache_ttl_seconds: float = Field(
+        default=3600, validation_alias="QUERY_EMBEDDING_CACHE_TTL_SECONDS"
+    )
+    search_result_cache_size: int = Field(default=1024, validation_alias="SEARCH_RESULT_CACHE_SIZE")
+    search_result_cache_ttl_seconds: float = Field(
+        default=3600, validation_alias="SEARCH_RESULT_CACHE_TTL_SECONDS"
+    )
+    embedding_search_mode: str = Field(default="ann", validation_alias="EMBEDDING_SEARCH_MODE")
+    embedding_ann_oversample: int = Field(default=4, validation_alias="EMBEDDING_ANN_OVERSAMPLE")
+    embedding_hnsw_ef_search: int = Field(default=100, validation_alias="EMBEDDING_HNSW_EF_SEARCH")
+    embedding_ivfflat_probes: int = Field(default=10, validation_alias="EMBEDDING_IVFFLAT_PROBES")
+    embedding_ann_index_check_ttl_seconds: float = Field(
+        default=300, validation_alias="EMBEDDING_ANN_INDEX_CHECK_TTL_SECONDS"
+    )
+    embedding_rrf_k: int = Field(default=60, validation_alias="EMBEDDING_RRF_K")
+    embedding_mmr_enabled: bool = Field(default=False, validation_alias="EMBEDDING_MMR_ENABLED")
+    embedding_mmr_fetch_multiplier: int = Field(
+        default=4, validation_alias="EMBEDDING_MMR_FETCH_MULTIPLIER"
+    )
+    embedding_mmr_lambda: float = Field(default=0.5, validation_alias="EMBEDDING_MMR_LAMBDA")
+
+    training_max_concurrent_jobs: int = Field(
+        default=1, validation_alias="TRAINING_MAX_CONCURRENT_JOBS"
+    )
+    training_job_history_size: int = Field(
+        default=100, validation_alias="TRAINING_JOB_HISTORY_SIZE"
+    )
+
+    conversation_history_turns: int = Field(
+        default=6, validation_alias="CONVERSATION_HISTORY_TURNS"
+    )
+    conversation_history_max_tokens: int = Field(
+        default=2000, validation_alias="CONVERSATION_HISTORY_MAX_TOKENS"
+    )
+    conversation_summary_batch_turns: int = Field(
+        default=4, validation_alias="CONVERSATION_SUMMARY_BATCH_TURNS"
+    )
+    rag_prompt_max_tokens: int = Field(default=6000, validation_alias="RAG_PROMPT_MAX_TOKENS")
+    rag_answer_cache_size: int = Field(default=512, validation_alias="RAG_ANSWER_CACHE_SIZE")
+    rag_answer_cache_ttl_seconds: float = Field(
+        default=86400, validation_alias="RAG_ANSWER_CACHE_TTL_SECONDS"
+    )
+    rag_answer_cache_similarity_threshold: float = Field(
+        default=0.95, validation_alias="RAG_ANSWER_CACHE_SIMILARITY_THRESHOLD"
+    )
+    tokenizer_encoding: str = Field(default="cl100k_base", validation_alias="TOKENIZER_ENCODING")
 
     resources_path: Path = Field(default=Path(__file__).parent.parent / "resources", validation_alias="RESOURCES_PATH")
 
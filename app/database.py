@@ -1,10 +1,17 @@
 """Database connection and engine management."""
 
-from collections.abc import Generator
-from contextlib import contextmanager
+from collections.abc import AsyncGenerator, Generator
+from contextlib import asynccontextmanager, contextmanager
+from types import TracebackType
 
 from sqlalchemy import create_engine
 from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
 from sqlalchemy.orm import Session, sessionmaker
 from sqlalchemy.pool import QueuePool
 
@@ -23,6 +30,20 @@ engine: Engine = create_engine(
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+async_engine: AsyncEngine = create_async_engine(
+    settings.async_database_url,
+    pool_size=settings.database_async_pool_size,
+    max_overflow=settings.database_async_max_overflow,
+    pool_pre_ping=True,
+    echo=settings.debug,
+)
+
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    autoflush=False,
+    expire_on_commit=False,
+)
+
 
 def get_db() -> Generator[Session, None, None]:
     """Dependency that provides a database session."""
@@ -41,3 +62,123 @@ def get_db_context() -> Generator[Session, None, None]:
         yield db
     finally:
         db.close()
+
+
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    """Dependency that provides an async database session."""
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+def get_async_session_factory() -> async_sessionmaker[AsyncSession]:
+    """Dependency that provides the async session factory, for work after the response."""
+    return AsyncSessionLocal
+
+
+@asynccontextmanager
+async def get_async_db_context() -> AsyncGenerator[AsyncSession, None]:
+    """Async context manager for database sessions (for use outside FastAPI)."""
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+_UOW_DEPTH_KEY = "unit_of_work_depth"
+
+
+async def release_connection(db: AsyncSession) -> None:
+    """End the session's read transaction so its connection goes back to the pool.
+
+    Call this between reads and a slow call that needs no database, such as an
+    LLM request; the session reconnects on its next query. Inside a unit of
+    work it does nothing, since that transaction must stay open.
+    """
+    if not db.info.get(_UOW_DEPTH_KEY, 0):
+        await db.rollback()
+
+
+class UnitOfWork:
+    """Commit a session once for a logical operation.
+
+    Repositories never commit; services wrap each logical operation in a unit
+    of work, which commits on success and rolls back on error. Nested units of
+    work on the same session join the outermost one, so only it commits.
+
+        with UnitOfWork(db) as uow:
+            ...
+            with uow.savepoint():
+                ...
+    """
+
+    def __init__(self, db: Session) -> None:
+        """Wrap the session whose work this unit commits."""
+        self.db = db
+
+    def __enter__(self) -> "UnitOfWork":
+        """Start the unit of work, or join the one already open."""
+        self.db.info[_UOW_DEPTH_KEY] = self.db.info.get(_UOW_DEPTH_KEY, 0) + 1
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        """Commit, or roll back on error, when leaving the outermost unit."""
+        depth = self.db.info[_UOW_DEPTH_KEY] - 1
+        self.db.info[_UOW_DEPTH_KEY] = depth
+        if depth:
+            return
+        if exc_type is None:
+            self.db.commit()
+        else:
+            self.db.rollback()
+
+    @contextmanager
+    def savepoint(self) -> Generator[None, None, None]:
+        """Run a block in a SAVEPOINT that is rolled back alone if it fails."""
+        with self.db.begin_nested():
+            yield
+
+    def rollback(self) -> None:
+        """Discard the work done so far in this unit of work."""
+        self.db.rollback()
+
+
+class AsyncUnitOfWork:
+    """Async counterpart of UnitOfWork for AsyncSession."""
+
+    def __init__(self, db: AsyncSession) -> None:
+        """Wrap the session whose work this unit commits."""
+        self.db = db
+
+    async def __aenter__(self) -> "AsyncUnitOfWork":
+        """Start the unit of work, or join the one already open."""
+        self.db.info[_UOW_DEPTH_KEY] = self.db.info.get(_UOW_DEPTH_KEY, 0) + 1
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        """Commit, or roll back on error, when leaving the outermost unit."""
+        depth = self.db.info[_UOW_DEPTH_KEY] - 1
+        self.db.info[_UOW_DEPTH_KEY] = depth
+        if depth:
+            return
+        if exc_type is None:
+            await self.db.commit()
+        else:
+            await self.db.rollback()
+
+    @asynccontextmanager
+    async def savepoint(self) -> AsyncGenerator[None, None]:
+        """Run a block in a SAVEPOINT that is rolled back alone if it fails."""
+        async with self.db.begin_nested():
+            yield
+
+    async def rollback(self) -> None:
+        """Discard the work done so far in this unit of work."""
+        await self.db.rollback()
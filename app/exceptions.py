@@ -45,6 +45,13 @@ class ValidationException(AppException):
         super().__init__(message, status_code=400)
 
 
+class ServiceUnavailableException(AppException):
+    """Raised when a resource is saturated and the request is shed."""
+
+    def __init__(self, message: str = "Service temporarily unavailable") -> None:
+        super().__init__(message, status_code=503)
+
+
 class OpenRouterException(AppException):
     """Base exception for OpenRouter API errors."""
 
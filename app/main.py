@@ -15,8 +15,16 @@ from app.api import (
     translation_router,
 )
 from app.config import get_settings
-from app.database import engine
+from app.database import async_engine, engine
+from app.exceptions import AppException, ServiceUnavailableException
 from app.models import metadata
+from app.security import shutdown_password_executor
+from app.services import (
+    close_openrouter_clients,
+    get_openrouter_clients,
+    get_training_job_manager,
+    shutdown_extraction_pool,
+)
 
 settings = get_settings()
 
@@ -32,9 +40,15 @@ async def lifespan(app: FastAPI) -> None:
     """Application lifespan events."""
     logger.info("Starting Lwyr application...")
     logger.info(f"Database: {settings.database_host}:{settings.database_port}/{settings.database_name}")
+    app.state.openrouter_clients = get_openrouter_clients()
     logger.info("Application started successfully")
     yield
     logger.info("Shutting down application...")
+    get_training_job_manager().shutdown()
+    shutdown_extraction_pool()
+    shutdown_password_executor()
+    await close_openrouter_clients()
+    await async_engine.dispose()
     logger.info("Application shut down")
 
 
@@ -74,6 +88,22 @@ async def http_exception_handler(request: Request, exc: HTTPException) -> JSONRe
     )
 
 
+@app.exception_handler(AppException)
+async def app_exception_handler(
+    request: Request,  # noqa: ARG001
+    exc: AppException,
+) -> JSONResponse:
+    """Handle application exceptions using their status code."""
+    headers = None
+    if isinstance(exc, ServiceUnavailableException):
+        headers = {"Retry-After": "1"}
+    return JSONResponse(
+        status_code=exc.status_code,
+        content={"error": "Error", "message": exc.message},
+        headers=headers,
+    )
+
+
 @app.exception_handler(Exception)
 async def generic_exception_handler(request: Request, exc: Exception) -> JSONResponse:
     """Handle generic exceptions."""
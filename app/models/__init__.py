@@ -1,7 +1,13 @@
 """Database models package."""
 
 from app.models.conversation import MessageRole, conversations, messages
-from app.models.embedding import embeddings
+from app.models.embedding import (
+    EMBEDDING_ANN_INDEX_NAME,
+    EMBEDDING_INDEX_DIMENSION,
+    EMBEDDING_TEXT_SEARCH_CONFIGS,
+    embeddings,
+)
+from app.models.embedding_cache import embedding_cache
 from app.models.trained_document import trained_documents
 from app.models.user import UserRole, metadata, users
 
@@ -14,4 +20,8 @@ __all__ = [
     "MessageRole",
     "trained_documents",
     "embeddings",
+    "EMBEDDING_INDEX_DIMENSION",
+    "EMBEDDING_TEXT_SEARCH_CONFIGS",
+    "EMBEDDING_ANN_INDEX_NAME",
+    "embedding_cache",
 ]
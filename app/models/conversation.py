@@ -9,6 +9,7 @@ from sqlalchemy import (
     DateTime,
     Enum,
     ForeignKey,
+    Integer,
     MetaData,
     String,
     Table,
@@ -32,6 +33,9 @@ conversations = Table(
     Column("id", Uuid(as_uuid=True), primary_key=True, default=uuid4),
     Column("user_id", Uuid(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False),
     Column("title", String(255)),
+    # Rolling summary of the oldest messages, which are no longer sent verbatim.
+    Column("summary", Text),
+    Column("summary_message_count", Integer, nullable=False, default=0, server_default="0"),
     Column("created_at", DateTime(timezone=True), default=lambda: datetime.now()),
     Column("updated_at", DateTime(timezone=True), default=lambda: datetime.now(), onupdate=lambda: datetime.now()),
 )
@@ -41,7 +45,13 @@ messages = Table(
     metadata,
     Column("id", Uuid(as_uuid=True), primary_key=True, default=uuid4),
     Column("conversation_id", Uuid(as_uuid=True), ForeignKey("conversations.id", ondelete="CASCADE"), nullable=False),
-    Column("role", Enum(MessageRole, name="message_role", create_constraint=False), nullable=False),
+    Column(
+        "role",
+        Enum(
+            MessageRole, name="message_role", native_enum=False, length=20, create_constraint=False
+        ),
+        nullable=False,
+    ),
     Column("content", Text, nullable=False),
     Column("citations", Text),  # JSONB stored as text
     Column("created_at", DateTime(timezone=True), default=lambda: datetime.now()),
@@ -3,7 +3,7 @@
 from datetime import datetime
 from uuid import uuid4
 
-from pgvector.sqlalchemy import Vector
+from pgvector.sqlalchemy import HALFVEC, Vector
 from sqlalchemy import (
     Column,
     DateTime,
@@ -18,6 +18,17 @@ from sqlalchemy import (
 
 metadata = MetaData()
 
+# Leading dimensions of the embedding kept in the half-precision companion column.
+# pgvector cannot index the full 8192-dimensional vector, so the ANN index is built
+# on this prefix and candidates are re-ranked against the full vector.
+EMBEDDING_INDEX_DIMENSION = 2048
+EMBEDDING_ANN_INDEX_NAME = "ix_embeddings_embedding_index_ann"
+# Text search configurations combined in the generated ``content_tsv`` column.
+# Each one stems its language and indexes numbers, such as article numbers, verbatim.
+# The column is maintained by the database and only used by hybrid search, so it
+# is not part of the table definition below.
+EMBEDDING_TEXT_SEARCH_CONFIGS = ("arabic", "french", "english")
+
 
 embeddings = Table(
     "embeddings",
@@ -27,6 +38,7 @@ embeddings = Table(
     Column("chunk_index", Integer, nullable=False),
     Column("content", Text, nullable=False),
     Column("embedding", Vector(8192), nullable=False),
+    Column("embedding_index", HALFVEC(EMBEDDING_INDEX_DIMENSION)),
     Column("page_numbers", String),  # INTEGER[] stored as string
     Column("metadata", Text),  # JSONB stored as text
     Column("created_at", DateTime(timezone=True), default=lambda: datetime.now()),
@@ -0,0 +1,24 @@
+"""Embedding cache model for content-addressed vector reuse."""
+
+from datetime import datetime
+
+from pgvector.sqlalchemy import Vector
+from sqlalchemy import (
+    Column,
+    DateTime,
+    MetaData,
+    String,
+    Table,
+)
+
+metadata = MetaData()
+
+
+embedding_cache = Table(
+    "embedding_cache",
+    metadata,
+    Column("model", String(255), primary_key=True),
+    Column("content_hash", String(64), primary_key=True),  # SHA-256 of normalized text
+    Column("embedding", Vector(8192), nullable=False),
+    Column("created_at", DateTime(timezone=True), default=lambda: datetime.now()),
+)
@@ -0,0 +1,26 @@
+"""PDF text extraction run in extraction worker processes.
+
+Workers are spawned, so they import this module on start. It depends on pypdf
+only: importing anything from ``app.services`` would load the LLM clients and
+database engines in every worker.
+"""
+
+from io import BytesIO
+
+from pypdf import PdfReader
+
+# Document parsed by this worker, keyed by checksum, see ``extract_page_range``.
+_document: tuple[str, PdfReader] | None = None
+
+
+def extract_page_range(checksum: str, file_content: bytes, start: int, stop: int) -> list[str]:
+    """Extract the text of pages ``[start, stop)`` of a PDF.
+
+    The last document is kept parsed, so the page ranges of one document cost
+    one parse per worker rather than one per task.
+    """
+    global _document
+    if _document is None or _document[0] != checksum:
+        _document = (checksum, PdfReader(BytesIO(file_content)))
+    document = _document[1]
+    return [document.pages[index].extract_text() or "" for index in range(start, stop)]
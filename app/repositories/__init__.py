@@ -1,14 +1,24 @@
 """Repositories package."""
 
-from app.repositories.conversation_repository import ConversationRepository, MessageRepository
+from app.repositories.conversation_repository import (
+    AsyncConversationRepository,
+    AsyncMessageRepository,
+)
+from app.repositories.embedding_cache_repository import (
+    AsyncEmbeddingCacheRepository,
+    EmbeddingCacheRepository,
+)
 from app.repositories.embedding_repository import EmbeddingRepository
 from app.repositories.trained_document_repository import TrainedDocumentRepository
-from app.repositories.user_repository import UserRepository
+from app.repositories.user_repository import AsyncUserRepository, UserRepository
 
 __all__ = [
     "UserRepository",
-    "ConversationRepository",
-    "MessageRepository",
+    "AsyncUserRepository",
+    "AsyncConversationRepository",
+    "AsyncMessageRepository",
     "TrainedDocumentRepository",
     "EmbeddingRepository",
+    "EmbeddingCacheRepository",
+    "AsyncEmbeddingCacheRepository",
 ]
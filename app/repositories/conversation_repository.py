@@ -1,111 +1,150 @@
 """Conversation repository for database operations."""
 
 import logging
+from collections.abc import Sequence
 from datetime import datetime
+from typing import Any
 from uuid import UUID
 
-from sqlalchemy import delete, select, update
-from sqlalchemy.orm import Session
+from sqlalchemy import RowMapping, delete, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models import MessageRole, conversations, messages
 
 logger = logging.getLogger(__name__)
 
 
-class ConversationRepository:
+class AsyncConversationRepository:
     """Repository for conversation-related database operations."""
 
-    def __init__(self, db: Session) -> None:
+    def __init__(self, db: AsyncSession) -> None:
         self.db = db
 
-    def find_by_id(self, conversation_id: UUID, user_id: UUID) -> dict | None:
+    async def find_by_id(self, conversation_id: UUID, user_id: UUID) -> RowMapping | None:
         """Find a conversation by ID, verifying ownership."""
         query = select(conversations).where(
             conversations.c.id == conversation_id,
             conversations.c.user_id == user_id,
         )
-        result = self.db.execute(query)
+        result = await self.db.execute(query)
         return result.mappings().fetchone()
 
-    def find_by_user(self, user_id: UUID) -> list[dict]:
+    async def find_by_user(self, user_id: UUID) -> Sequence[RowMapping]:
         """Find all conversations for a user."""
         query = select(conversations).where(conversations.c.user_id == user_id).order_by(
             conversations.c.created_at.desc()
         )
-        result = self.db.execute(query)
+        result = await self.db.execute(query)
         return result.mappings().fetchall()
 
-    def create(self, user_id: UUID, title: str | None = None) -> dict:
+    async def create(self, user_id: UUID, title: str | None = None) -> RowMapping:
         """Create a new conversation."""
         now = datetime.now()
-        query = conversations.insert().values(
-            user_id=user_id,
-            title=title,
-            created_at=now,
-            updated_at=now,
+        query = (
+            conversations.insert()
+            .values(
+                user_id=user_id,
+                title=title,
+                created_at=now,
+                updated_at=now,
+            )
+            .returning(conversations)
         )
-        result = self.db.execute(query)
-        self.db.commit()
-
-        conversation_id = result.inserted_primary_key[0]
-        return self.find_by_id(conversation_id, user_id)
+        result = await self.db.execute(query)
+        conversation = result.mappings().one()
+        return conversation
 
-    def update(self, conversation_id: UUID, user_id: UUID, **kwargs: dict) -> dict | None:
+    async def update(
+        self, conversation_id: UUID, user_id: UUID, **kwargs: Any
+    ) -> RowMapping | None:
         """Update a conversation."""
         kwargs["updated_at"] = datetime.now()
         query = (
             update(conversations)
             .where(conversations.c.id == conversation_id, conversations.c.user_id == user_id)
             .values(**kwargs)
+            .returning(conversations)
         )
-        self.db.execute(query)
-        self.db.commit()
+        result = await self.db.execute(query)
+        conversation = result.mappings().fetchone()
+        return conversation
 
-        return self.find_by_id(conversation_id, user_id)
+    async def update_summary(
+        self,
+        conversation_id: UUID,
+        user_id: UUID,
+        summary: str,
+        summary_message_count: int,
+        expected_message_count: int,
+    ) -> bool:
+        """Store a new summary unless the summary count changed since it was read.
+
+        Returns False, writing nothing, when another compaction stored a
+        summary after ``expected_message_count`` was read.
+        """
+        query = (
+            update(conversations)
+            .where(
+                conversations.c.id == conversation_id,
+                conversations.c.user_id == user_id,
+                conversations.c.summary_message_count == expected_message_count,
+            )
+            .values(
+                summary=summary,
+                summary_message_count=summary_message_count,
+                updated_at=datetime.now(),
+            )
+        )
+        result = await self.db.execute(query)
+        return result.rowcount > 0
 
-    def delete(self, conversation_id: UUID, user_id: UUID) -> bool:
+    async def delete(self, conversation_id: UUID, user_id: UUID) -> bool:
         """Delete a conversation."""
         query = delete(conversations).where(
             conversations.c.id == conversation_id,
             conversations.c.user_id == user_id,
         )
-        result = self.db.execute(query)
-        self.db.commit()
+        result = await self.db.execute(query)
         return result.rowcount > 0
 
 
-class MessageRepository:
+class AsyncMessageRepository:
     """Repository for message-related database operations."""
 
-    def __init__(self, db: Session) -> None:
+    def __init__(self, db: AsyncSession) -> None:
         self.db = db
 
-    def find_by_conversation(self, conversation_id: UUID) -> list[dict]:
-        """Find all messages for a conversation."""
-        query = select(messages).where(
-            messages.c.conversation_id == conversation_id
-        ).order_by(messages.c.created_at.asc())
-        result = self.db.execute(query)
+    async def find_by_conversation(
+        self, conversation_id: UUID, offset: int = 0
+    ) -> Sequence[RowMapping]:
+        """Find the messages of a conversation in order, skipping the first ``offset``."""
+        query = (
+            select(messages)
+            .where(messages.c.conversation_id == conversation_id)
+            .order_by(messages.c.created_at.asc(), messages.c.id.asc())
+            .offset(offset)
+        )
+        result = await self.db.execute(query)
         return result.mappings().fetchall()
 
-    def create(
+    async def create(
         self,
         conversation_id: UUID,
         role: MessageRole,
         content: str,
         citations: str | None = None,
-    ) -> dict:
+    ) -> RowMapping:
         """Create a new message."""
-        query = messages.insert().values(
-            conversation_id=conversation_id,
-            role=role,
-            content=content,
-            citations=citations,
+        query = (
+            messages.insert()
+            .values(
+                conversation_id=conversation_id,
+                role=role,
+                content=content,
+                citations=citations,
+            )
+            .returning(messages)
         )
-        result = self.db.execute(query)
-        self.db.commit()
-
-        message_id = result.inserted_primary_key[0]
-        query = select(messages).where(messages.c.id == message_id)
-        result = self.db.execute(query)
-        return result.mappings().fetch_one()
+        result = await self.db.execute(query)
+        message = result.mappings().one()
+        return message
@@ -0,0 +1,89 @@
+"""Embedding cache repository for database operations."""
+
+import logging
+from datetime import datetime
+from typing import Any
+
+from sqlalchemy import Select, select
+from sqlalchemy.dialects.postgresql import Insert, insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.models import embedding_cache
+
+logger = logging.getLogger(__name__)
+
+
+class EmbeddingCacheRepository:
+    """Repository for cached embeddings keyed by model and content hash."""
+
+    def __init__(self, db: Session) -> None:
+        """Bind the repository to a session."""
+        self.db = db
+
+    def find_many(self, model: str, content_hashes: list[str]) -> dict[str, list[float]]:
+        """Find cached embeddings for the given content hashes."""
+        if not content_hashes:
+            return {}
+
+        result = self.db.execute(_find_many_query(model, content_hashes))
+        return {row.content_hash: row.embedding for row in result}
+
+    def save_many(self, model: str, entries: dict[str, list[float]]) -> None:
+        """Store embeddings by content hash, ignoring ones already cached."""
+        if not entries:
+            return
+
+        self.db.execute(_save_many_query(), _cache_rows(model, entries))
+
+
+class AsyncEmbeddingCacheRepository:
+    """Async repository for cached embeddings keyed by model and content hash."""
+
+    def __init__(self, db: AsyncSession) -> None:
+        """Bind the repository to an async session."""
+        self.db = db
+
+    async def find_many(self, model: str, content_hashes: list[str]) -> dict[str, list[float]]:
+        """Find cached embeddings for the given content hashes."""
+        if not content_hashes:
+            return {}
+
+        result = await self.db.execute(_find_many_query(model, content_hashes))
+        return {row.content_hash: row.embedding for row in result}
+
+    async def save_many(self, model: str, entries: dict[str, list[float]]) -> None:
+        """Store embeddings by content hash, ignoring ones already cached."""
+        if not entries:
+            return
+
+        await self.db.execute(_save_many_query(), _cache_rows(model, entries))
+
+
+def _find_many_query(model: str, content_hashes: list[str]) -> Select[Any]:
+    """Build the lookup query for cached embeddings."""
+    return select(embedding_cache.c.content_hash, embedding_cache.c.embedding).where(
+        embedding_cache.c.model == model,
+        embedding_cache.c.content_hash.in_(content_hashes),
+    )
+
+
+def _save_many_query() -> Insert:
+    """Build the insert statement that skips already cached hashes."""
+    return insert(embedding_cache).on_conflict_do_nothing(
+        index_elements=["model", "content_hash"]
+    )
+
+
+def _cache_rows(model: str, entries: dict[str, list[float]]) -> list[dict[str, Any]]:
+    """Build the rows to insert for cached embeddings."""
+    now = datetime.now()
+    return [
+        {
+            "model": model,
+            "content_hash": content_hash,
+            "embedding": embedding,
+            "created_at": now,
+        }
+        for content_hash, embedding in entries.items()
+    ]
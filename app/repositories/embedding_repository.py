@@ -2,16 +2,22 @@
 
 import json
 import logging
+from collections.abc import Sequence
 from datetime import datetime
+from typing import Any
 from uuid import UUID
 
-from sqlalchemy import delete, select
+from sqlalchemy import Column, RowMapping, delete, func, select
 from sqlalchemy.orm import Session
 
-from app.models import embeddings
+from app.models import EMBEDDING_INDEX_DIMENSION, embeddings
 
 logger = logging.getLogger(__name__)
 
+# Everything but the vectors: the full embedding alone is about 32 KB per row.
+_VECTOR_COLUMNS = {"embedding", "embedding_index"}
+_ROW_COLUMNS = [column for column in embeddings.c if column.name not in _VECTOR_COLUMNS]
+
 
 class EmbeddingRepository:
     """Repository for embedding-related database operations."""
@@ -19,15 +25,19 @@ class EmbeddingRepository:
     def __init__(self, db: Session) -> None:
         self.db = db
 
-    def find_by_id(self, embedding_id: UUID) -> dict | None:
-        """Find an embedding by ID."""
-        query = select(embeddings).where(embeddings.c.id == embedding_id)
+    def find_by_id(
+        self, embedding_id: UUID, include_vector: bool = False
+    ) -> RowMapping | None:
+        """Find an embedding by ID, without the vector unless requested."""
+        query = select(*self._columns(include_vector)).where(embeddings.c.id == embedding_id)
         result = self.db.execute(query)
-        return result.mappings().fetch_one()
+        return result.mappings().fetchone()
 
-    def find_by_document(self, document_id: UUID) -> list[dict]:
-        """Find all embeddings for a document."""
-        query = select(embeddings).where(
+    def find_by_document(
+        self, document_id: UUID, include_vector: bool = False
+    ) -> Sequence[RowMapping]:
+        """Find all embeddings for a document, without vectors unless requested."""
+        query = select(*self._columns(include_vector)).where(
             embeddings.c.trained_document_id == document_id
         ).order_by(embeddings.c.chunk_index.asc())
         result = self.db.execute(query)
@@ -40,33 +50,77 @@ class EmbeddingRepository:
         content: str,
         embedding: list[float],
         page_numbers: list[int] | None = None,
-        metadata: dict | None = None,
-    ) -> dict:
-        """Save a new embedding."""
-        query = embeddings.insert().values(
-            trained_document_id=trained_document_id,
-            chunk_index=chunk_index,
-            content=content,
-            embedding=embedding,
-            page_numbers=str(page_numbers) if page_numbers else None,
-            metadata=json.dumps(metadata) if metadata else None,
-            created_at=datetime.now(),
+        metadata: dict[str, Any] | None = None,
+    ) -> RowMapping:
+        """Save a new embedding, returning the row without its vector."""
+        query = (
+            embeddings.insert()
+            .values(
+                **self._build_row(
+                    trained_document_id=trained_document_id,
+                    chunk_index=chunk_index,
+                    content=content,
+                    embedding=embedding,
+                    page_numbers=page_numbers,
+                    metadata=metadata,
+                )
+            )
+            .returning(*_ROW_COLUMNS)
         )
         result = self.db.execute(query)
-        self.db.commit()
+        saved = result.mappings().one()
+        return saved
+
+    def save_many(self, records: list[dict[str, Any]], batch_size: int = 500) -> int:
+        """Bulk insert embeddings.
+
+        Each record takes the same keys as ``save``. Rows are sent as
+        executemany batches of ``batch_size`` and are not read back.
+        """
+        saved = 0
+        for start in range(0, len(records), batch_size):
+            batch = [self._build_row(**record) for record in records[start:start + batch_size]]
+            self.db.execute(embeddings.insert(), batch)
+            saved += len(batch)
+            logger.debug(f"Inserted embedding batch of {len(batch)} rows ({saved}/{len(records)})")
+        return saved
 
-        embedding_id = result.inserted_primary_key[0]
-        return self.find_by_id(embedding_id)
+    def _build_row(
+        self,
+        trained_document_id: UUID,
+        chunk_index: int,
+        content: str,
+        embedding: list[float],
+        page_numbers: list[int] | None = None,
+        metadata: dict[str, Any] | None = None,
+    ) -> dict[str, Any]:
+        """Build the column values for an embedding row."""
+        return {
+            "trained_document_id": trained_document_id,
+            "chunk_index": chunk_index,
+            "content": content,
+            "embedding": embedding,
+            "embedding_index": embedding[:EMBEDDING_INDEX_DIMENSION],
+            "page_numbers": str(page_numbers) if page_numbers else None,
+            "metadata": json.dumps(metadata) if metadata else None,
+            "created_at": datetime.now(),
+        }
 
     def delete_by_document(self, document_id: UUID) -> int:
         """Delete all embeddings for a document."""
         query = delete(embeddings).where(embeddings.c.trained_document_id == document_id)
         result = self.db.execute(query)
-        self.db.commit()
         return result.rowcount
 
     def count_by_document(self, document_id: UUID) -> int:
         """Count embeddings for a document."""
-        query = select(embeddings).where(embeddings.c.trained_document_id == document_id)
-        result = self.db.execute(query)
-        return len(result.mappings().fetchall())
+        query = (
+            select(func.count())
+            .select_from(embeddings)
+            .where(embeddings.c.trained_document_id == document_id)
+        )
+        return self.db.execute(query).scalar_one()
+
+    def _columns(self, include_vector: bool) -> list[Column[Any]]:
+        """Columns to select, with the vectors only when explicitly requested."""
+        return [*embeddings.c] if include_vector else _ROW_COLUMNS
@@ -2,9 +2,11 @@
 
 import logging
 from datetime import datetime
+from typing import Any
 from uuid import UUID
 
-from sqlalchemy import select
+from sqlalchemy import RowMapping, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from app.models import UserRole, users
@@ -18,13 +20,13 @@ class UserRepository:
     def __init__(self, db: Session) -> None:
         self.db = db
 
-    def find_by_id(self, user_id: UUID) -> dict | None:
+    def find_by_id(self, user_id: UUID) -> RowMapping | None:
         """Find a user by ID."""
         query = select(users).where(users.c.id == user_id)
         result = self.db.execute(query)
         return result.mappings().fetchone()
 
-    def find_by_email(self, email: str) -> dict | None:
+    def find_by_email(self, email: str) -> RowMapping | None:
         """Find a user by email."""
         query = select(users).where(users.c.email == email)
         result = self.db.execute(query)
@@ -35,26 +37,48 @@ class UserRepository:
         user = self.find_by_email(email)
         return user is not None
 
-    def create(self, email: str, password_hash: str, role: UserRole) -> dict:
+    def create(self, email: str, password_hash: str, role: UserRole) -> RowMapping:
         """Create a new user."""
         now = datetime.now()
-        query = users.insert().values(
-            email=email,
-            password_hash=password_hash,
-            role=role,
-            created_at=now,
-            updated_at=now,
+        query = (
+            users.insert()
+            .values(
+                email=email,
+                password_hash=password_hash,
+                role=role,
+                created_at=now,
+                updated_at=now,
+            )
+            .returning(users)
         )
         result = self.db.execute(query)
-        self.db.commit()
+        user = result.mappings().one()
+        return user
 
-        user_id = result.inserted_primary_key[0]
-        return self.find_by_id(user_id)
-
-    def save(self, user_data: dict) -> dict:
+    def save(self, user_data: dict[str, Any]) -> RowMapping:
         """Save a user (alias for create)."""
         return self.create(
             email=user_data["email"],
             password_hash=user_data["password_hash"],
             role=user_data["role"],
         )
+
+
+class AsyncUserRepository:
+    """Async repository for the user lookups done on every authenticated request."""
+
+    def __init__(self, db: AsyncSession) -> None:
+        """Bind the repository to an async session."""
+        self.db = db
+
+    async def find_by_id(self, user_id: UUID) -> RowMapping | None:
+        """Find a user by ID."""
+        query = select(users).where(users.c.id == user_id)
+        result = await self.db.execute(query)
+        return result.mappings().fetchone()
+
+    async def find_by_email(self, email: str) -> RowMapping | None:
+        """Find a user by email."""
+        query = select(users).where(users.c.email == email)
+        result = await self.db.execute(query)
+        return result.mappings().fetchone()
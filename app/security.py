@@ -1,28 +1,124 @@
 """Security utilities for password hashing and JWT token handling."""
 
+import asyncio
 import logging
+import threading
+from collections.abc import Callable
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
 from datetime import UTC, datetime, timedelta
+from typing import TypeVar
 
 import jwt
 from passlib.context import CryptContext
 
 from app.config import get_settings
+from app.exceptions import ServiceUnavailableException
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+T = TypeVar("T")
+
+_password_executor: ThreadPoolExecutor | None = None
+_password_executor_lock = threading.Lock()
+_password_slots = threading.BoundedSemaphore(
+    max(settings.password_hash_workers, 1) + max(settings.password_hash_queue_size, 0)
+)
+
+
+def get_password_executor() -> ThreadPoolExecutor:
+    """Get the dedicated executor for bcrypt work."""
+    global _password_executor
+    with _password_executor_lock:
+        if _password_executor is None:
+            _password_executor = ThreadPoolExecutor(
+                max_workers=max(settings.password_hash_workers, 1),
+                thread_name_prefix="password-hash",
+            )
+        return _password_executor
+
+
+def shutdown_password_executor() -> None:
+    """Shut down the bcrypt executor, if it was started."""
+    global _password_executor
+    with _password_executor_lock:
+        if _password_executor is not None:
+            _password_executor.shutdown(wait=False, cancel_futures=True)
+            _password_executor = None
+
+
+def _submit_password_task(func: Callable[..., T], *args: str) -> Future[T]:
+    """Submit bcrypt work to the dedicated executor with admission control.
+
+    At most ``password_hash_workers`` calls run at once and at most
+    ``password_hash_queue_size`` more may wait; anything beyond that raises
+    ServiceUnavailableException so the caller sheds load instead of queueing.
+    """
+    if not _password_slots.acquire(blocking=False):
+        logger.warning("Password hashing queue is full, rejecting request")
+        raise ServiceUnavailableException("Too many concurrent authentication requests")
+
+    try:
+        future: Future[T] = get_password_executor().submit(func, *args)
+    except BaseException:
+        _password_slots.release()
+        raise
+    future.add_done_callback(lambda _: _password_slots.release())
+    return future
+
+
+def _run_password_task(
+    func: Callable[..., T],
+    *args: str,
+    timeout: float = settings.password_hash_timeout_seconds,
+) -> T:
+    """Run bcrypt work on the dedicated executor and wait for it.
+
+    A call that does not finish within ``timeout`` seconds raises
+    ServiceUnavailableException, as does a full queue.
+    """
+    future = _submit_password_task(func, *args)
+    try:
+        return future.result(timeout=timeout)
+    except FutureTimeoutError as e:
+        future.cancel()
+        logger.warning(f"Password hashing did not finish within {timeout}s")
+        raise ServiceUnavailableException("Authentication timed out, please try again") from e
+
+
+async def _arun_password_task(
+    func: Callable[..., T],
+    *args: str,
+    timeout: float = settings.password_hash_timeout_seconds,
+) -> T:
+    """Async counterpart of ``_run_password_task`` that does not block the event loop."""
+    future = _submit_password_task(func, *args)
+    try:
+        return await asyncio.wait_for(asyncio.wrap_future(future), timeout)
+    except TimeoutError as e:
+        logger.warning(f"Password hashing did not finish within {timeout}s")
+        raise ServiceUnavailableException("Authentication timed out, please try again") from e
+
 
 def hash_password(password: str) -> str:
     """Hash a password using BCrypt."""
-    hashed = pwd_context.hash(password)
+    hashed = _run_password_task(pwd_context.hash, password)
     return str(hashed)
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against a hash."""
-    return pwd_context.verify(plain_password, hashed_password)
+    verified = _run_password_task(pwd_context.verify, plain_password, hashed_password)
+    return bool(verified)
+
+
+async def averify_password(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password against a hash without blocking the event loop."""
+    verified = await _arun_password_task(pwd_context.verify, plain_password, hashed_password)
+    return bool(verified)
 
 
 def create_access_token(user_id: str, email: str, role: str, expires_delta: timedelta | None = None) -> str:
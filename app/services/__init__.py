@@ -1,17 +1,40 @@
 """Services package."""
 
 from app.services.auth_service import AuthService
+from app.services.conversation_memory_service import (
+    ConversationMemoryService,
+    compact_conversation,
+)
 from app.services.embedding_service import EmbeddingService
-from app.services.openrouter_service import OpenRouterService
-from app.services.pdf_service import PdfService
+from app.services.openrouter_service import (
+    OpenRouterClients,
+    OpenRouterService,
+    close_openrouter_clients,
+    get_openrouter_clients,
+)
+from app.services.pdf_service import PdfService, shutdown_extraction_pool
 from app.services.rag_service import RAGService
+from app.services.training_service import (
+    TrainingJobManager,
+    TrainingService,
+    get_training_job_manager,
+)
 from app.services.translation_service import TranslationService
 
 __all__ = [
     "AuthService",
     "PdfService",
+    "OpenRouterClients",
     "OpenRouterService",
+    "get_openrouter_clients",
+    "close_openrouter_clients",
     "EmbeddingService",
+    "ConversationMemoryService",
+    "compact_conversation",
     "RAGService",
     "TranslationService",
+    "TrainingService",
+    "TrainingJobManager",
+    "get_training_job_manager",
+    "shutdown_extraction_pool",
 ]
@@ -1,10 +1,14 @@
 """Authentication service."""
 
 import logging
+from collections.abc import Mapping
+from typing import Any
 from uuid import UUID
 
+from sqlalchemy import RowMapping
 from sqlalchemy.orm import Session
 
+from app.database import UnitOfWork
 from app.exceptions import AuthenticationException, ResourceAlreadyExistsException
 from app.models import UserRole
 from app.repositories import UserRepository
@@ -20,7 +24,7 @@ class AuthService:
         self.db = db
         self.user_repository = UserRepository(db)
 
-    def signup(self, email: str, password: str) -> dict:
+    def signup(self, email: str, password: str) -> RowMapping:
         """Register a new user."""
         logger.info(f"Processing signup for email: {email}")
 
@@ -29,13 +33,14 @@ class AuthService:
             raise ResourceAlreadyExistsException("Email already registered")
 
         password_hash = hash_password(password)
-        user = self.user_repository.create(email, password_hash, UserRole.USER)
+        with UnitOfWork(self.db):
+            user = self.user_repository.create(email, password_hash, UserRole.USER)
 
         logger.info(f"User registered successfully: {user['id']}")
 
         return user
 
-    def login(self, email: str, password: str) -> dict:
+    def login(self, email: str, password: str) -> RowMapping:
         """Authenticate a user and return user data."""
         logger.info(f"Processing login for email: {email}")
 
@@ -52,7 +57,7 @@ class AuthService:
 
         return user
 
-    def generate_token(self, user: dict) -> str:
+    def generate_token(self, user: Mapping[Any, Any]) -> str:
         """Generate a JWT token for a user."""
         return create_access_token(
             user_id=str(user["id"]),
@@ -60,6 +65,6 @@ class AuthService:
             role=user["role"].value if isinstance(user["role"], UserRole) else user["role"],
         )
 
-    def get_user_by_id(self, user_id: UUID) -> dict | None:
+    def get_user_by_id(self, user_id: UUID) -> RowMapping | None:
         """Get a user by ID."""
         return self.user_repository.find_by_id(user_id)
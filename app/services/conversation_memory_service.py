@@ -0,0 +1,160 @@
+"""Conversation memory: a bounded history window plus a rolling summary."""
+
+import logging
+from collections.abc import Mapping
+from typing import Any
+from uuid import UUID
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.config import get_settings
+from app.database import AsyncUnitOfWork, release_connection
+from app.exceptions import OpenRouterException
+from app.models import MessageRole
+from app.repositories import AsyncConversationRepository, AsyncMessageRepository
+from app.services.openrouter_service import OpenRouterService
+from app.tokenizer import count_message_tokens
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+SUMMARY_SYSTEM_PROMPT = """You maintain a running summary of a legal consultation.
+Merge the new messages into the existing summary. Keep the facts of the user's situation,
+the questions asked, the answers given and the laws or documents cited.
+Be concise and write in the language of the conversation. Return only the summary."""
+
+
+class ConversationMemoryService:
+    """Keeps the prompt history of a conversation bounded.
+
+    Messages that are not yet summarized are sent verbatim, newest first, as long
+    as they fit in ``max_history_tokens``. After a turn, once
+    ``summary_batch_turns`` turns have piled up beyond the newest
+    ``history_turns``, or the messages no longer fit, the older ones are folded
+    into a summary stored on the conversation row. Each message is summarized
+    once and never re-read.
+    """
+
+    def __init__(
+        self,
+        db: AsyncSession,
+        openrouter_service: OpenRouterService | None = None,
+        history_turns: int = settings.conversation_history_turns,
+        max_history_tokens: int = settings.conversation_history_max_tokens,
+        summary_batch_turns: int = settings.conversation_summary_batch_turns,
+    ) -> None:
+        """Set up the memory of conversations read and written through ``db``."""
+        self.db = db
+        self.openrouter_service = openrouter_service or OpenRouterService()
+        self.conversation_repository = AsyncConversationRepository(db)
+        self.message_repository = AsyncMessageRepository(db)
+        self.history_turns = history_turns
+        self.max_history_tokens = max_history_tokens
+        self.summary_batch_turns = max(summary_batch_turns, 1)
+
+    async def load(
+        self, conversation: Mapping[Any, Any]
+    ) -> tuple[str | None, list[dict[str, Any]]]:
+        """Return the conversation summary and the recent messages to send verbatim."""
+        window = await self._unsummarized_messages(conversation)
+        return conversation["summary"], self._recent_messages(window)
+
+    async def compact(self, conversation_id: UUID, user_id: UUID) -> None:
+        """Fold older messages into the summary once a batch of them has piled up.
+
+        Meant to run after the response of a turn, see ``compact_conversation``.
+        The conversation is read again here and the summary is stored in its
+        own unit of work only if no concurrent compaction advanced it in the
+        meantime. If summarization fails, the messages stay verbatim and are
+        folded after a later turn.
+        """
+        conversation = await self.conversation_repository.find_by_id(conversation_id, user_id)
+        if conversation is None:
+            return
+
+        window = await self._unsummarized_messages(conversation)
+        kept = self._recent_messages(window, self.history_turns)
+        overflow = window[:len(window) - len(kept)]
+        fits = len(self._recent_messages(window)) == len(window)
+        if not overflow or (fits and len(overflow) < 2 * self.summary_batch_turns):
+            return
+
+        await release_connection(self.db)
+        summarized = conversation["summary_message_count"]
+        try:
+            summary = await self._fold(conversation["summary"], overflow)
+        except OpenRouterException as e:
+            logger.warning(f"Could not summarize conversation {conversation_id}: {e.message}")
+            return
+
+        async with AsyncUnitOfWork(self.db):
+            stored = await self.conversation_repository.update_summary(
+                conversation_id,
+                user_id,
+                summary,
+                summary_message_count=summarized + len(overflow),
+                expected_message_count=summarized,
+            )
+        if not stored:
+            logger.info(f"Summary of conversation {conversation_id} changed meanwhile, discarded")
+            return
+        logger.info(
+            f"Folded {len(overflow)} messages into the summary of conversation {conversation_id}"
+        )
+
+    async def _unsummarized_messages(self, conversation: Mapping[Any, Any]) -> list[dict[str, Any]]:
+        """Messages of the conversation that are not part of its summary yet."""
+        offset = conversation["summary_message_count"] or 0
+        rows = await self.message_repository.find_by_conversation(conversation["id"], offset)
+        return [self._to_message(row) for row in rows]
+
+    def _recent_messages(
+        self, messages: list[dict[str, Any]], turns: int | None = None
+    ) -> list[dict[str, Any]]:
+        """Select the newest messages within the token budget and ``turns``, if given."""
+        if turns is not None:
+            messages = messages[-2 * turns:] if turns > 0 else []
+
+        recent: list[dict[str, Any]] = []
+        tokens = 0
+        for message in reversed(messages):
+            tokens += count_message_tokens(message)
+            if tokens > self.max_history_tokens:
+                break
+            recent.append(message)
+        recent.reverse()
+        return recent
+
+    async def _fold(self, summary: str | None, messages: list[dict[str, Any]]) -> str:
+        """Merge messages into the existing summary."""
+        transcript = "\n\n".join(f"{m['role'].upper()}: {m['content']}" for m in messages)
+        prompt = (
+            f"Existing summary:\n{summary or '(none)'}\n\n"
+            f"New messages:\n{transcript}\n\n"
+            "Updated summary:"
+        )
+        return await self.openrouter_service.agenerate_chat_response(
+            [{"role": "user", "content": prompt}],
+            system_prompt=SUMMARY_SYSTEM_PROMPT,
+        )
+
+    def _to_message(self, row: Mapping[Any, Any]) -> dict[str, Any]:
+        """Convert a message row to a role/content dict for the LLM."""
+        role = row["role"].value if isinstance(row["role"], MessageRole) else row["role"]
+        return {"role": role.lower(), "content": row["content"]}
+
+
+async def compact_conversation(
+    session_factory: async_sessionmaker[AsyncSession],
+    openrouter_service: OpenRouterService,
+    conversation_id: UUID,
+    user_id: UUID,
+) -> None:
+    """Compact the memory of a conversation in a session of its own.
+
+    Scheduled as a background task once the answer has been sent, so the
+    summarization call does not delay the response.
+    """
+    async with session_factory() as db:
+        memory_service = ConversationMemoryService(db, openrouter_service)
+        await memory_service.compact(conversation_id, user_id)
@@ -2,105 +2,595 @@
 
 import json
 import logging
-from uuid import UUID
+import re
+from collections.abc import Sequence
+from typing import Any
 
-from sqlalchemy import text
-from sqlalchemy.orm import Session
+import numpy as np
+from pgvector import Vector as PgVector
+from pgvector.sqlalchemy import HALFVEC, Vector
+from sqlalchemy import RowMapping, TextClause, TextualSelect, bindparam, text
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.cache import (
+    TTLCache,
+    VersionCounter,
+    normalize_text,
+    register_cache_stats,
+    text_fingerprint,
+    vector_fingerprint,
+)
 from app.config import get_settings
-from app.repositories import EmbeddingRepository, TrainedDocumentRepository
+from app.database import AsyncUnitOfWork
+from app.models import (
+    EMBEDDING_ANN_INDEX_NAME,
+    EMBEDDING_INDEX_DIMENSION,
+    EMBEDDING_TEXT_SEARCH_CONFIGS,
+)
+from app.repositories import AsyncEmbeddingCacheRepository
 from app.services.openrouter_service import OpenRouterService
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
 
+embedding_cache_stats = register_cache_stats("embedding_cache")
+query_embedding_cache = TTLCache(
+    "query_embedding",
+    maxsize=settings.query_embedding_cache_size,
+    ttl_seconds=settings.query_embedding_cache_ttl_seconds,
+)
+# Access method of the ANN index, re-checked periodically so that an index created
+# (or dropped) by a migration is picked up without a restart.
+ann_index_cache = TTLCache(
+    "ann_index_method",
+    maxsize=1,
+    ttl_seconds=settings.embedding_ann_index_check_ttl_seconds,
+)
+search_result_cache = TTLCache(
+    "search_result",
+    maxsize=settings.search_result_cache_size,
+    ttl_seconds=settings.search_result_cache_ttl_seconds,
+)
+# Bumped whenever trained documents change; caches derived from search results
+# tag their entries with it so nothing computed from an older corpus is served.
+corpus_version = VersionCounter()
+
+
+def invalidate_corpus() -> None:
+    """Record a change to the trained documents and drop cached search results."""
+    corpus_version.bump()
+    search_result_cache.clear()
+
+
+def maximal_marginal_relevance(
+    query_vector: np.ndarray,
+    candidate_vectors: np.ndarray,
+    k: int,
+    lambda_mult: float = settings.embedding_mmr_lambda,
+) -> list[int]:
+    """Select ``k`` candidates balancing relevance to the query and diversity.
+
+    Each step picks the candidate maximizing
+    ``lambda * sim(query, c) - (1 - lambda) * max(sim(c, selected))``.
+    All cosine similarities are computed up front as matrix products; the greedy
+    loop only updates a running maximum per candidate. Returns candidate
+    indices in selection order.
+    """
+    if len(candidate_vectors) == 0 or k <= 0:
+        return []
+
+    candidates = candidate_vectors / np.maximum(
+        np.linalg.norm(candidate_vectors, axis=1, keepdims=True), 1e-12
+    )
+    query = query_vector / max(float(np.linalg.norm(query_vector)), 1e-12)
+
+    relevance = candidates @ query
+    pairwise = candidates @ candidates.T
+
+    selected = [int(np.argmax(relevance))]
+    max_similarity = pairwise[selected[0]].copy()
+    available = np.ones(len(candidates), dtype=bool)
+    available[selected[0]] = False
+
+    while len(selected) < min(k, len(candidates)):
+        scores = lambda_mult * relevance - (1 - lambda_mult) * max_similarity
+        scores[~available] = -np.inf
+        best = int(np.argmax(scores))
+        selected.append(best)
+        available[best] = False
+        np.maximum(max_similarity, pairwise[best], out=max_similarity)
+
+    return selected
+
 
 class EmbeddingService:
-    """Service for embedding generation and storage."""
+    """Service for query embeddings and similarity search."""
 
-    def __init__(self, db: Session) -> None:
+    def __init__(
+        self,
+        db: AsyncSession,
+        openrouter_service: OpenRouterService | None = None,
+    ) -> None:
         self.db = db
-        self.openrouter_service = OpenRouterService()
-        self.embedding_repository = EmbeddingRepository(db)
-        self.trained_document_repository = TrainedDocumentRepository(db)
+        self.openrouter_service = openrouter_service or OpenRouterService()
+        self.embedding_cache_repository = AsyncEmbeddingCacheRepository(db)
 
-    def generate_embedding(self, text: str) -> list[float]:
-        """Generate embedding for a single text."""
+    async def generate_embedding(self, text: str) -> list[float]:
+        """Generate embedding for a single text, reusing a cached vector if present."""
         logger.info(f"Generating embedding for text ({len(text)} chars)")
-        embedding = self.openrouter_service.generate_embedding(text)
+
+        if not settings.embedding_cache_enabled:
+            return await self.openrouter_service.agenerate_embedding(text)
+
+        model = settings.openrouter_embedding_model
+        content_hash = text_fingerprint(text)
+        cached = await self.embedding_cache_repository.find_many(model, [content_hash])
+        if content_hash in cached:
+            embedding_cache_stats.record_hits()
+            return cached[content_hash]
+
+        embedding_cache_stats.record_misses()
+        embedding = await self.openrouter_service.agenerate_embedding(text)
+        async with AsyncUnitOfWork(self.db) as uow:
+            try:
+                async with uow.savepoint():
+                    await self.embedding_cache_repository.save_many(
+                        model, {content_hash: embedding}
+                    )
+            except SQLAlchemyError as e:
+                logger.warning(f"Could not cache embedding: {e}")
         logger.debug(f"Embedding generated with {len(embedding)} dimensions")
         return embedding
 
-    def store_embeddings(
-        self,
-        trained_document_id: UUID,
-        chunks: list[str],
-    ) -> int:
-        """Store embeddings for document chunks."""
-        logger.info(f"Storing {len(chunks)} embeddings for document {trained_document_id}")
-
-        embeddings = self.openrouter_service.generate_embeddings(chunks)
-
-        for index, chunk in enumerate(chunks):
-            embedding_record = self.embedding_repository.save(
-                trained_document_id=trained_document_id,
-                chunk_index=index,
-                content=chunk,
-                embedding=embeddings[index],
-                metadata={"chunk_size": len(chunk)},
-            )
-            logger.debug(f"Stored embedding {index + 1}/{len(chunks)}")
+    async def embed_query(self, query: str) -> list[float]:
+        """Embed a search query, reusing recent embeddings of the same query."""
+        key = (settings.openrouter_embedding_model, normalize_text(query))
+        embedding = query_embedding_cache.get(key)
+        if embedding is None:
+            embedding = await self.openrouter_service.agenerate_embedding(query)
+            query_embedding_cache.set(key, embedding)
+        return embedding
 
-        self.trained_document_repository.update_chunk_count(
-            trained_document_id, len(chunks)
-        )
+    async def embed_queries(self, queries: list[str]) -> list[list[float]]:
+        """Embed several search queries with one provider call for the uncached ones."""
+        keys = [(settings.openrouter_embedding_model, normalize_text(query)) for query in queries]
+        embeddings: dict[tuple[str, str], list[float]] = {}
+        missing = []
+        for key in set(keys):
+            embedding = query_embedding_cache.get(key)
+            if embedding is None:
+                missing.append(key)
+            else:
+                embeddings[key] = embedding
+
+        if missing:
+            vectors = await self.openrouter_service.agenerate_embeddings(
+                [text for _, text in missing]
+            )
+            for key, vector in zip(missing, vectors, strict=True):
+                embeddings[key] = vector
+                query_embedding_cache.set(key, vector)
 
-        logger.info(f"Successfully stored {len(chunks)} embeddings")
-        return len(chunks)
+        return [embeddings[key] for key in keys]
 
-    def similarity_search(
+    async def similarity_search(
         self,
         query: str,
         max_results: int = settings.embedding_max_results,
         similarity_threshold: float = settings.embedding_similarity_threshold,
+        search_mode: str | None = None,
+        diversify: bool | None = None,
+        mmr_lambda: float | None = None,
     ) -> list[dict]:
-        """Search for similar embeddings."""
+        """Search for similar embeddings.
+
+        ``search_mode`` is ``"ann"`` to use the approximate index on the
+        half-precision column, ``"exact"`` for a full scan, or ``"hybrid"`` to
+        fuse vector and full-text rankings. ANN searches fall back to the exact
+        scan when the index has not been created.
+
+        With ``diversify``, ``max_results * embedding_mmr_fetch_multiplier``
+        candidates are fetched and re-ranked with Maximal Marginal Relevance so
+        that near-duplicate chunks do not crowd out other evidence.
+
+        Each result carries its 1-based ``rank`` in the final ordering (fusion
+        score for hybrid search, MMR selection order when diversified), which
+        ``similarity`` alone does not reflect.
+
+        Results are cached per query embedding, search parameters and corpus
+        version, so repeated questions skip the database.
+        """
         logger.info(f"Performing similarity search for query ({len(query)} chars)")
 
-        query_embedding = self.openrouter_service.generate_embedding(query)
+        version = corpus_version.value
+        query_embedding = await self.embed_query(query)
+
+        if diversify is None:
+            diversify = settings.embedding_mmr_enabled
+        if mmr_lambda is None:
+            mmr_lambda = settings.embedding_mmr_lambda
+        limit = max_results * settings.embedding_mmr_fetch_multiplier if diversify else max_results
+
+        search_mode = search_mode or settings.embedding_search_mode
+
+        cache_key = (
+            vector_fingerprint(query_embedding),
+            normalize_text(query) if search_mode == "hybrid" else None,
+            max_results,
+            similarity_threshold,
+            search_mode,
+            mmr_lambda if diversify else None,
+            version,
+        )
+        cached = search_result_cache.get(cache_key)
+        if cached is not None:
+            logger.info(f"Found {len(cached)} similar embeddings (cached)")
+            return [dict(result) for result in cached]
+
+        index_method = (
+            await self._ann_index_method() if search_mode in ("ann", "hybrid") else None
+        )
+
+        if search_mode == "hybrid":
+            rows = await self._hybrid_search(
+                query, query_embedding, limit, similarity_threshold, index_method, diversify
+            )
+        elif index_method is not None:
+            rows = await self._ann_search(
+                query_embedding, limit, similarity_threshold, index_method, diversify
+            )
+        else:
+            rows = await self._exact_search(
+                query_embedding, limit, similarity_threshold, diversify
+            )
+
+        if diversify and len(rows) > max_results:
+            selected = maximal_marginal_relevance(
+                np.asarray(query_embedding[:EMBEDDING_INDEX_DIMENSION], dtype=np.float32),
+                np.asarray([_to_array(row["embedding_index"]) for row in rows]),
+                max_results,
+                mmr_lambda,
+            )
+            rows = [rows[index] for index in selected]
+
+        results = []
+        for rank, row in enumerate(rows, start=1):
+            row_dict = dict(row)
+            row_dict.pop("embedding_index", None)
+            row_dict["rank"] = rank
+            results.append(_parse_metadata(row_dict))
+
+        search_result_cache.set(cache_key, [dict(result) for result in results])
+        logger.info(f"Found {len(results)} similar embeddings")
+        return results
+
+    async def batch_similarity_search(
+        self,
+        queries: list[str],
+        max_results: int = settings.embedding_max_results,
+        similarity_threshold: float = settings.embedding_similarity_threshold,
+        search_mode: str | None = None,
+    ) -> list[list[dict[str, Any]]]:
+        """Search for several queries at once, returning the results of each query.
+
+        All queries are embedded together and searched in a single statement:
+        the query vectors are unnested and a ``LATERAL`` subquery runs the top-k
+        search for each of them. ``search_mode`` is ``"ann"`` or ``"exact"`` as
+        in ``similarity_search``; hybrid search is not available in batches and
+        uses the ANN path.
+        """
+        logger.info(f"Performing batch similarity search for {len(queries)} queries")
+
+        query_embeddings = await self.embed_queries(queries)
 
-        similarity_query = text("""
+        search_mode = search_mode or settings.embedding_search_mode
+        index_method = await self._ann_index_method() if search_mode != "exact" else None
+
+        candidate_limit = max_results * settings.embedding_ann_oversample
+        if index_method is not None:
+            await self._configure_ann(index_method, candidate_limit)
+            candidates = f"""(
+                    SELECT id, trained_document_id, chunk_index, content, metadata, embedding
+                    FROM embeddings
+                    ORDER BY embedding_index <=> CAST(
+                        subvector(q.query_vector, 1, {EMBEDDING_INDEX_DIMENSION})
+                        AS halfvec({EMBEDDING_INDEX_DIMENSION})
+                    )
+                    LIMIT :candidate_limit
+                )"""
+        else:
+            candidates = "embeddings"
+
+        similarity_query = text(f"""
+            WITH queries AS (
+                SELECT CAST(query_vector AS vector) AS query_vector, query_index
+                FROM unnest(CAST(:query_vectors AS text[]))
+                    WITH ORDINALITY AS q(query_vector, query_index)
+            )
+            SELECT
+                q.query_index,
+                m.id,
+                m.trained_document_id,
+                m.chunk_index,
+                m.content,
+                m.metadata,
+                m.similarity
+            FROM queries q
+            CROSS JOIN LATERAL (
+                SELECT
+                    c.id,
+                    c.trained_document_id,
+                    c.chunk_index,
+                    c.content,
+                    c.metadata,
+                    1 - (c.embedding <=> q.query_vector) AS similarity
+                FROM {candidates} c
+                WHERE 1 - (c.embedding <=> q.query_vector) > :threshold
+                ORDER BY c.embedding <=> q.query_vector
+                LIMIT :limit
+            ) m
+            ORDER BY q.query_index, m.similarity DESC
+        """)
+        params = {
+            "query_vectors": [PgVector(embedding).to_text() for embedding in query_embeddings],
+            "threshold": similarity_threshold,
+            "limit": max_results,
+        }
+        if index_method is not None:
+            params["candidate_limit"] = candidate_limit
+
+        result = await self.db.execute(similarity_query, params)
+
+        grouped: list[list[dict[str, Any]]] = [[] for _ in queries]
+        for row in result.mappings().fetchall():
+            row_dict = dict(row)
+            grouped[row_dict.pop("query_index") - 1].append(_parse_metadata(row_dict))
+        return grouped
+
+    async def _exact_search(
+        self,
+        query_embedding: list[float],
+        max_results: int,
+        similarity_threshold: float,
+        include_vectors: bool = False,
+    ) -> Sequence[RowMapping]:
+        """Run an exact cosine scan over the full-precision vectors."""
+        similarity_query = text(f"""
             SELECT
                 id,
                 trained_document_id,
                 chunk_index,
                 content,
+                metadata,{_vector_column(include_vectors)}
                 1 - (embedding <=> :query_vector) AS similarity
             FROM embeddings
             WHERE 1 - (embedding <=> :query_vector) > :threshold
             ORDER BY embedding <=> :query_vector
             LIMIT :limit
-        """)
+        """).bindparams(bindparam("query_vector", type_=Vector()))
+        statement: TextClause | TextualSelect = similarity_query
+        if include_vectors:
+            statement = similarity_query.columns(embedding_index=HALFVEC())
 
-        result = self.db.execute(
-            similarity_query,
+        result = await self.db.execute(
+            statement,
             {
                 "query_vector": query_embedding,
                 "threshold": similarity_threshold,
                 "limit": max_results,
             },
         )
+        return result.mappings().fetchall()
 
-        rows = result.mappings().fetchall()
-        results = []
-        for row in rows:
-            row_dict = dict(row)
-            if row_dict.get("metadata"):
-                try:
-                    row_dict["metadata"] = json.loads(row_dict["metadata"])
-                except (json.JSONDecodeError, TypeError):
-                    row_dict["metadata"] = None
-            results.append(row_dict)
+    async def _ann_search(
+        self,
+        query_embedding: list[float],
+        max_results: int,
+        similarity_threshold: float,
+        index_method: str,
+        include_vectors: bool = False,
+    ) -> Sequence[RowMapping]:
+        """Fetch candidates through the ANN index and re-rank them exactly."""
+        candidate_limit = max_results * settings.embedding_ann_oversample
+        await self._configure_ann(index_method, candidate_limit)
 
-        logger.info(f"Found {len(results)} similar embeddings")
-        return results
+        similarity_query = text(f"""
+            WITH candidates AS (
+                SELECT
+                    id, trained_document_id, chunk_index, content, metadata,
+                    embedding, embedding_index
+                FROM embeddings
+                ORDER BY embedding_index <=> CAST(
+                    :query_index_vector AS halfvec({EMBEDDING_INDEX_DIMENSION})
+                )
+                LIMIT :candidate_limit
+            )
+            SELECT
+                id,
+                trained_document_id,
+                chunk_index,
+                content,
+                metadata,{_vector_column(include_vectors)}
+                1 - (embedding <=> :query_vector) AS similarity
+            FROM candidates
+            WHERE 1 - (embedding <=> :query_vector) > :threshold
+            ORDER BY embedding <=> :query_vector
+            LIMIT :limit
+        """).bindparams(
+            bindparam("query_vector", type_=Vector()),
+            bindparam("query_index_vector", type_=HALFVEC()),
+        )
+        statement: TextClause | TextualSelect = similarity_query
+        if include_vectors:
+            statement = similarity_query.columns(embedding_index=HALFVEC())
+
+        result = await self.db.execute(
+            statement,
+            {
+                "query_vector": query_embedding,
+                "query_index_vector": query_embedding[:EMBEDDING_INDEX_DIMENSION],
+                "threshold": similarity_threshold,
+                "candidate_limit": candidate_limit,
+                "limit": max_results,
+            },
+        )
+        return result.mappings().fetchall()
+
+    async def _hybrid_search(
+        self,
+        query: str,
+        query_embedding: list[float],
+        max_results: int,
+        similarity_threshold: float,
+        index_method: str | None,
+        include_vectors: bool = False,
+    ) -> Sequence[RowMapping]:
+        """Fuse vector and full-text rankings with reciprocal-rank fusion.
+
+        Each side ranks up to ``max_results * embedding_ann_oversample``
+        candidates: the vector side by exact cosine distance above the
+        similarity threshold, fetched through the ANN index when available, and
+        the lexical side by ``ts_rank_cd`` over all text search configurations.
+        A chunk scores ``sum(1 / (embedding_rrf_k + rank))`` over the rankings it
+        appears in, so exact-term matches surface even when their cosine
+        similarity is low. Both rankings and the fusion run in one statement.
+        """
+        candidate_limit = max_results * settings.embedding_ann_oversample
+        if index_method is not None:
+            await self._configure_ann(index_method, candidate_limit)
+            vector_distance = (
+                "embedding_index <=> "
+                f"CAST(:query_index_vector AS halfvec({EMBEDDING_INDEX_DIMENSION}))"
+            )
+        else:
+            vector_distance = "embedding <=> :query_vector"
+
+        ts_query = " || ".join(
+            f"websearch_to_tsquery('{config}', :query)" for config in EMBEDDING_TEXT_SEARCH_CONFIGS
+        )
+
+        similarity_query = text(f"""
+            WITH vector_ranked AS (
+                SELECT id, row_number() OVER (ORDER BY distance) AS rank
+                FROM (
+                    SELECT id, embedding <=> :query_vector AS distance
+                    FROM embeddings
+                    ORDER BY {vector_distance}
+                    LIMIT :candidate_limit
+                ) nearest
+                WHERE 1 - distance > :threshold
+            ),
+            lexical_ranked AS (
+                SELECT id, row_number() OVER (ORDER BY score DESC) AS rank
+                FROM (
+                    SELECT id, ts_rank_cd(content_tsv, ts_query) AS score
+                    FROM embeddings, (SELECT {ts_query}) AS q(ts_query)
+                    WHERE content_tsv @@ ts_query
+                    ORDER BY score DESC
+                    LIMIT :candidate_limit
+                ) matches
+            ),
+            fused AS (
+                SELECT id, SUM(1.0 / (:rrf_k + rank)) AS fusion_score
+                FROM (
+                    SELECT id, rank FROM vector_ranked
+                    UNION ALL
+                    SELECT id, rank FROM lexical_ranked
+                ) rankings
+                GROUP BY id
+            )
+            SELECT
+                e.id,
+                e.trained_document_id,
+                e.chunk_index,
+                e.content,
+                e.metadata,{_vector_column(include_vectors, "e.")}
+                1 - (e.embedding <=> :query_vector) AS similarity
+            FROM fused f
+            JOIN embeddings e ON e.id = f.id
+            ORDER BY f.fusion_score DESC
+            LIMIT :limit
+        """).bindparams(bindparam("query_vector", type_=Vector()))
+        params = {
+            "query": query,
+            "query_vector": query_embedding,
+            "threshold": similarity_threshold,
+            "candidate_limit": candidate_limit,
+            "rrf_k": settings.embedding_rrf_k,
+            "limit": max_results,
+        }
+        if index_method is not None:
+            similarity_query = similarity_query.bindparams(
+                bindparam("query_index_vector", type_=HALFVEC())
+            )
+            params["query_index_vector"] = query_embedding[:EMBEDDING_INDEX_DIMENSION]
+        statement: TextClause | TextualSelect = similarity_query
+        if include_vectors:
+            statement = similarity_query.columns(embedding_index=HALFVEC())
+
+        result = await self.db.execute(statement, params)
+        return result.mappings().fetchall()
+
+    async def _configure_ann(self, index_method: str, candidate_limit: int) -> None:
+        """Size the ANN index scan for this transaction."""
+        if index_method == "hnsw":
+            ef_search = max(settings.embedding_hnsw_ef_search, candidate_limit)
+            await self.db.execute(
+                text("SELECT set_config('hnsw.ef_search', :value, true)"),
+                {"value": str(ef_search)},
+            )
+        elif index_method == "ivfflat":
+            await self.db.execute(
+                text("SELECT set_config('ivfflat.probes', :value, true)"),
+                {"value": str(settings.embedding_ivfflat_probes)},
+            )
+
+    async def _ann_index_method(self) -> str | None:
+        """Return the access method of the ANN index, or None if it is missing."""
+        cached = ann_index_cache.get(EMBEDDING_ANN_INDEX_NAME)
+        if cached is not None:
+            method: str | None = cached[0]
+            return method
+
+        result = await self.db.execute(
+            text(
+                "SELECT indexdef FROM pg_indexes "
+                "WHERE tablename = 'embeddings' AND indexname = :name"
+            ),
+            {"name": EMBEDDING_ANN_INDEX_NAME},
+        )
+        index_definition = result.scalar()
+
+        method = None
+        if index_definition:
+            match = re.search(r"USING (\w+)", index_definition)
+            method = match.group(1).lower() if match else None
+
+        if method is None:
+            logger.warning("ANN index not found, similarity search will use exact scan")
+
+        ann_index_cache.set(EMBEDDING_ANN_INDEX_NAME, (method,))
+        return method
+
+
+def _vector_column(include_vectors: bool, prefix: str = "") -> str:
+    """Select-list entry for the half-precision vector used by MMR, if requested."""
+    return f"\n                {prefix}embedding_index," if include_vectors else ""
+
+
+def _parse_metadata(row: dict[str, Any]) -> dict[str, Any]:
+    """Decode the JSON metadata of a search result row in place."""
+    if row.get("metadata"):
+        try:
+            row["metadata"] = json.loads(row["metadata"])
+        except (json.JSONDecodeError, TypeError):
+            row["metadata"] = None
+    return row
+
+
+def _to_array(vector: Any) -> np.ndarray:
+    """Convert a pgvector value (HalfVector, ndarray or list) to a float32 array."""
+    if hasattr(vector, "to_numpy"):
+        vector = vector.to_numpy()
+    return np.asarray(vector, dtype=np.float32)
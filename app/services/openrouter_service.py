@@ -1,8 +1,18 @@
 """OpenRouter LLM service."""
 
+import asyncio
 import logging
+import random
 import re
+import threading
+import time
+from collections.abc import AsyncIterator, Hashable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, NoReturn
 
+import httpx
+import openai
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, SystemMessage
 from langchain_openai import OpenAIEmbeddings
 from langchain_openai.chat_models import ChatOpenAI
 
@@ -13,19 +23,43 @@ from app.exceptions import (
     OpenRouterServerException,
     OpenRouterUnauthorizedException,
 )
+from app.singleflight import SingleFlight
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
 
 
-class OpenRouterService:
-    """Service for OpenRouter API operations."""
+class OpenRouterClients:
+    """Long-lived OpenRouter models sharing pooled HTTP connections.
+
+    One instance is meant to live for the whole application so that keep-alive
+    connections and TLS sessions are reused across requests. Embedding requests
+    are retried by ``OpenRouterService``, so the embedding client's own retries
+    are disabled; chat requests rely on the client's retries.
+    """
 
     def __init__(self) -> None:
+        limits = httpx.Limits(
+            max_connections=settings.openrouter_http_max_connections,
+            max_keepalive_connections=settings.openrouter_http_max_keepalive_connections,
+            keepalive_expiry=settings.openrouter_http_keepalive_expiry_seconds,
+        )
+        self.timeout = httpx.Timeout(
+            settings.openrouter_http_read_timeout_seconds,
+            connect=settings.openrouter_http_connect_timeout_seconds,
+            pool=settings.openrouter_http_pool_timeout_seconds,
+        )
+        self.http_client = httpx.Client(limits=limits, timeout=self.timeout)
+        self.http_async_client = httpx.AsyncClient(limits=limits, timeout=self.timeout)
+
         self.embedding_model = OpenAIEmbeddings(
             model=settings.openrouter_embedding_model,
             openai_api_key=settings.openrouter_api_key,
             openai_api_base=settings.openrouter_base_url,
+            request_timeout=self.timeout,
+            max_retries=0,
+            http_client=self.http_client,
+            http_async_client=self.http_async_client,
         )
         self.chat_model = ChatOpenAI(
             model=settings.openrouter_chat_model,
@@ -33,56 +67,296 @@ class OpenRouterService:
             base_url=settings.openrouter_base_url,
             temperature=settings.openrouter_temperature,
             max_tokens=settings.openrouter_max_tokens,
+            timeout=self.timeout,
+            max_retries=settings.openrouter_max_retries,
+            http_client=self.http_client,
+            http_async_client=self.http_async_client,
         )
 
+    async def aclose(self) -> None:
+        """Close the underlying HTTP connection pools."""
+        self.http_client.close()
+        await self.http_async_client.aclose()
+
+
+_clients: OpenRouterClients | None = None
+_clients_lock = threading.Lock()
+
+
+def get_openrouter_clients() -> OpenRouterClients:
+    """Get the application-wide OpenRouter clients, creating them on first use."""
+    global _clients
+    with _clients_lock:
+        if _clients is None:
+            _clients = OpenRouterClients()
+        return _clients
+
+
+async def close_openrouter_clients() -> None:
+    """Close the application-wide OpenRouter clients, if they were created."""
+    global _clients
+    with _clients_lock:
+        clients, _clients = _clients, None
+    if clients is not None:
+        await clients.aclose()
+
+
+embedding_flights = SingleFlight("openrouter_embedding_coalescing")
+chat_flights = SingleFlight("openrouter_chat_coalescing")
+
+
+class OpenRouterService:
+    """Service for OpenRouter API operations.
+
+    Concurrent identical single-text embedding and chat calls are coalesced
+    into one provider request whose result every caller receives.
+    """
+
+    def __init__(self, clients: OpenRouterClients | None = None) -> None:
+        clients = clients or get_openrouter_clients()
+        self.embedding_model = clients.embedding_model
+        self.chat_model = clients.chat_model
+        self.embedding_batch_size = settings.openrouter_embedding_batch_size
+        self.embedding_max_concurrency = settings.openrouter_embedding_max_concurrency
+        self.max_retries = settings.openrouter_max_retries
+        self.retry_backoff_seconds = settings.openrouter_retry_backoff_seconds
+        self.coalescing_enabled = settings.openrouter_request_coalescing_enabled
+
     def generate_embedding(self, text: str) -> list[float]:
         """Generate embedding for a single text."""
-        try:
-            logger.debug(f"Generating embedding for text ({len(text)} chars)")
-            vector = self.embedding_model.embed_query(text)
-            return vector
-        except Exception as e:
-            self._handle_error(e)
+        if not self.coalescing_enabled:
+            return self._generate_embedding(text)
+        key = (settings.openrouter_embedding_model, text)
+        return embedding_flights.do(key, self._generate_embedding, text)
+
+    async def agenerate_embedding(self, text: str) -> list[float]:
+        """Generate embedding for a single text without blocking the event loop."""
+        if not self.coalescing_enabled:
+            return await self._agenerate_embedding(text)
+        key = (settings.openrouter_embedding_model, text)
+        return await embedding_flights.ado(key, self._agenerate_embedding, text)
+
+    def _generate_embedding(self, text: str) -> list[float]:
+        """Request the embedding of a single text."""
+        logger.debug(f"Generating embedding for text ({len(text)} chars)")
+        return self._embed_batch([text])[0]
+
+    async def _agenerate_embedding(self, text: str) -> list[float]:
+        """Request the embedding of a single text asynchronously."""
+        logger.debug(f"Generating embedding for text ({len(text)} chars)")
+        return (await self._aembed_batch([text]))[0]
 
     def generate_embeddings(self, texts: list[str]) -> list[list[float]]:
-        """Generate embeddings for multiple texts."""
-        try:
-            logger.debug(f"Generating embeddings for {len(texts)} texts")
-            vectors = self.embedding_model.embed_documents(texts)
-            return vectors
-        except Exception as e:
-            self._handle_error(e)
+        """Generate embeddings for multiple texts.
+
+        Texts are split into batches of ``embedding_batch_size`` that are embedded
+        concurrently, up to ``embedding_max_concurrency`` at a time. Each batch is
+        retried on its own, so a rate-limited batch does not fail the others.
+        Vectors are returned in the same order as ``texts``.
+        """
+        if not texts:
+            return []
+
+        batches = self._split_batches(texts)
+        if len(batches) == 1:
+            return self._embed_batch(batches[0])
+
+        max_workers = min(self.embedding_max_concurrency, len(batches))
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            batch_vectors = list(executor.map(self._embed_batch, batches))
+
+        return [vector for vectors in batch_vectors for vector in vectors]
+
+    async def agenerate_embeddings(self, texts: list[str]) -> list[list[float]]:
+        """Generate embeddings for multiple texts without blocking the event loop.
+
+        Batching, concurrency and retry behave as in ``generate_embeddings``.
+        """
+        if not texts:
+            return []
+
+        batches = self._split_batches(texts)
+        semaphore = asyncio.Semaphore(self.embedding_max_concurrency)
+
+        async def embed(batch: list[str]) -> list[list[float]]:
+            async with semaphore:
+                return await self._aembed_batch(batch)
+
+        batch_vectors = await asyncio.gather(*(embed(batch) for batch in batches))
+        return [vector for vectors in batch_vectors for vector in vectors]
+
+    def _split_batches(self, texts: list[str]) -> list[list[str]]:
+        """Split texts into embedding batches."""
+        batches = [
+            texts[start:start + self.embedding_batch_size]
+            for start in range(0, len(texts), self.embedding_batch_size)
+        ]
+        logger.debug(f"Generating embeddings for {len(texts)} texts in {len(batches)} batches")
+        return batches
+
+    def _embed_batch(self, texts: list[str]) -> list[list[float]]:
+        """Embed one batch, retrying transient errors with backoff."""
+        attempt = 0
+        while True:
+            try:
+                return self.embedding_model.embed_documents(texts)
+            except Exception as e:
+                if attempt >= self.max_retries or not self._is_retryable(e):
+                    self._handle_error(e)
+                delay = self._retry_delay(attempt)
+                attempt += 1
+                logger.warning(
+                    f"Embedding batch of {len(texts)} texts failed with {e!r}, "
+                    f"retrying in {delay:.1f}s ({attempt}/{self.max_retries})"
+                )
+                time.sleep(delay)
+
+    async def _aembed_batch(self, texts: list[str]) -> list[list[float]]:
+        """Embed one batch asynchronously, retrying transient errors with backoff."""
+        attempt = 0
+        while True:
+            try:
+                return await self.embedding_model.aembed_documents(texts)
+            except Exception as e:
+                if attempt >= self.max_retries or not self._is_retryable(e):
+                    self._handle_error(e)
+                delay = self._retry_delay(attempt)
+                attempt += 1
+                logger.warning(
+                    f"Embedding batch of {len(texts)} texts failed with {e!r}, "
+                    f"retrying in {delay:.1f}s ({attempt}/{self.max_retries})"
+                )
+                await asyncio.sleep(delay)
+
+    def _is_retryable(self, error: Exception) -> bool:
+        """Whether a failed request is worth retrying.
+
+        Only connection failures, timeouts, rate limits and server errors are
+        transient; anything else, including unrecognised exceptions, fails fast.
+        """
+        if isinstance(error, (openai.APIConnectionError, httpx.TransportError)):
+            return True
+        if isinstance(error, openai.APIStatusError):
+            return error.status_code == 429 or error.status_code >= 500
+        return False
+
+    def _retry_delay(self, attempt: int) -> float:
+        """Exponential backoff with jitter for the given attempt."""
+        base = self.retry_backoff_seconds * (2.0**attempt)
+        return base + random.uniform(0, self.retry_backoff_seconds)
 
     def generate_chat_response(
         self,
-        messages: list[dict],
+        messages: list[dict[str, Any]],
         system_prompt: str | None = None,
     ) -> str:
         """Generate a chat response using the chat model."""
+        if not self.coalescing_enabled:
+            return self._generate_chat_response(messages, system_prompt)
+        key = self._chat_key(messages, system_prompt)
+        return chat_flights.do(key, self._generate_chat_response, messages, system_prompt)
+
+    async def agenerate_chat_response(
+        self,
+        messages: list[dict[str, Any]],
+        system_prompt: str | None = None,
+    ) -> str:
+        """Generate a chat response without blocking the event loop."""
+        if not self.coalescing_enabled:
+            return await self._agenerate_chat_response(messages, system_prompt)
+        key = self._chat_key(messages, system_prompt)
+        return await chat_flights.ado(key, self._agenerate_chat_response, messages, system_prompt)
+
+    def _generate_chat_response(
+        self,
+        messages: list[dict[str, Any]],
+        system_prompt: str | None = None,
+    ) -> str:
+        """Request a chat response."""
         try:
-            from langchain_core.messages import HumanMessage, SystemMessage
+            langchain_messages = self._to_langchain_messages(messages, system_prompt)
+            response = self.chat_model.invoke(langchain_messages)
+            return _message_text(response.content)
+        except Exception as e:
+            self._handle_error(e)
 
-            langchain_messages: list = []
-            if system_prompt:
-                langchain_messages.append(SystemMessage(content=system_prompt))
+    async def _agenerate_chat_response(
+        self,
+        messages: list[dict[str, Any]],
+        system_prompt: str | None = None,
+    ) -> str:
+        """Request a chat response asynchronously."""
+        try:
+            langchain_messages = self._to_langchain_messages(messages, system_prompt)
+            response = await self.chat_model.ainvoke(langchain_messages)
+            return _message_text(response.content)
+        except Exception as e:
+            self._handle_error(e)
 
-            for msg in messages:
-                if msg["role"] == "user":
-                    langchain_messages.append(HumanMessage(content=msg["content"]))
-                elif msg["role"] == "assistant":
-                    langchain_messages.append(SystemMessage(content=msg["content"]))
+    def stream_chat_response(
+        self,
+        messages: list[dict[str, Any]],
+        system_prompt: str | None = None,
+    ) -> Iterator[str]:
+        """Stream a chat response token by token as it is generated."""
+        try:
+            langchain_messages = self._to_langchain_messages(messages, system_prompt)
+            for chunk in self.chat_model.stream(langchain_messages):
+                if isinstance(chunk.content, str) and chunk.content:
+                    yield chunk.content
+        except Exception as e:
+            self._handle_error(e)
 
-            response = self.chat_model.invoke(langchain_messages)
-            return response.content
+    async def astream_chat_response(
+        self,
+        messages: list[dict[str, Any]],
+        system_prompt: str | None = None,
+    ) -> AsyncIterator[str]:
+        """Stream a chat response token by token without blocking the event loop."""
+        try:
+            langchain_messages = self._to_langchain_messages(messages, system_prompt)
+            async for chunk in self.chat_model.astream(langchain_messages):
+                if isinstance(chunk.content, str) and chunk.content:
+                    yield chunk.content
         except Exception as e:
             self._handle_error(e)
 
-    def _handle_error(self, e: Exception) -> None:
+    def _chat_key(self, messages: list[dict[str, Any]], system_prompt: str | None) -> Hashable:
+        """Coalescing key identifying a chat request by model and payload."""
+        return (
+            settings.openrouter_chat_model,
+            system_prompt,
+            tuple((message["role"], message["content"]) for message in messages),
+        )
+
+    def _to_langchain_messages(
+        self,
+        messages: list[dict[str, Any]],
+        system_prompt: str | None = None,
+    ) -> list[BaseMessage]:
+        """Convert role/content dicts to langchain messages."""
+        message_types = {"system": SystemMessage, "user": HumanMessage, "assistant": AIMessage}
+
+        langchain_messages: list[BaseMessage] = []
+        if system_prompt:
+            langchain_messages.append(SystemMessage(content=system_prompt))
+
+        for msg in messages:
+            message_type = message_types.get(msg["role"].lower())
+            if message_type is not None:
+                langchain_messages.append(message_type(content=msg["content"]))
+
+        return langchain_messages
+
+    def _handle_error(self, e: Exception) -> NoReturn:
         """Handle OpenRouter API errors."""
         logger.error(e, exc_info=True)
         message = str(e)
 
-        status_code = self._extract_status_code(message)
+        if isinstance(e, openai.APIStatusError):
+            status_code = e.status_code
+        else:
+            status_code = self._extract_status_code(message)
         error_message = self._extract_error_message(message)
 
         if status_code == 400:
@@ -130,3 +404,12 @@ class OpenRouterService:
         if json_match:
             return json_match.group(1)
         return message
+
+
+def _message_text(content: str | list[str | dict[str, Any]]) -> str:
+    """Text of a chat response, joining the text parts of list content."""
+    if isinstance(content, str):
+        return content
+    return "".join(
+        part if isinstance(part, str) else str(part.get("text", "")) for part in content
+    )
@@ -2,15 +2,55 @@
 
 import hashlib
 import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
 from io import BytesIO
 
 from pypdf import PdfReader
 
 from app.config import get_settings
+from app.pdf_worker import extract_page_range
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
 
+_extraction_pool: ProcessPoolExecutor | None = None
+_extraction_pool_lock = threading.Lock()
+
+
+def resolve_extraction_workers(workers: int = settings.pdf_extraction_workers) -> int:
+    """Resolve the configured worker count, where 0 means one per CPU."""
+    if workers <= 0:
+        return os.cpu_count() or 1
+    return workers
+
+
+def get_extraction_pool() -> ProcessPoolExecutor:
+    """Get the process pool shared by all PDF extractions, starting it on first use.
+
+    Workers are spawned, so each one only imports ``app.pdf_worker`` rather than
+    inheriting the parent's threads and connections.
+    """
+    global _extraction_pool
+    with _extraction_pool_lock:
+        if _extraction_pool is None:
+            _extraction_pool = ProcessPoolExecutor(
+                max_workers=resolve_extraction_workers(),
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _extraction_pool
+
+
+def shutdown_extraction_pool() -> None:
+    """Shut down the PDF extraction pool, if it was started."""
+    global _extraction_pool
+    with _extraction_pool_lock:
+        if _extraction_pool is not None:
+            _extraction_pool.shutdown(wait=False, cancel_futures=True)
+            _extraction_pool = None
+
 
 class PdfService:
     """Service for PDF processing operations."""
@@ -19,25 +59,63 @@ class PdfService:
         self,
         chunk_size: int = settings.pdf_chunk_size,
         chunk_overlap: int = settings.pdf_chunk_overlap,
+        extraction_workers: int = settings.pdf_extraction_workers,
+        pages_per_task: int = settings.pdf_pages_per_task,
+        parallel_min_pages: int = settings.pdf_parallel_min_pages,
     ) -> None:
         self.chunk_size = chunk_size
         self.chunk_overlap = chunk_overlap
+        self.extraction_workers = resolve_extraction_workers(extraction_workers)
+        self.pages_per_task = pages_per_task
+        self.parallel_min_pages = parallel_min_pages
 
     def extract_text(self, file_content: bytes, filename: str) -> str:
-        """Extract text from a PDF file."""
+        """Extract text from a PDF file.
+
+        Documents of at least ``parallel_min_pages`` pages are split into
+        ranges of ``pages_per_task`` pages that are extracted in the shared
+        process pool when more than one worker is configured.
+        """
         logger.info(f"Extracting text from PDF: {filename}")
         pdf_document = PdfReader(BytesIO(file_content))
-        text_parts: list[str] = []
-
-        for page in pdf_document.pages:
-            page_text = page.extract_text()
-            if page_text:
-                text_parts.append(page_text)
-
-        text = "\n".join(text_parts)
+        page_count = len(pdf_document.pages)
+
+        if (
+            self.extraction_workers > 1
+            and page_count >= self.parallel_min_pages
+            and page_count > self.pages_per_task
+        ):
+            page_texts = self._extract_parallel(file_content, page_count)
+        else:
+            page_texts = [page.extract_text() for page in pdf_document.pages]
+
+        text = "\n".join(page_text for page_text in page_texts if page_text)
         logger.info(f"Extracted {len(text)} characters from PDF: {filename}")
         return text
 
+    def _extract_parallel(self, file_content: bytes, page_count: int) -> list[str]:
+        """Extract page texts across the shared process pool, preserving page order.
+
+        Tasks carry the PDF and a page range; each worker parses a document
+        once however many of its ranges it runs.
+        """
+        checksum = self.calculate_checksum(file_content)
+        ranges = [
+            (start, min(start + self.pages_per_task, page_count))
+            for start in range(0, page_count, self.pages_per_task)
+        ]
+        logger.debug(f"Extracting {page_count} pages in {len(ranges)} tasks")
+
+        pool = get_extraction_pool()
+        futures = [
+            pool.submit(extract_page_range, checksum, file_content, start, stop)
+            for start, stop in ranges
+        ]
+        page_texts: list[str] = []
+        for future in futures:
+            page_texts.extend(future.result())
+        return page_texts
+
     def chunk_text(self, text: str, filename: str) -> list[str]:
         """Split text into overlapping chunks."""
         logger.info(f"Chunking text from {filename}")
@@ -0,0 +1,262 @@
+"""Token-budgeted prompt assembly for RAG."""
+
+import logging
+from typing import Any
+
+from app.cache import register_counters
+from app.config import get_settings
+from app.tokenizer import (
+    MESSAGE_OVERHEAD_TOKENS,
+    count_message_tokens,
+    count_tokens,
+    truncate_tokens,
+)
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# Smallest useful excerpt when the best chunk has to be truncated to fit.
+MIN_CHUNK_TOKENS = 64
+NO_CONTEXT_TEXT = "No relevant documents found."
+# Shortest suffix/prefix match treated as chunk overlap rather than coincidence.
+MIN_OVERLAP_CHARS = 16
+
+prompt_metrics = register_counters("rag_prompt")
+
+
+def merge_adjacent_chunks(results: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    """Merge retrieved chunks that are neighbours in the same document.
+
+    Chunks are cut with an overlap, so contiguous ``chunk_index`` runs of one
+    document repeat text at every boundary. Each run becomes one passage with the
+    overlap removed, ranked by its best chunk. A passage keeps its source results
+    under ``chunks`` for citations. Passages are returned in retrieval order.
+    """
+    by_document: dict[str, list[dict[str, Any]]] = {}
+    for result in results:
+        by_document.setdefault(str(result.get("trained_document_id")), []).append(result)
+
+    passages: list[dict[str, Any]] = []
+    for chunks in by_document.values():
+        chunks.sort(key=lambda r: r.get("chunk_index", 0))
+        run = [chunks[0]]
+        for chunk in chunks[1:]:
+            if chunk.get("chunk_index", 0) == run[-1].get("chunk_index", 0) + 1:
+                run.append(chunk)
+            else:
+                passages.append(_merge_run(run))
+                run = [chunk]
+        passages.append(_merge_run(run))
+
+    prompt_metrics.increment("chunks_merged", len(results) - len(passages))
+    return sorted(passages, key=_retrieval_order)
+
+
+def _retrieval_order(result: dict[str, Any]) -> tuple[float, float]:
+    """Sort key putting search results in retrieval order.
+
+    ``rank`` is the position assigned by the search after fusion or reranking;
+    results without one fall back to cosine similarity.
+    """
+    rank = result.get("rank")
+    return (float("inf") if rank is None else rank, -result.get("similarity", 0))
+
+
+def _merge_run(run: list[dict[str, Any]]) -> dict[str, Any]:
+    """Merge a run of contiguous chunks into one passage."""
+    content = run[0].get("content", "")
+    for chunk in run[1:]:
+        next_content = chunk.get("content", "")
+        overlap = _overlap_length(content, next_content)
+        prompt_metrics.increment("overlap_chars_removed", overlap)
+        content += next_content[overlap:] if overlap else f"\n{next_content}"
+
+    return {
+        "trained_document_id": run[0].get("trained_document_id"),
+        "chunk_index": run[0].get("chunk_index", 0),
+        "chunk_indices": [chunk.get("chunk_index", 0) for chunk in run],
+        "content": content,
+        "similarity": max(chunk.get("similarity", 0) for chunk in run),
+        "rank": min((c["rank"] for c in run if c.get("rank") is not None), default=None),
+        "chunks": run,
+    }
+
+
+def _overlap_length(
+    previous: str,
+    following: str,
+    expected: int = settings.pdf_chunk_overlap,
+) -> int:
+    """Length of the text shared by the end of ``previous`` and start of ``following``.
+
+    The configured chunk overlap is tried first, so repetitive text is not
+    over-trimmed; otherwise the longest suffix/prefix match is used.
+    """
+    shortest = min(len(previous), len(following))
+    if MIN_OVERLAP_CHARS <= expected <= shortest and previous.endswith(following[:expected]):
+        return expected
+
+    for length in range(shortest, MIN_OVERLAP_CHARS - 1, -1):
+        if previous.endswith(following[:length]):
+            return length
+    return 0
+
+
+class PromptBuilder:
+    """Assembles RAG messages within a token budget.
+
+    The system instructions, conversation summary and question are always
+    included. History gets up to ``max_history_tokens`` of what is left, newest
+    messages first, and retrieved chunks fill the remainder in retrieval order;
+    the lowest-ranked chunks are dropped and, if even the best one does not fit,
+    it is truncated.
+    """
+
+    def __init__(
+        self,
+        system_prompt: str,
+        max_tokens: int = settings.rag_prompt_max_tokens,
+        max_history_tokens: int = settings.conversation_history_max_tokens,
+    ) -> None:
+        """Set the system instructions and the token budgets."""
+        self.system_prompt = system_prompt
+        self.max_tokens = max_tokens
+        self.max_history_tokens = max_history_tokens
+
+    def build(
+        self,
+        question: str,
+        results: list[dict[str, Any]],
+        history: list[dict[str, Any]],
+        summary: str | None = None,
+    ) -> dict[str, Any]:
+        """Build the messages for a question.
+
+        Returns a dict with the ``messages``, the search ``results`` that made it
+        into the context, and the token count of each section.
+        """
+        question_tokens = count_tokens(question) + MESSAGE_OVERHEAD_TOKENS
+        system_tokens = count_tokens(self._system_content("", summary)) + MESSAGE_OVERHEAD_TOKENS
+        remaining = self.max_tokens - system_tokens - question_tokens
+
+        kept_history, history_tokens = self._fit_history(
+            history, min(self.max_history_tokens, max(remaining, 0))
+        )
+        remaining -= history_tokens
+
+        blocks, included, truncated = self._fit_chunks(results, remaining)
+        context = "\n\n".join(blocks) if blocks else NO_CONTEXT_TEXT
+        context_tokens = count_tokens(context)
+
+        messages = [{"role": "system", "content": self._system_content(context, summary)}]
+        messages.extend(kept_history)
+        messages.append({"role": "user", "content": question})
+
+        tokens = {
+            "system": system_tokens,
+            "history": history_tokens,
+            "context": context_tokens,
+            "question": question_tokens,
+            "total": system_tokens + history_tokens + context_tokens + question_tokens,
+        }
+        self._record(tokens, results, included, truncated, len(history) - len(kept_history))
+
+        return {"messages": messages, "results": included, "tokens": tokens}
+
+    def _fit_history(
+        self, history: list[dict[str, Any]], budget: int
+    ) -> tuple[list[dict[str, Any]], int]:
+        """Keep the newest history messages that fit in the budget.
+
+        Messages are costed as in ConversationMemoryService, so a history it
+        loaded within ``max_history_tokens`` is kept whole unless the rest of
+        the prompt leaves less room.
+        """
+        kept: list[dict[str, Any]] = []
+        used = 0
+        for message in reversed(history):
+            cost = count_message_tokens(message)
+            if used + cost > budget:
+                break
+            kept.append(message)
+            used += cost
+        kept.reverse()
+        return kept, used
+
+    def _fit_chunks(
+        self, results: list[dict[str, Any]], budget: int
+    ) -> tuple[list[str], list[dict[str, Any]], int]:
+        """Select the best-ranked chunks that fit in the budget."""
+        ranked = sorted(results, key=_retrieval_order)
+        blocks: list[str] = []
+        included: list[dict[str, Any]] = []
+        truncated = 0
+        used = 0
+
+        for result in ranked:
+            header = self._chunk_header(result)
+            block = f"{header}\n{result.get('content', '')}"
+            cost = count_tokens(block) + 1
+            if used + cost <= budget:
+                blocks.append(block)
+                included.append(result)
+                used += cost
+                continue
+
+            room = budget - used - count_tokens(header) - 2
+            if not included and room >= MIN_CHUNK_TOKENS:
+                blocks.append(f"{header}\n{truncate_tokens(result.get('content', ''), room)}")
+                included.append(result)
+                truncated += 1
+                used = budget
+
+        return blocks, included, truncated
+
+    def _chunk_header(self, result: dict[str, Any]) -> str:
+        """Citation header of a context chunk or merged passage."""
+        doc_id = result.get("trained_document_id", "unknown")
+        chunk_indices = result.get("chunk_indices") or [result.get("chunk_index", 0)]
+        similarity = result.get("similarity", 0)
+        if len(chunk_indices) == 1:
+            chunks = f"Chunk {chunk_indices[0]}"
+        else:
+            chunks = f"Chunks {chunk_indices[0]}-{chunk_indices[-1]}"
+        return f"[Document {doc_id}, {chunks}, Score: {similarity:.2f}]"
+
+    def _system_content(self, context: str, summary: str | None) -> str:
+        """System message with instructions, retrieved context and summary."""
+        content = f"""{self.system_prompt}
+
+            Use the following context from legal documents to answer the user's question:
+
+            {context}
+
+            Cite your sources using the format [Document ID, Chunk Index] after each relevant statement."""  # noqa: E501
+        if summary:
+            content += f"\n\nSummary of the earlier conversation:\n{summary}"
+        return content
+
+    def _record(
+        self,
+        tokens: dict[str, int],
+        results: list[dict[str, Any]],
+        included: list[dict[str, Any]],
+        truncated: int,
+        history_dropped: int,
+    ) -> None:
+        """Log and count the token usage of a prompt."""
+        dropped = len(results) - len(included)
+        logger.info(
+            f"Prompt tokens: system={tokens['system']} history={tokens['history']} "
+            f"context={tokens['context']} question={tokens['question']} "
+            f"total={tokens['total']}/{self.max_tokens}; chunks kept={len(included)} "
+            f"dropped={dropped} truncated={truncated}"
+        )
+
+        prompt_metrics.increment("prompts")
+        for section, count in tokens.items():
+            prompt_metrics.increment(f"tokens_{section}", count)
+        prompt_metrics.increment("chunks_included", len(included))
+        prompt_metrics.increment("chunks_dropped", dropped)
+        prompt_metrics.increment("chunks_truncated", truncated)
+        prompt_metrics.increment("history_messages_dropped", history_dropped)
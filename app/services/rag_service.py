@@ -2,15 +2,24 @@
 
 import json
 import logging
+from collections.abc import AsyncIterator, Hashable
 from datetime import datetime
+from typing import Any
 from uuid import UUID
 
-from sqlalchemy.orm import Session
+from sqlalchemy import RowMapping
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.cache import SemanticCache
 from app.config import get_settings
+from app.database import AsyncUnitOfWork, release_connection
+from app.exceptions import OpenRouterException
 from app.models import MessageRole
-from app.repositories import ConversationRepository, MessageRepository
+from app.repositories import AsyncConversationRepository, AsyncMessageRepository
 from app.services import EmbeddingService, OpenRouterService
+from app.services.conversation_memory_service import ConversationMemoryService
+from app.services.embedding_service import corpus_version
+from app.services.prompt_builder import PromptBuilder, merge_adjacent_chunks
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
@@ -19,122 +28,248 @@ RAG_SYSTEM_PROMPT = """You are a legal assistant specializing in Lebanese law.
 Answer based only on the provided documents. Always cite your sources. 
 Stay in character as a legal professional. Use Arabic, French, or English as appropriate."""
 
+answer_cache = SemanticCache(
+    "rag_answer",
+    maxsize=settings.rag_answer_cache_size,
+    ttl_seconds=settings.rag_answer_cache_ttl_seconds,
+    threshold=settings.rag_answer_cache_similarity_threshold,
+)
+
 
 class RAGService:
     """Service for RAG-based question answering."""
 
-    def __init__(self, db: Session) -> None:
+    def __init__(
+        self,
+        db: AsyncSession,
+        openrouter_service: OpenRouterService | None = None,
+    ) -> None:
         self.db = db
-        self.embedding_service = EmbeddingService(db)
-        self.openrouter_service = OpenRouterService()
-        self.conversation_repository = ConversationRepository(db)
-        self.message_repository = MessageRepository(db)
+        self.openrouter_service = openrouter_service or OpenRouterService()
+        self.embedding_service = EmbeddingService(db, self.openrouter_service)
+        self.memory_service = ConversationMemoryService(db, self.openrouter_service)
+        self.prompt_builder = PromptBuilder(RAG_SYSTEM_PROMPT)
+        self.conversation_repository = AsyncConversationRepository(db)
+        self.message_repository = AsyncMessageRepository(db)
 
-    def ask_question(
+    async def ask_question(
         self,
         question: str,
         user_id: UUID,
         conversation_id: UUID | None = None,
+        diversify: bool | None = None,
     ) -> tuple[str, list[dict], UUID]:
-        """Answer a question using RAG."""
+        """Answer a question using RAG.
+
+        Retrieval and generation run outside any unit of work, and the database
+        connection is released before every provider call; the turn is then
+        saved in a short unit of work, so a new conversation, the question and
+        the answer are committed together or not at all. Questions asked before
+        a conversation has any history are answered from the context alone, so
+        their answers are cached and reused for later questions with a
+        near-identical embedding, as long as the trained corpus has not changed
+        in between. Folding older messages into the conversation summary is left
+        to the caller, after the response, see ``compact_conversation``.
+        """
+        turn = await self._load_turn(question, user_id, conversation_id)
+
+        answer_key = await self._answer_cache_key(turn, diversify)
+        cached = answer_cache.get(*answer_key) if answer_key is not None else None
+        if cached is not None:
+            logger.info("Serving answer from the semantic answer cache")
+            turn["citations"] = cached["citations"]
+            await self._save_turn(turn, cached["answer"])
+            return cached["answer"], turn["citations"], turn["conversation_id"]
+
+        await self._prepare_turn(turn, diversify)
+
+        answer = await self.openrouter_service.agenerate_chat_response(turn["messages"])
+
+        await self._save_turn(turn, answer)
+
+        if answer_key is not None:
+            answer_cache.set(*answer_key, {"answer": answer, "citations": turn["citations"]})
+
+        logger.info(f"Generated answer with {len(turn['citations'])} citations")
+        return answer, turn["citations"], turn["conversation_id"]
+
+    async def stream_question(
+        self,
+        question: str,
+        user_id: UUID,
+        conversation_id: UUID | None = None,
+        diversify: bool | None = None,
+    ) -> AsyncIterator[dict[str, Any]]:
+        """Answer a question using RAG, streaming the answer as events.
+
+        Retrieval runs before this returns, so lookup errors are raised
+        immediately. The returned iterator yields ``token`` events as the
+        answer is generated and a final ``citations`` event once the turn has
+        been saved, or an ``error`` event if generation fails. As in
+        ``ask_question``, the turn is saved only once it is complete, and an
+        answer served from the cache arrives as a single ``token`` event.
+        """
+        turn = await self._load_turn(question, user_id, conversation_id)
+
+        answer_key = await self._answer_cache_key(turn, diversify)
+        cached = answer_cache.get(*answer_key) if answer_key is not None else None
+        if cached is not None:
+            logger.info("Serving answer from the semantic answer cache")
+            turn["citations"] = cached["citations"]
+            return self._stream_cached_turn(turn, cached["answer"])
+
+        await self._prepare_turn(turn, diversify)
+        return self._stream_turn(turn, answer_key)
+
+    async def _stream_turn(
+        self, turn: dict[str, Any], answer_key: tuple[list[float], Hashable] | None
+    ) -> AsyncIterator[dict[str, Any]]:
+        """Stream the answer for a prepared turn and save it when complete."""
+        answer_parts: list[str] = []
+        try:
+            async for token in self.openrouter_service.astream_chat_response(turn["messages"]):
+                answer_parts.append(token)
+                yield {"event": "token", "data": {"content": token}}
+        except OpenRouterException as e:
+            logger.warning(f"Streaming answer failed: {e.message}")
+            yield {
+                "event": "error",
+                "data": {"message": e.message, "status_code": e.status_code},
+            }
+            return
+
+        answer = "".join(answer_parts)
+        await self._save_turn(turn, answer)
+
+        if answer_key is not None:
+            answer_cache.set(*answer_key, {"answer": answer, "citations": turn["citations"]})
+
+        logger.info(f"Streamed answer with {len(turn['citations'])} citations")
+        yield self._citations_event(turn)
+
+    async def _stream_cached_turn(
+        self, turn: dict[str, Any], answer: str
+    ) -> AsyncIterator[dict[str, Any]]:
+        """Stream a cached answer as one token event and save the turn."""
+        yield {"event": "token", "data": {"content": answer}}
+        await self._save_turn(turn, answer)
+        yield self._citations_event(turn)
+
+    def _citations_event(self, turn: dict[str, Any]) -> dict[str, Any]:
+        """Build the final event of a streamed turn."""
+        return {
+            "event": "citations",
+            "data": {
+                "conversation_id": str(turn["conversation_id"]),
+                "citations": turn["citations"],
+            },
+        }
+
+    async def _load_turn(
+        self,
+        question: str,
+        user_id: UUID,
+        conversation_id: UUID | None,
+    ) -> dict[str, Any]:
+        """Load the conversation and its memory for a new turn.
+
+        Nothing is written here; a new conversation is created when the turn is
+        saved.
+        """
         logger.info(f"Processing question for user {user_id}: {question[:100]}...")
 
-        if conversation_id is None:
-            conversation = self.conversation_repository.create(
-                user_id=user_id,
-                title=question[:100] if len(question) > 100 else question,
-            )
-            conversation_id = conversation["id"]
-        else:
-            conversation = self.conversation_repository.find_by_id(
+        conversation, summary = None, None
+        chat_history: list[dict[str, Any]] = []
+        if conversation_id is not None:
+            conversation = await self.conversation_repository.find_by_id(
                 conversation_id, user_id
             )
             if conversation is None:
                 raise ValueError("Conversation not found")
+            summary, chat_history = await self.memory_service.load(conversation)
 
-        context_results = self.embedding_service.similarity_search(
-            question,
-            max_results=settings.embedding_max_results,
-            similarity_threshold=settings.embedding_similarity_threshold,
-        )
-
-        context = self._build_context(context_results)
-
-        messages = self.message_repository.find_by_conversation(conversation_id)
-        chat_history = [
-            {"role": m["role"].value if isinstance(m["role"], MessageRole) else m["role"], "content": m["content"]}
-            for m in messages
-        ]
+        return {
+            "question": question,
+            "user_id": user_id,
+            "conversation_id": conversation_id,
+            "conversation": conversation,
+            "summary": summary,
+            "history": chat_history,
+        }
 
-        augmented_messages = self._build_augmented_messages(
-            question, chat_history, context
-        )
+    async def _answer_cache_key(
+        self, turn: dict[str, Any], diversify: bool | None
+    ) -> tuple[list[float], Hashable] | None:
+        """Key of the turn in the answer cache, or None if the answer depends on history."""
+        if answer_cache.maxsize <= 0 or turn["history"] or turn["summary"]:
+            return None
 
-        answer = self.openrouter_service.generate_chat_response(
-            augmented_messages, system_prompt=RAG_SYSTEM_PROMPT
+        await release_connection(self.db)
+        return (
+            await self.embedding_service.embed_query(turn["question"]),
+            (corpus_version.value, diversify),
         )
 
-        citations = self._build_citations(context_results)
+    async def _prepare_turn(self, turn: dict[str, Any], diversify: bool | None = None) -> None:
+        """Retrieve context and build the LLM messages of a loaded turn.
 
-        self.message_repository.create(
-            conversation_id=conversation_id,
-            role=MessageRole.USER,
-            content=question,
-        )
-        self.message_repository.create(
-            conversation_id=conversation_id,
-            role=MessageRole.ASSISTANT,
-            content=answer,
-            citations=json.dumps(citations) if citations else None,
+        The messages and citations are stored on ``turn``. No connection is
+        held on return.
+        """
+        # The query is embedded before the search, and the answer generated after it.
+        await release_connection(self.db)
+        context_results = await self.embedding_service.similarity_search(
+            turn["question"],
+            max_results=settings.embedding_max_results,
+            similarity_threshold=settings.embedding_similarity_threshold,
+            diversify=diversify,
         )
+        await release_connection(self.db)
 
-        self.conversation_repository.update(
-            conversation_id, user_id, updated_at=datetime.now()
+        passages = merge_adjacent_chunks(context_results)
+        prompt = self.prompt_builder.build(
+            turn["question"], passages, turn["history"], turn["summary"]
         )
+        cited_chunks = [chunk for passage in prompt["results"] for chunk in passage["chunks"]]
 
-        logger.info(f"Generated answer with {len(citations)} citations")
-        return answer, citations, conversation_id
-
-    def _build_context(self, results: list[dict]) -> str:
-        """Build context string from search results."""
-        if not results:
-            return "No relevant documents found."
-
-        context_parts = []
-        for i, result in enumerate(results, 1):
-            content = result.get("content", "")
-            doc_id = result.get("trained_document_id", "unknown")
-            chunk_idx = result.get("chunk_index", 0)
-            similarity = result.get("similarity", 0)
-            context_parts.append(
-                f"[Document {doc_id}, Chunk {chunk_idx}, Score: {similarity:.2f}]\n{content}"
-            )
-
-        return "\n\n".join(context_parts)
+        turn["messages"] = prompt["messages"]
+        turn["citations"] = self._build_citations(cited_chunks)
 
-    def _build_augmented_messages(
-        self,
-        question: str,
-        chat_history: list[dict],
-        context: str,
-    ) -> list[dict]:
-        """Build messages for the LLM with context."""
-        system_message = {
-            "role": "system",
-            "content": f"""{RAG_SYSTEM_PROMPT}
+    async def _create_conversation(self, question: str, user_id: UUID) -> RowMapping:
+        """Create a conversation titled after its first question."""
+        return await self.conversation_repository.create(
+            user_id=user_id,
+            title=question[:100] if len(question) > 100 else question,
+        )
 
-            Use the following context from legal documents to answer the user's question:
+    async def _save_turn(self, turn: dict[str, Any], answer: str) -> None:
+        """Persist a turn in one unit of work, creating its conversation if new.
 
-            {context}
+        The ID of a new conversation is stored on ``turn``.
+        """
+        citations = turn["citations"]
 
-            Cite your sources using the format [Document ID, Chunk Index] after each relevant statement.""",
-        }
+        async with AsyncUnitOfWork(self.db):
+            if turn["conversation_id"] is None:
+                conversation = await self._create_conversation(turn["question"], turn["user_id"])
+                turn["conversation_id"] = conversation["id"]
+            conversation_id = turn["conversation_id"]
 
-        messages = [system_message]
-        messages.extend(chat_history)
-        messages.append({"role": "user", "content": question})
+            await self.message_repository.create(
+                conversation_id=conversation_id,
+                role=MessageRole.USER,
+                content=turn["question"],
+            )
+            await self.message_repository.create(
+                conversation_id=conversation_id,
+                role=MessageRole.ASSISTANT,
+                content=answer,
+                citations=json.dumps(citations) if citations else None,
+            )
 
-        return messages
+            await self.conversation_repository.update(
+                conversation_id, turn["user_id"], updated_at=datetime.now()
+            )
 
     def _build_citations(self, results: list[dict]) -> list[dict]:
         """Build citations from search results."""
@@ -0,0 +1,405 @@
+"""Document training service and background job management."""
+
+import enum
+import logging
+import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from functools import lru_cache
+from pathlib import Path
+from typing import Any
+from uuid import UUID, uuid4
+
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app.cache import text_fingerprint
+from app.config import get_settings
+from app.database import UnitOfWork, get_db_context
+from app.repositories import (
+    EmbeddingCacheRepository,
+    EmbeddingRepository,
+    TrainedDocumentRepository,
+)
+from app.services.embedding_service import embedding_cache_stats, invalidate_corpus
+from app.services.openrouter_service import OpenRouterService
+from app.services.pdf_service import PdfService
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+
+class TrainingJobStatus(str, enum.Enum):
+    """Training job status enumeration."""
+
+    QUEUED = "QUEUED"
+    RUNNING = "RUNNING"
+    COMPLETED = "COMPLETED"
+    FAILED = "FAILED"
+    CANCELLED = "CANCELLED"
+
+
+class DocumentStatus(str, enum.Enum):
+    """Per-document training status enumeration."""
+
+    PENDING = "PENDING"
+    EXTRACTING = "EXTRACTING"
+    EMBEDDING = "EMBEDDING"
+    TRAINED = "TRAINED"
+    SKIPPED = "SKIPPED"
+    FAILED = "FAILED"
+    CANCELLED = "CANCELLED"
+
+
+class TrainingService:
+    """Service for training embeddings on PDF documents."""
+
+    def __init__(self, db: Session) -> None:
+        """Create the services and repositories used to train documents on ``db``."""
+        self.db = db
+        self.pdf_service = PdfService()
+        self.openrouter_service = OpenRouterService()
+        self.document_repository = TrainedDocumentRepository(db)
+        self.embedding_repository = EmbeddingRepository(db)
+        self.embedding_cache_repository = EmbeddingCacheRepository(db)
+
+    def train_file(
+        self,
+        pdf_file: Path,
+        on_status: Callable[[DocumentStatus], None] | None = None,
+    ) -> int | None:
+        """Train a single PDF file.
+
+        The document and its embeddings are committed together, so a failure
+        never leaves a partially embedded document behind. Returns the number of
+        chunks stored, or None if the file was already trained.
+        """
+        logger.info(f"Processing: {pdf_file.name}")
+
+        file_content = pdf_file.read_bytes()
+        checksum = self.pdf_service.calculate_checksum(file_content)
+
+        if self.document_repository.find_by_checksum(checksum):
+            logger.info(f"Skipping {pdf_file.name} - already trained")
+            return None
+
+        if on_status:
+            on_status(DocumentStatus.EXTRACTING)
+        text = self.pdf_service.extract_text(file_content, pdf_file.name)
+        chunks = self.pdf_service.chunk_text(text, pdf_file.name)
+
+        if on_status:
+            on_status(DocumentStatus.EMBEDDING)
+        embeddings = self._generate_cached_embeddings(chunks)
+
+        with UnitOfWork(self.db):
+            document = self.document_repository.create(
+                filename=pdf_file.name,
+                checksum=checksum,
+                chunk_count=0,
+            )
+            self.store_embeddings(
+                trained_document_id=document["id"],
+                chunks=chunks,
+                embeddings=embeddings,
+            )
+        invalidate_corpus()
+
+        logger.info(f"Trained {pdf_file.name}: {len(chunks)} chunks")
+        return len(chunks)
+
+    def store_embeddings(
+        self,
+        trained_document_id: UUID,
+        chunks: list[str],
+        embeddings: list[list[float]],
+        batch_size: int = settings.embedding_insert_batch_size,
+    ) -> int:
+        """Store embeddings for document chunks."""
+        logger.info(f"Storing {len(chunks)} embeddings for document {trained_document_id}")
+
+        records = [
+            {
+                "trained_document_id": trained_document_id,
+                "chunk_index": index,
+                "content": chunk,
+                "embedding": embeddings[index],
+                "metadata": {"chunk_size": len(chunk)},
+            }
+            for index, chunk in enumerate(chunks)
+        ]
+        self.embedding_repository.save_many(records, batch_size=batch_size)
+
+        self.document_repository.update_chunk_count(trained_document_id, len(chunks))
+
+        logger.info(f"Successfully stored {len(chunks)} embeddings")
+        return len(chunks)
+
+    def _generate_cached_embeddings(self, texts: list[str]) -> list[list[float]]:
+        """Embed texts, reusing cached vectors for content seen before.
+
+        Texts are keyed by embedding model and the SHA-256 of their normalized
+        form; only unseen texts are sent to the provider, once each.
+        """
+        if not settings.embedding_cache_enabled:
+            return self.openrouter_service.generate_embeddings(texts)
+
+        model = settings.openrouter_embedding_model
+        content_hashes = [text_fingerprint(text) for text in texts]
+        vectors = self.embedding_cache_repository.find_many(model, list(set(content_hashes)))
+
+        missing: dict[str, str] = {}
+        for content_hash, text in zip(content_hashes, texts, strict=True):
+            if content_hash not in vectors and content_hash not in missing:
+                missing[content_hash] = text
+
+        embedding_cache_stats.record_hits(len(texts) - len(missing))
+        embedding_cache_stats.record_misses(len(missing))
+        logger.debug(f"Embedding cache: {len(texts) - len(missing)} hits, {len(missing)} misses")
+
+        if missing:
+            new_vectors = self.openrouter_service.generate_embeddings(list(missing.values()))
+            new_entries = dict(zip(missing.keys(), new_vectors, strict=True))
+            with UnitOfWork(self.db) as uow:
+                try:
+                    with uow.savepoint():
+                        self.embedding_cache_repository.save_many(model, new_entries)
+                except SQLAlchemyError as e:
+                    logger.warning(f"Could not cache embeddings: {e}")
+            vectors.update(new_entries)
+
+        return [vectors[content_hash] for content_hash in content_hashes]
+
+
+class TrainingJob:
+    """In-memory state of a background training job."""
+
+    def __init__(self, pdf_files: list[Path]) -> None:
+        """Create a queued job with one pending progress record per file."""
+        self.id = uuid4()
+        self.pdf_files = pdf_files
+        self.status = TrainingJobStatus.QUEUED
+        self.created_at = datetime.now()
+        self.started_at: datetime | None = None
+        self.finished_at: datetime | None = None
+        self.error: str | None = None
+        self.documents: list[dict[str, Any]] = [
+            {
+                "filename": pdf_file.name,
+                "status": DocumentStatus.PENDING,
+                "chunks": 0,
+                "error": None,
+                "started_at": None,
+                "finished_at": None,
+            }
+            for pdf_file in pdf_files
+        ]
+        self.cancel_event = threading.Event()
+        self._lock = threading.Lock()
+        self._started_monotonic: float | None = None
+        self._finished_monotonic: float | None = None
+
+    @property
+    def is_finished(self) -> bool:
+        """Whether the job has reached a terminal status."""
+        return self.status in (
+            TrainingJobStatus.COMPLETED,
+            TrainingJobStatus.FAILED,
+            TrainingJobStatus.CANCELLED,
+        )
+
+    def mark_started(self) -> None:
+        """Mark the job as running."""
+        with self._lock:
+            self.status = TrainingJobStatus.RUNNING
+            self.started_at = datetime.now()
+            self._started_monotonic = time.monotonic()
+
+    def mark_finished(self, status: TrainingJobStatus, error: str | None = None) -> None:
+        """Mark the job as finished with the given status."""
+        with self._lock:
+            self.status = status
+            self.error = error
+            self.finished_at = datetime.now()
+            self._finished_monotonic = time.monotonic()
+            for document in self.documents:
+                if document["status"] == DocumentStatus.PENDING:
+                    document["status"] = DocumentStatus.CANCELLED
+
+    def update_document(self, index: int, **fields: Any) -> None:
+        """Update the progress record of a document."""
+        with self._lock:
+            self.documents[index].update(fields)
+
+    def to_dict(self) -> dict[str, Any]:
+        """Return a consistent snapshot of the job progress."""
+        with self._lock:
+            documents = [dict(document) for document in self.documents]
+            counts = dict.fromkeys(DocumentStatus, 0)
+            for document in documents:
+                counts[document["status"]] += 1
+
+            chunks_embedded = sum(document["chunks"] for document in documents)
+            elapsed = None
+            if self._started_monotonic is not None:
+                end = self._finished_monotonic or time.monotonic()
+                elapsed = end - self._started_monotonic
+
+            return {
+                "job_id": self.id,
+                "status": self.status.value,
+                "created_at": self.created_at,
+                "started_at": self.started_at,
+                "finished_at": self.finished_at,
+                "error": self.error,
+                "total_documents": len(documents),
+                "processed_documents": (
+                    counts[DocumentStatus.TRAINED]
+                    + counts[DocumentStatus.SKIPPED]
+                    + counts[DocumentStatus.FAILED]
+                ),
+                "trained": counts[DocumentStatus.TRAINED],
+                "skipped": counts[DocumentStatus.SKIPPED],
+                "failed": counts[DocumentStatus.FAILED],
+                "chunks_embedded": chunks_embedded,
+                "elapsed_seconds": elapsed,
+                "chunks_per_second": chunks_embedded / elapsed if elapsed else None,
+                "documents": [
+                    {**document, "status": document["status"].value} for document in documents
+                ],
+            }
+
+
+class TrainingJobManager:
+    """Runs training jobs on a background executor and tracks their progress."""
+
+    def __init__(
+        self,
+        max_workers: int = settings.training_max_concurrent_jobs,
+        history_size: int = settings.training_job_history_size,
+    ) -> None:
+        """Create the executor running up to ``max_workers`` jobs at a time."""
+        self.history_size = history_size
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="training-job"
+        )
+        self._jobs: dict[UUID, TrainingJob] = {}
+        self._lock = threading.Lock()
+
+    def submit(self, pdf_files: list[Path]) -> TrainingJob:
+        """Enqueue a training job for the given PDF files."""
+        job = TrainingJob(pdf_files)
+        with self._lock:
+            self._prune_history()
+            self._jobs[job.id] = job
+        self._executor.submit(self._run, job)
+        logger.info(f"Queued training job {job.id} with {len(pdf_files)} documents")
+        return job
+
+    def get(self, job_id: UUID) -> TrainingJob | None:
+        """Get a job by ID."""
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def cancel(self, job_id: UUID) -> TrainingJob | None:
+        """Request cancellation of a job.
+
+        The document currently being processed is allowed to finish; remaining
+        documents are not started.
+        """
+        job = self.get(job_id)
+        if job is None:
+            return None
+
+        job.cancel_event.set()
+        if job.status == TrainingJobStatus.QUEUED:
+            job.mark_finished(TrainingJobStatus.CANCELLED)
+        logger.info(f"Cancellation requested for training job {job_id}")
+        return job
+
+    def shutdown(self) -> None:
+        """Cancel outstanding jobs and stop the executor."""
+        with self._lock:
+            jobs = list(self._jobs.values())
+        for job in jobs:
+            job.cancel_event.set()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _run(self, job: TrainingJob) -> None:
+        """Execute a job on the worker thread."""
+        if job.cancel_event.is_set():
+            return
+
+        job.mark_started()
+        logger.info(f"Training job {job.id} started")
+
+        try:
+            with get_db_context() as db:
+                training_service = TrainingService(db)
+
+                for index, pdf_file in enumerate(job.pdf_files):
+                    if job.cancel_event.is_set():
+                        job.mark_finished(TrainingJobStatus.CANCELLED)
+                        logger.info(f"Training job {job.id} cancelled")
+                        return
+
+                    self._train_document(job, index, pdf_file, training_service, db)
+        except Exception as e:
+            logger.exception(f"Training job {job.id} failed: {e}")
+            job.mark_finished(TrainingJobStatus.FAILED, error=str(e))
+            return
+
+        job.mark_finished(TrainingJobStatus.COMPLETED)
+        logger.info(f"Training job {job.id} completed")
+
+    def _train_document(
+        self,
+        job: TrainingJob,
+        index: int,
+        pdf_file: Path,
+        training_service: TrainingService,
+        db: Session,
+    ) -> None:
+        """Train one document of a job, recording its outcome."""
+        job.update_document(index, status=DocumentStatus.EXTRACTING, started_at=datetime.now())
+
+        try:
+            chunk_count = training_service.train_file(
+                pdf_file,
+                on_status=lambda status: job.update_document(index, status=status),
+            )
+        except Exception as e:
+            logger.exception(f"Failed to train {pdf_file.name}: {e}")
+            db.rollback()
+            job.update_document(
+                index,
+                status=DocumentStatus.FAILED,
+                error=str(e),
+                finished_at=datetime.now(),
+            )
+            return
+
+        if chunk_count is None:
+            job.update_document(index, status=DocumentStatus.SKIPPED, finished_at=datetime.now())
+        else:
+            job.update_document(
+                index,
+                status=DocumentStatus.TRAINED,
+                chunks=chunk_count,
+                finished_at=datetime.now(),
+            )
+
+    def _prune_history(self) -> None:
+        """Drop the oldest finished jobs beyond the history size."""
+        finished = [job for job in self._jobs.values() if job.is_finished]
+        excess = len(finished) - self.history_size + 1
+        for job in sorted(finished, key=lambda j: j.created_at)[:max(excess, 0)]:
+            del self._jobs[job.id]
+
+
+@lru_cache
+def get_training_job_manager() -> TrainingJobManager:
+    """Get the process-wide training job manager."""
+    return TrainingJobManager()
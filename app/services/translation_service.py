@@ -21,10 +21,10 @@ LANGUAGE_NAMES = {
 class TranslationService:
     """Service for text translation."""
 
-    def __init__(self) -> None:
-        self.openrouter_service = OpenRouterService()
+    def __init__(self, openrouter_service: OpenRouterService | None = None) -> None:
+        self.openrouter_service = openrouter_service or OpenRouterService()
 
-    def translate(
+    async def translate(
         self,
         text: str,
         source: str,
@@ -45,7 +45,7 @@ class TranslationService:
             {"role": "user", "content": text},
         ]
 
-        translated_text = self.openrouter_service.generate_chat_response(messages)
+        translated_text = await self.openrouter_service.agenerate_chat_response(messages)
 
         logger.info(f"Translation complete: {len(translated_text)} chars")
         return translated_text
@@ -0,0 +1,84 @@
+"""Coalescing of concurrent identical calls (single-flight)."""
+
+import asyncio
+import threading
+from collections.abc import Callable, Coroutine, Hashable
+from concurrent.futures import Future
+from typing import Any, TypeVar
+
+from app.cache import register_counters
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """Runs concurrent calls with the same key only once.
+
+    The first caller for a key executes the call; callers arriving while it is
+    in flight wait for it and receive the same result or exception. Nothing is
+    kept once the call finishes, so this is not a cache. Async calls run as a
+    task shared by the callers on the same event loop, so one caller being
+    cancelled does not cancel the call for the others. ``executed`` and
+    ``coalesced`` counters are registered under ``name``.
+    """
+
+    def __init__(self, name: str) -> None:
+        """Start with no calls in flight, counting them under ``name``."""
+        self.metrics = register_counters(name)
+        self._calls: dict[Hashable, Future[Any]] = {}
+        self._tasks: dict[tuple[asyncio.AbstractEventLoop, Hashable], asyncio.Task[Any]] = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: Hashable, func: Callable[..., T], *args: Any) -> T:
+        """Call ``func(*args)``, or wait for the identical call already in flight."""
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if future is None:
+                future = Future()
+                self._calls[key] = future
+
+        if not leader:
+            self.metrics.increment("coalesced")
+            shared: T = future.result()
+            return shared
+
+        self.metrics.increment("executed")
+        try:
+            result = func(*args)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._calls[key]
+
+    async def ado(
+        self, key: Hashable, func: Callable[..., Coroutine[Any, Any, T]], *args: Any
+    ) -> T:
+        """Await ``func(*args)``, or wait for the identical call already in flight."""
+        loop = asyncio.get_running_loop()
+        task_key = (loop, key)
+        with self._lock:
+            task = self._tasks.get(task_key)
+            leader = task is None
+            if task is None:
+                task = loop.create_task(func(*args))
+                self._tasks[task_key] = task
+                task.add_done_callback(lambda done: self._forget(task_key, done))
+
+        self.metrics.increment("executed" if leader else "coalesced")
+        result: T = await asyncio.shield(task)
+        return result
+
+    def _forget(
+        self, task_key: tuple[asyncio.AbstractEventLoop, Hashable], task: asyncio.Task[Any]
+    ) -> None:
+        """Drop a finished task, marking its exception as retrieved."""
+        with self._lock:
+            self._tasks.pop(task_key, None)
+        if not task.cancelled():
+            task.exception()
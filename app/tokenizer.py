@@ -0,0 +1,63 @@
+"""Local token counting for prompt budgeting."""
+
+import logging
+from collections.abc import Mapping
+from functools import lru_cache
+from typing import Any
+
+import tiktoken
+
+from app.config import get_settings
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# Rough characters-per-token ratio used when no BPE encoding is available.
+_FALLBACK_CHARS_PER_TOKEN = 4
+# Approximate per-message framing cost of the chat format (role, separators).
+MESSAGE_OVERHEAD_TOKENS = 4
+
+
+@lru_cache
+def get_encoding(name: str = settings.tokenizer_encoding) -> tiktoken.Encoding | None:
+    """Load a tiktoken encoding once, or None if it cannot be loaded.
+
+    tiktoken downloads encoding files on first use, so hosts without network
+    access fall back to a character-based estimate.
+    """
+    try:
+        return tiktoken.get_encoding(name)
+    except Exception as e:
+        logger.warning(f"Tokenizer encoding {name} unavailable, estimating token counts: {e}")
+        return None
+
+
+def count_tokens(text: str) -> int:
+    """Count the tokens in a text."""
+    if not text:
+        return 0
+
+    encoding = get_encoding()
+    if encoding is None:
+        return -(-len(text) // _FALLBACK_CHARS_PER_TOKEN)
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def count_message_tokens(message: Mapping[str, Any]) -> int:
+    """Count the tokens a chat message takes in a prompt, framing included."""
+    return count_tokens(message["content"]) + MESSAGE_OVERHEAD_TOKENS
+
+
+def truncate_tokens(text: str, max_tokens: int) -> str:
+    """Cut a text down to at most ``max_tokens`` tokens."""
+    if max_tokens <= 0:
+        return ""
+
+    encoding = get_encoding()
+    if encoding is None:
+        return text[:max_tokens * _FALLBACK_CHARS_PER_TOKEN]
+
+    tokens = encoding.encode(text, disallowed_special=())
+    if len(tokens) <= max_tokens:
+        return text
+    return encoding.decode(tokens[:max_tokens])
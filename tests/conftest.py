@@ -1,26 +1,63 @@
 """Pytest configuration and fixtures."""
 
-from collections.abc import Generator
+import os
+import tempfile
+from collections.abc import AsyncGenerator, Generator
+from pathlib import Path
+from typing import Any
+from unittest.mock import AsyncMock, MagicMock
+from uuid import UUID, uuid4
 
 import pytest
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
+from sqlalchemy import MetaData, create_engine, event
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import Session, sessionmaker
-from sqlalchemy.pool import StaticPool
-
-from app.database import get_db
-from app.main import app
-from app.models import metadata
+from sqlalchemy.pool import NullPool
+
+os.environ.setdefault("OPENROUTER_API_KEY", "test-api-key")
+
+from app.database import get_async_db, get_async_session_factory, get_db  # noqa: E402
+from app.main import app  # noqa: E402
+from app.models import (  # noqa: E402
+    conversations,
+    embedding_cache,
+    embeddings,
+    messages,
+    trained_documents,
+    users,
+)
 
-SQLALCHEMY_TEST_DATABASE_URL = "sqlite:///:memory:"
+# A database file, so that the sync and async engines share the same data.
+TEST_DATABASE_PATH = Path(tempfile.mkdtemp()) / "test.db"
+SQLALCHEMY_TEST_DATABASE_URL = f"sqlite:///{TEST_DATABASE_PATH}"
+SQLALCHEMY_ASYNC_TEST_DATABASE_URL = f"sqlite+aiosqlite:///{TEST_DATABASE_PATH}"
 
 engine = create_engine(
     SQLALCHEMY_TEST_DATABASE_URL,
     connect_args={"check_same_thread": False},
-    poolclass=StaticPool,
 )
 
+# TestClient runs each request on its own event loop, so connections are not pooled.
+async_engine = create_async_engine(SQLALCHEMY_ASYNC_TEST_DATABASE_URL, poolclass=NullPool)
+
+
+@event.listens_for(engine, "connect")
+def enable_wal(dbapi_connection: Any, connection_record: Any) -> None:
+    """Let the async engine read while a sync session holds a write transaction."""
+    dbapi_connection.execute("PRAGMA journal_mode=WAL")
+
+
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+TestingAsyncSessionLocal = async_sessionmaker(
+    bind=async_engine, autoflush=False, expire_on_commit=False
+)
+
+# Each model module has its own MetaData, so foreign keys between tables only
+# resolve once they are copied into a single one.
+metadata = MetaData()
+for table in (users, trained_documents, embeddings, embedding_cache, conversations, messages):
+    table.to_metadata(metadata)
 
 
 @pytest.fixture(scope="function")
@@ -39,7 +76,10 @@ def db() -> Generator[Session, None, None]:
 
 @pytest.fixture(scope="function")
 def client(db: Session) -> Generator[TestClient, None, None]:
-    """Create a test client with database dependency override."""
+    """Create a test client with the sync and async database dependencies overridden.
+
+    Rows created through ``db`` must be committed to be seen by async routes.
+    """
 
     def override_get_db():
         try:
@@ -47,7 +87,13 @@ def client(db: Session) -> Generator[TestClient, None, None]:
         finally:
             pass
 
+    async def override_get_async_db() -> AsyncGenerator[AsyncSession, None]:
+        async with TestingAsyncSessionLocal() as async_db:
+            yield async_db
+
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_async_db] = override_get_async_db
+    app.dependency_overrides[get_async_session_factory] = lambda: TestingAsyncSessionLocal
 
     with TestClient(app) as test_client:
         yield test_client
@@ -55,6 +101,78 @@ def client(db: Session) -> Generator[TestClient, None, None]:
     app.dependency_overrides.clear()
 
 
+class FakeConversationRepository:
+    """Async conversation repository backed by a dict, recording stored summaries."""
+
+    def __init__(self) -> None:
+        self.conversations: dict[UUID, dict[str, Any]] = {}
+        self.summaries: list[dict[str, Any]] = []
+
+    async def create(self, user_id: UUID, title: str) -> dict[str, Any]:
+        conversation: dict[str, Any] = {
+            "id": uuid4(),
+            "user_id": user_id,
+            "title": title,
+            "summary": None,
+            "summary_message_count": 0,
+        }
+        self.conversations[conversation["id"]] = conversation
+        return conversation
+
+    async def find_by_id(self, conversation_id: UUID, user_id: UUID) -> dict[str, Any] | None:
+        conversation = self.conversations.get(conversation_id)
+        return dict(conversation) if conversation is not None else None
+
+    async def update(
+        self, conversation_id: UUID, user_id: UUID, **kwargs: Any
+    ) -> dict[str, Any]:
+        conversation = self.conversations.setdefault(conversation_id, {})
+        conversation.update(kwargs)
+        return conversation
+
+    async def update_summary(
+        self,
+        conversation_id: UUID,
+        user_id: UUID,
+        summary: str,
+        summary_message_count: int,
+        expected_message_count: int,
+    ) -> bool:
+        conversation = self.conversations[conversation_id]
+        if conversation["summary_message_count"] != expected_message_count:
+            return False
+        stored = {"summary": summary, "summary_message_count": summary_message_count}
+        conversation.update(stored)
+        self.summaries.append(stored)
+        return True
+
+
+class FakeMessageRepository:
+    """Async message repository backed by a list of message rows."""
+
+    def __init__(self, messages: list[dict[str, Any]] | None = None) -> None:
+        self.messages = messages if messages is not None else []
+
+    async def create(self, **kwargs: Any) -> dict[str, Any]:
+        self.messages.append(kwargs)
+        return kwargs
+
+    async def find_by_conversation(
+        self, conversation_id: UUID, offset: int = 0
+    ) -> list[dict[str, Any]]:
+        return self.messages[offset:]
+
+
+@pytest.fixture
+def mock_async_db() -> MagicMock:
+    """Async session mock for services whose repositories are replaced by fakes."""
+    session = MagicMock()
+    session.info = {}
+    session.commit = AsyncMock()
+    session.rollback = AsyncMock()
+    return session
+
+
 @pytest.fixture
 def sample_user_data() -> dict:
     """Sample user data for testing."""
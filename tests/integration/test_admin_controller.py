@@ -0,0 +1,235 @@
+"""Integration tests for admin controller."""
+
+import threading
+import time
+from collections.abc import Callable, Generator
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any
+from unittest.mock import MagicMock
+from uuid import uuid4
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from app.api.routes import admin
+from app.main import app
+from app.models import UserRole
+from app.repositories import UserRepository
+from app.security import hash_password
+from app.services import TrainingJobManager, TrainingService, get_training_job_manager
+from app.services import training_service as training_service_module
+from app.services.training_service import DocumentStatus
+
+ADMIN_AUTH = ("admin@example.com", "adminpassword")
+
+
+@pytest.fixture
+def job_manager(monkeypatch: pytest.MonkeyPatch) -> Generator[TrainingJobManager, None, None]:
+    """Fresh job manager whose jobs run without a database."""
+
+    @contextmanager
+    def fake_db_context() -> Generator[MagicMock, None, None]:
+        yield MagicMock()
+
+    monkeypatch.setattr(training_service_module, "get_db_context", fake_db_context)
+    manager = TrainingJobManager(max_workers=1)
+    app.dependency_overrides[get_training_job_manager] = lambda: manager
+    yield manager
+    manager.shutdown()
+
+
+@pytest.fixture
+def pdf_folder(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    """Resources folder holding three placeholder PDFs."""
+    monkeypatch.setattr(admin.settings, "resources_path", tmp_path)
+    folder = tmp_path / "pdfs"
+    folder.mkdir()
+    for name in ("a.pdf", "b.pdf", "c.pdf"):
+        (folder / name).write_bytes(b"%PDF-1.4")
+    return folder
+
+
+def create_admin(db: Session) -> None:
+    """Create the admin user used by the job tests."""
+    UserRepository(db).create(
+        email=ADMIN_AUTH[0],
+        password_hash=hash_password(ADMIN_AUTH[1]),
+        role=UserRole.ADMIN,
+    )
+    db.commit()
+
+
+def wait_for_job(client: TestClient, job_id: str) -> dict[str, Any]:
+    """Poll a job until it reaches a terminal status."""
+    deadline = time.monotonic() + 5
+    while time.monotonic() < deadline:
+        job: dict[str, Any] = client.get(f"/admin/train/{job_id}", auth=ADMIN_AUTH).json()
+        if job["status"] in ("COMPLETED", "FAILED", "CANCELLED"):
+            return job
+        time.sleep(0.01)
+    raise AssertionError(f"Training job {job_id} did not finish")
+
+
+class TestTrainingJobEndpoints:
+    """Integration tests for training job endpoints."""
+
+    def test_non_admin_returns_403(self, client: TestClient, db: Session) -> None:
+        """Test non-admin users are rejected with 403."""
+        UserRepository(db).create(
+            email="user@example.com",
+            password_hash=hash_password("userpassword"),
+            role=UserRole.USER,
+        )
+        db.commit()
+
+        response = client.get(
+            f"/admin/train/{uuid4()}",
+            auth=("user@example.com", "userpassword"),
+        )
+
+        assert response.status_code == 403
+
+    def test_get_unknown_job_returns_404(self, client: TestClient, db: Session) -> None:
+        """Test fetching an unknown training job returns 404."""
+        UserRepository(db).create(
+            email="admin@example.com",
+            password_hash=hash_password("adminpassword"),
+            role=UserRole.ADMIN,
+        )
+        db.commit()
+
+        response = client.get(
+            f"/admin/train/{uuid4()}",
+            auth=("admin@example.com", "adminpassword"),
+        )
+
+        assert response.status_code == 404
+
+    def test_cancel_unknown_job_returns_404(self, client: TestClient, db: Session) -> None:
+        """Test cancelling an unknown training job returns 404."""
+        UserRepository(db).create(
+            email="admin@example.com",
+            password_hash=hash_password("adminpassword"),
+            role=UserRole.ADMIN,
+        )
+        db.commit()
+
+        response = client.post(
+            f"/admin/train/{uuid4()}/cancel",
+            auth=("admin@example.com", "adminpassword"),
+        )
+
+        assert response.status_code == 404
+
+
+
+class TestTrainingJobLifecycle:
+    """Integration tests for running, cancelling and failing training jobs."""
+
+    def test_job_runs_to_completion(
+        self,
+        client: TestClient,
+        db: Session,
+        job_manager: TrainingJobManager,
+        pdf_folder: Path,
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        """Test a submitted job reports progress and completes every document."""
+        create_admin(db)
+        release = threading.Event()
+
+        def train_file(
+            self: TrainingService,
+            pdf_file: Path,
+            on_status: Callable[[DocumentStatus], None] | None = None,
+        ) -> int | None:
+            release.wait(timeout=5)
+            return None if pdf_file.name == "b.pdf" else 4
+
+        monkeypatch.setattr(TrainingService, "train_file", train_file)
+
+        response = client.post("/admin/train", auth=ADMIN_AUTH)
+        assert response.status_code == 202
+        job_id = response.json()["job_id"]
+        assert response.json()["total_documents"] == 3
+
+        progress = client.get(f"/admin/train/{job_id}", auth=ADMIN_AUTH).json()
+        assert progress["status"] in ("QUEUED", "RUNNING")
+        assert progress["processed_documents"] == 0
+
+        release.set()
+        job = wait_for_job(client, job_id)
+
+        assert job["status"] == "COMPLETED"
+        assert job["processed_documents"] == 3
+        assert (job["trained"], job["skipped"], job["failed"]) == (2, 1, 0)
+        assert job["chunks_embedded"] == 8
+        assert [d["status"] for d in job["documents"]] == ["TRAINED", "SKIPPED", "TRAINED"]
+
+    def test_cancel_stops_remaining_documents(
+        self,
+        client: TestClient,
+        db: Session,
+        job_manager: TrainingJobManager,
+        pdf_folder: Path,
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        """Test cancelling lets the current document finish and skips the rest."""
+        create_admin(db)
+        started = threading.Event()
+        release = threading.Event()
+
+        def train_file(
+            self: TrainingService,
+            pdf_file: Path,
+            on_status: Callable[[DocumentStatus], None] | None = None,
+        ) -> int | None:
+            started.set()
+            release.wait(timeout=5)
+            return 4
+
+        monkeypatch.setattr(TrainingService, "train_file", train_file)
+
+        job_id = client.post("/admin/train", auth=ADMIN_AUTH).json()["job_id"]
+        assert started.wait(timeout=5)
+
+        response = client.post(f"/admin/train/{job_id}/cancel", auth=ADMIN_AUTH)
+        assert response.status_code == 200
+        release.set()
+        job = wait_for_job(client, job_id)
+
+        assert job["status"] == "CANCELLED"
+        assert [d["status"] for d in job["documents"]] == ["TRAINED", "CANCELLED", "CANCELLED"]
+
+    def test_failed_document_does_not_fail_job(
+        self,
+        client: TestClient,
+        db: Session,
+        job_manager: TrainingJobManager,
+        pdf_folder: Path,
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        """Test a document that fails is recorded and the others still train."""
+        create_admin(db)
+
+        def train_file(
+            self: TrainingService,
+            pdf_file: Path,
+            on_status: Callable[[DocumentStatus], None] | None = None,
+        ) -> int | None:
+            if pdf_file.name == "b.pdf":
+                raise ValueError("No text could be extracted")
+            return 2
+
+        monkeypatch.setattr(TrainingService, "train_file", train_file)
+
+        job_id = client.post("/admin/train", auth=ADMIN_AUTH).json()["job_id"]
+        job = wait_for_job(client, job_id)
+
+        assert job["status"] == "COMPLETED"
+        assert (job["trained"], job["failed"]) == (2, 1)
+        failed = job["documents"][1]
+        assert failed["status"] == "FAILED"
+        assert failed["error"] == "No text could be extracted"
@@ -3,6 +3,7 @@
 from fastapi.testclient import TestClient
 from sqlalchemy.orm import Session
 
+from app.api.deps import _credential_fingerprint, verified_credential_cache
 from app.models import UserRole
 from app.repositories import UserRepository
 from app.security import hash_password
@@ -64,6 +65,7 @@ class TestAuthController:
             password_hash=hash_password("correctpassword"),
             role=UserRole.USER,
         )
+        db.commit()
 
         response = client.post(
             "/auth/login",
@@ -84,6 +86,7 @@ class TestAuthController:
             password_hash=hash_password("correctpassword"),
             role=UserRole.USER,
         )
+        db.commit()
 
         response = client.post(
             "/auth/login",
@@ -103,6 +106,76 @@ class TestAuthController:
 
         assert response.status_code == 401
 
+    def test_login_returns_access_token(self, client: TestClient, db: Session) -> None:
+        """Test login returns a bearer token that authenticates on its own."""
+        user_repo = UserRepository(db)
+        user_repo.create(
+            email="token@example.com",
+            password_hash=hash_password("correctpassword"),
+            role=UserRole.ADMIN,
+        )
+        db.commit()
+
+        login_response = client.post(
+            "/auth/login",
+            json={"email": "token@example.com", "password": "correctpassword"},
+        )
+        token = login_response.json()["access_token"]
+
+        response = client.get("/auth/me", headers={"Authorization": f"Bearer {token}"})
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["email"] == "token@example.com"
+        assert data["role"] == "ADMIN"
+
+    def test_me_with_basic_auth(self, client: TestClient, db: Session) -> None:
+        """Test Basic Auth still authenticates as a fallback."""
+        user_repo = UserRepository(db)
+        user_repo.create(
+            email="basic@example.com",
+            password_hash=hash_password("correctpassword"),
+            role=UserRole.USER,
+        )
+        db.commit()
+
+        response = client.get("/auth/me", auth=("basic@example.com", "correctpassword"))
+
+        assert response.status_code == 200
+        assert response.json()["email"] == "basic@example.com"
+
+    def test_basic_auth_reuses_verified_credentials(
+        self, client: TestClient, db: Session
+    ) -> None:
+        """Test repeated Basic Auth requests skip password verification."""
+        user_repo = UserRepository(db)
+        user_repo.create(
+            email="cached@example.com",
+            password_hash=hash_password("correctpassword"),
+            role=UserRole.USER,
+        )
+        db.commit()
+        hits = verified_credential_cache.stats.hits
+
+        client.get("/auth/me", auth=("cached@example.com", "correctpassword"))
+        response = client.get("/auth/me", auth=("cached@example.com", "correctpassword"))
+
+        assert response.status_code == 200
+        assert verified_credential_cache.stats.hits == hits + 1
+
+    def test_credential_fingerprint_changes_with_hash(self) -> None:
+        """Test cached credentials are not reused after the password hash changes."""
+        old = _credential_fingerprint("user@example.com", "password123", "hash-1")
+        new = _credential_fingerprint("user@example.com", "password123", "hash-2")
+
+        assert old != new
+
+    def test_me_without_credentials(self, client: TestClient) -> None:
+        """Test requests without credentials return 401."""
+        response = client.get("/auth/me")
+
+        assert response.status_code == 401
+
 
 class TestHealthEndpoints:
     """Tests for health and root endpoints."""
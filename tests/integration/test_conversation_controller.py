@@ -0,0 +1,290 @@
+"""Integration tests for conversation controller."""
+
+import json
+from collections.abc import AsyncIterator, Generator
+from typing import Any
+from unittest.mock import ANY, AsyncMock
+from uuid import UUID
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.api.deps import get_openrouter_service
+from app.exceptions import OpenRouterServerException
+from app.main import app
+from app.models import UserRole
+from app.repositories import UserRepository
+from app.security import hash_password
+from app.services import ConversationMemoryService, EmbeddingService
+from app.services.embedding_service import query_embedding_cache
+from app.services.rag_service import answer_cache
+from tests.conftest import async_engine
+
+USER_AUTH = ("user@example.com", "userpassword")
+
+
+class FakeOpenRouterService:
+    """OpenRouter service that answers from a script and records open connections."""
+
+    def __init__(self, connections: list[int]) -> None:
+        self.connections = connections
+        self.connections_during_calls: list[int] = []
+        self.stream_error: Exception | None = None
+
+    async def agenerate_embedding(self, text: str) -> list[float]:
+        return [1.0, 0.0]
+
+    async def agenerate_chat_response(
+        self, messages: list[dict[str, Any]], system_prompt: str | None = None
+    ) -> str:
+        self.connections_during_calls.append(self.connections[0])
+        return "Article 543 applies."
+
+    async def astream_chat_response(self, messages: list[dict[str, Any]]) -> AsyncIterator[str]:
+        for token in ("Article ", "543 ", "applies."):
+            self.connections_during_calls.append(self.connections[0])
+            yield token
+            if self.stream_error is not None:
+                raise self.stream_error
+
+
+@pytest.fixture
+def open_connections() -> Generator[list[int], None, None]:
+    """Number of async engine connections currently checked out of the pool."""
+    count = [0]
+
+    def checkout(*args: Any) -> None:
+        count[0] += 1
+
+    def checkin(*args: Any) -> None:
+        count[0] -= 1
+
+    pool = async_engine.sync_engine.pool
+    event.listen(pool, "checkout", checkout)
+    event.listen(pool, "checkin", checkin)
+    yield count
+    event.remove(pool, "checkout", checkout)
+    event.remove(pool, "checkin", checkin)
+
+
+@pytest.fixture
+def openrouter_service(
+    client: TestClient, open_connections: list[int], monkeypatch: pytest.MonkeyPatch
+) -> FakeOpenRouterService:
+    """Fake provider, with retrieval stubbed out since SQLite has no vector search."""
+    answer_cache.clear()
+    query_embedding_cache.clear()
+    service = FakeOpenRouterService(open_connections)
+    app.dependency_overrides[get_openrouter_service] = lambda: service
+    monkeypatch.setattr(EmbeddingService, "similarity_search", AsyncMock(return_value=[]))
+    return service
+
+
+def parse_events(body: str) -> list[tuple[str, dict[str, Any]]]:
+    """Split a server-sent events body into (event, data) pairs."""
+    events = []
+    for block in body.strip().split("\n\n"):
+        event_line, data_line = block.split("\n")
+        data = json.loads(data_line.removeprefix("data: "))
+        events.append((event_line.removeprefix("event: "), data))
+    return events
+
+
+def create_user(db: Session) -> None:
+    """Create and commit the user the conversation tests authenticate as."""
+    UserRepository(db).create(
+        email=USER_AUTH[0],
+        password_hash=hash_password(USER_AUTH[1]),
+        role=UserRole.USER,
+    )
+    db.commit()
+
+
+class TestConversationEndpoints:
+    """Integration tests for conversation CRUD on the async database stack."""
+
+    def test_create_list_get_and_delete(self, client: TestClient, db: Session) -> None:
+        """Test a conversation is created, listed, read and deleted."""
+        create_user(db)
+
+        created = client.post("/conversations", json={"title": "Lease"}, auth=USER_AUTH)
+        assert created.status_code == 201
+        conversation_id = created.json()["id"]
+
+        listed = client.get("/conversations", auth=USER_AUTH)
+        assert [c["id"] for c in listed.json()] == [conversation_id]
+
+        detail = client.get(f"/conversations/{conversation_id}", auth=USER_AUTH)
+        assert detail.json()["title"] == "Lease"
+        assert detail.json()["messages"] == []
+
+        deleted = client.delete(f"/conversations/{conversation_id}", auth=USER_AUTH)
+        assert deleted.status_code == 204
+        assert client.get(f"/conversations/{conversation_id}", auth=USER_AUTH).status_code == 404
+
+    def test_requires_authentication(self, client: TestClient) -> None:
+        """Test conversation routes reject unauthenticated requests."""
+        assert client.get("/conversations").status_code == 401
+
+
+class TestAskQuestion:
+    """Integration tests for answering questions in a conversation."""
+
+    def test_turn_is_saved(
+        self, client: TestClient, db: Session, openrouter_service: FakeOpenRouterService
+    ) -> None:
+        """Test the question and the answer are stored in the conversation."""
+        create_user(db)
+        conversation_id = client.post("/conversations", json={}, auth=USER_AUTH).json()["id"]
+
+        response = client.post(
+            f"/conversations/{conversation_id}/message",
+            json={"question": "What does article 543 say?"},
+            auth=USER_AUTH,
+        )
+
+        assert response.status_code == 200
+        assert response.json()["answer"] == "Article 543 applies."
+        messages = client.get(f"/conversations/{conversation_id}", auth=USER_AUTH).json()
+        assert [m["content"] for m in messages["messages"]] == [
+            "What does article 543 say?",
+            "Article 543 applies.",
+        ]
+
+    def test_no_connection_held_during_generation(
+        self, client: TestClient, db: Session, openrouter_service: FakeOpenRouterService
+    ) -> None:
+        """Test the database connection is back in the pool while the LLM answers."""
+        create_user(db)
+        conversation_id = client.post("/conversations", json={}, auth=USER_AUTH).json()["id"]
+
+        client.post(
+            f"/conversations/{conversation_id}/message",
+            json={"question": "What does article 543 say?"},
+            auth=USER_AUTH,
+        )
+
+        assert openrouter_service.connections_during_calls == [0]
+
+    def test_memory_is_compacted_after_the_response(
+        self,
+        client: TestClient,
+        db: Session,
+        openrouter_service: FakeOpenRouterService,
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        """Test compaction is scheduled as a background task of the turn."""
+        create_user(db)
+        conversation_id = client.post("/conversations", json={}, auth=USER_AUTH).json()["id"]
+        compact = AsyncMock()
+        monkeypatch.setattr(ConversationMemoryService, "compact", compact)
+
+        client.post(
+            f"/conversations/{conversation_id}/message",
+            json={"question": "What does article 543 say?"},
+            auth=USER_AUTH,
+        )
+
+        compact.assert_awaited_once_with(UUID(conversation_id), ANY)
+
+    def test_first_question_of_conversation_served_from_cache(
+        self, client: TestClient, db: Session, openrouter_service: FakeOpenRouterService
+    ) -> None:
+        """Test a question opening another conversation reuses the cached answer."""
+        create_user(db)
+        question = {"question": "What does article 543 say?"}
+        first_id = client.post("/conversations", json={}, auth=USER_AUTH).json()["id"]
+        second_id = client.post("/conversations", json={}, auth=USER_AUTH).json()["id"]
+
+        client.post(f"/conversations/{first_id}/message", json=question, auth=USER_AUTH)
+        response = client.post(f"/conversations/{second_id}/message", json=question, auth=USER_AUTH)
+
+        assert response.json()["answer"] == "Article 543 applies."
+        assert len(openrouter_service.connections_during_calls) == 1
+        messages = client.get(f"/conversations/{second_id}", auth=USER_AUTH).json()
+        assert [m["content"] for m in messages["messages"]] == [
+            "What does article 543 say?",
+            "Article 543 applies.",
+        ]
+
+    def test_follow_up_question_is_not_served_from_cache(
+        self, client: TestClient, db: Session, openrouter_service: FakeOpenRouterService
+    ) -> None:
+        """Test a question asked after earlier turns is answered with its history."""
+        create_user(db)
+        question = {"question": "What does article 543 say?"}
+        conversation_id = client.post("/conversations", json={}, auth=USER_AUTH).json()["id"]
+
+        client.post(f"/conversations/{conversation_id}/message", json=question, auth=USER_AUTH)
+        client.post(f"/conversations/{conversation_id}/message", json=question, auth=USER_AUTH)
+
+        assert len(openrouter_service.connections_during_calls) == 2
+
+
+class TestAskQuestionStream:
+    """Integration tests for streaming answers as server-sent events."""
+
+    def test_tokens_then_citations(
+        self, client: TestClient, db: Session, openrouter_service: FakeOpenRouterService
+    ) -> None:
+        """Test tokens stream in order and citations come last, once the turn is saved."""
+        create_user(db)
+        conversation_id = client.post("/conversations", json={}, auth=USER_AUTH).json()["id"]
+
+        response = client.post(
+            f"/conversations/{conversation_id}/message/stream",
+            json={"question": "What does article 543 say?"},
+            auth=USER_AUTH,
+        )
+
+        assert response.headers["content-type"].startswith("text/event-stream")
+        events = parse_events(response.text)
+        assert [name for name, _ in events] == ["token", "token", "token", "citations"]
+        assert "".join(data["content"] for _, data in events[:3]) == "Article 543 applies."
+        assert events[-1][1]["conversation_id"] == conversation_id
+        messages = client.get(f"/conversations/{conversation_id}", auth=USER_AUTH).json()
+        assert [m["content"] for m in messages["messages"]][-1] == "Article 543 applies."
+        assert openrouter_service.connections_during_calls == [0, 0, 0]
+
+    def test_provider_error_saves_nothing(
+        self, client: TestClient, db: Session, openrouter_service: FakeOpenRouterService
+    ) -> None:
+        """Test a failed stream ends with an error event and stores no message."""
+        create_user(db)
+        conversation_id = client.post("/conversations", json={}, auth=USER_AUTH).json()["id"]
+        openrouter_service.stream_error = OpenRouterServerException("upstream error")
+
+        response = client.post(
+            f"/conversations/{conversation_id}/message/stream",
+            json={"question": "What does article 543 say?"},
+            auth=USER_AUTH,
+        )
+
+        events = parse_events(response.text)
+        assert [name for name, _ in events] == ["token", "error"]
+        assert events[-1][1] == {"message": "upstream error", "status_code": 500}
+        messages = client.get(f"/conversations/{conversation_id}", auth=USER_AUTH).json()
+        assert messages["messages"] == []
+
+    def test_cached_answer_streams_as_one_token(
+        self, client: TestClient, db: Session, openrouter_service: FakeOpenRouterService
+    ) -> None:
+        """Test a cached answer is streamed whole, followed by the citations."""
+        create_user(db)
+        question = {"question": "What does article 543 say?"}
+        first_id = client.post("/conversations", json={}, auth=USER_AUTH).json()["id"]
+        second_id = client.post("/conversations", json={}, auth=USER_AUTH).json()["id"]
+        client.post(f"/conversations/{first_id}/message", json=question, auth=USER_AUTH)
+
+        response = client.post(
+            f"/conversations/{second_id}/message/stream", json=question, auth=USER_AUTH
+        )
+
+        events = parse_events(response.text)
+        assert events == [
+            ("token", {"content": "Article 543 applies."}),
+            ("citations", {"conversation_id": second_id, "citations": []}),
+        ]
+        assert len(openrouter_service.connections_during_calls) == 1
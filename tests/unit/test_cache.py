@@ -0,0 +1,173 @@
+"""Unit tests for caching utilities."""
+
+import pytest
+
+from app.cache import (
+    CacheStats,
+    SemanticCache,
+    TTLCache,
+    VersionCounter,
+    get_cache_stats,
+    normalize_text,
+    register_cache_stats,
+    register_counters,
+    text_fingerprint,
+)
+
+
+class TestTextFingerprint:
+    """Tests for cache key normalization."""
+
+    def test_whitespace_is_normalized(self) -> None:
+        """Test texts differing only in whitespace share a fingerprint."""
+        assert normalize_text("  المادة   543\n\tمن القانون ") == "المادة 543 من القانون"
+        assert text_fingerprint("Code  des\nobligations") == text_fingerprint(
+            "Code des obligations"
+        )
+
+    def test_different_text_has_different_fingerprint(self) -> None:
+        """Test distinct texts produce distinct fingerprints."""
+        assert text_fingerprint("Article 1") != text_fingerprint("Article 2")
+
+
+class TestCacheStats:
+    """Tests for CacheStats."""
+
+    def test_hit_rate(self) -> None:
+        """Test hit rate reflects recorded hits and misses."""
+        stats = CacheStats("test")
+        stats.record_hits(3)
+        stats.record_misses()
+
+        assert stats.snapshot() == {"hits": 3, "misses": 1, "hit_rate": 0.75}
+
+    def test_empty_hit_rate(self) -> None:
+        """Test hit rate of an unused cache is zero."""
+        assert CacheStats("empty").hit_rate == 0.0
+
+    def test_counters_share_the_registry(self) -> None:
+        """Test counters are reported next to cache statistics."""
+        counters = register_counters("test_counters")
+        counters.increment("prompts")
+        counters.increment("tokens", 12)
+
+        assert register_counters("test_counters") is counters
+        assert get_cache_stats()["test_counters"] == {"prompts": 1, "tokens": 12}
+
+    def test_names_are_unique_across_kinds(self) -> None:
+        """Test a cache cannot reuse the name of registered counters."""
+        register_counters("test_taken")
+
+        with pytest.raises(TypeError):
+            register_cache_stats("test_taken")
+
+
+class TestTTLCache:
+    """Tests for TTLCache."""
+
+    def test_get_and_set(self) -> None:
+        """Test a stored value is returned and counted as a hit."""
+        cache = TTLCache("test_get_and_set", maxsize=2, ttl_seconds=60)
+        cache.set("question", [0.1, 0.2])
+
+        assert cache.get("question") == [0.1, 0.2]
+        assert cache.get("other") is None
+        assert cache.stats.snapshot()["hits"] == 1
+        assert cache.stats.snapshot()["misses"] == 1
+
+    def test_least_recently_used_is_evicted(self) -> None:
+        """Test the least recently used entry is evicted when full."""
+        cache = TTLCache("test_lru", maxsize=2, ttl_seconds=60)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+
+        assert cache.get("b") is None
+        assert cache.get("a") == 1
+        assert cache.get("c") == 3
+
+    def test_expired_entries_are_dropped(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test entries are not served after their TTL."""
+        now = [1000.0]
+        monkeypatch.setattr("app.cache.time.monotonic", lambda: now[0])
+        cache = TTLCache("test_ttl", maxsize=2, ttl_seconds=10)
+        cache.set("a", 1)
+
+        now[0] += 11
+
+        assert cache.get("a") is None
+        assert len(cache) == 0
+
+    def test_zero_size_disables_cache(self) -> None:
+        """Test a cache with maxsize 0 stores nothing."""
+        cache = TTLCache("test_disabled", maxsize=0, ttl_seconds=60)
+        cache.set("a", 1)
+
+        assert cache.get("a") is None
+
+
+class TestSemanticCache:
+    """Tests for SemanticCache."""
+
+    def test_similar_vector_hits(self) -> None:
+        """Test a vector close enough to a stored one returns its value."""
+        cache = SemanticCache("test_semantic_hit", maxsize=2, ttl_seconds=60, threshold=0.95)
+        cache.set([1.0, 0.0, 0.0], 1, "answer")
+
+        assert cache.get([0.99, 0.05, 0.0], 1) == "answer"
+        assert cache.get([0.0, 1.0, 0.0], 1) is None
+        assert cache.stats.snapshot()["hits"] == 1
+        assert cache.stats.snapshot()["misses"] == 1
+
+    def test_other_version_misses(self) -> None:
+        """Test entries of an older version are never served."""
+        cache = SemanticCache("test_semantic_version", maxsize=2, ttl_seconds=60, threshold=0.9)
+        cache.set([1.0, 0.0], 1, "stale")
+
+        assert cache.get([1.0, 0.0], 2) is None
+
+        cache.set([1.0, 0.0], 2, "fresh")
+        assert cache.get([1.0, 0.0], 2) == "fresh"
+
+    def test_least_recently_used_is_evicted(self) -> None:
+        """Test the least recently used entry is replaced when full."""
+        cache = SemanticCache("test_semantic_lru", maxsize=2, ttl_seconds=60, threshold=0.99)
+        cache.set([1.0, 0.0, 0.0], 1, "a")
+        cache.set([0.0, 1.0, 0.0], 1, "b")
+        cache.get([1.0, 0.0, 0.0], 1)
+        cache.set([0.0, 0.0, 1.0], 1, "c")
+
+        assert cache.get([0.0, 1.0, 0.0], 1) is None
+        assert cache.get([1.0, 0.0, 0.0], 1) == "a"
+        assert cache.get([0.0, 0.0, 1.0], 1) == "c"
+
+    def test_expired_entries_miss(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test entries are not served after their TTL."""
+        now = [1000.0]
+        monkeypatch.setattr("app.cache.time.monotonic", lambda: now[0])
+        cache = SemanticCache("test_semantic_ttl", maxsize=2, ttl_seconds=10, threshold=0.9)
+        cache.set([1.0, 0.0], 1, "a")
+
+        now[0] += 11
+
+        assert cache.get([1.0, 0.0], 1) is None
+
+    def test_zero_size_disables_cache(self) -> None:
+        """Test a cache with maxsize 0 stores nothing."""
+        cache = SemanticCache("test_semantic_disabled", maxsize=0, ttl_seconds=60, threshold=0.9)
+        cache.set([1.0], 1, "a")
+
+        assert cache.get([1.0], 1) is None
+
+
+class TestVersionCounter:
+    """Tests for VersionCounter."""
+
+    def test_bump(self) -> None:
+        """Test bumping returns and exposes the new version."""
+        version = VersionCounter()
+
+        assert version.value == 0
+        assert version.bump() == 1
+        assert version.value == 1
@@ -0,0 +1,183 @@
+"""Unit tests for conversation memory service."""
+
+from typing import Any, cast
+from unittest.mock import AsyncMock, MagicMock
+from uuid import uuid4
+
+from app.exceptions import OpenRouterServerException
+from app.models import MessageRole
+from app.services import ConversationMemoryService, OpenRouterService
+from tests.conftest import FakeConversationRepository, FakeMessageRepository
+
+
+class FakeOpenRouterService:
+    """OpenRouter service that summarizes by listing message counts."""
+
+    def __init__(self) -> None:
+        self.prompts: list[str] = []
+
+    async def agenerate_chat_response(
+        self, messages: list[dict[str, Any]], system_prompt: str | None = None
+    ) -> str:
+        self.prompts.append(messages[-1]["content"])
+        return f"summary {len(self.prompts)}"
+
+
+def build_service(
+    db: MagicMock,
+    rows: list[dict[str, Any]],
+    history_turns: int = 2,
+    max_tokens: int = 1000,
+    batch_turns: int = 1,
+) -> Any:
+    """Memory service wired to in-memory fakes."""
+    service: Any = ConversationMemoryService(
+        db=db,
+        openrouter_service=cast(OpenRouterService, FakeOpenRouterService()),
+        history_turns=history_turns,
+        max_history_tokens=max_tokens,
+        summary_batch_turns=batch_turns,
+    )
+    service.message_repository = FakeMessageRepository(rows)
+    service.conversation_repository = FakeConversationRepository()
+    return service
+
+
+def build_rows(turns: int) -> list[dict[str, Any]]:
+    """Alternating user/assistant message rows."""
+    rows = []
+    for turn in range(turns):
+        rows.append({"role": MessageRole.USER, "content": f"question {turn}"})
+        rows.append({"role": MessageRole.ASSISTANT, "content": f"answer {turn}"})
+    return rows
+
+
+def build_conversation(summary: str | None = None, summarized: int = 0) -> dict[str, Any]:
+    """Conversation row with the summary columns."""
+    return {
+        "id": uuid4(),
+        "user_id": uuid4(),
+        "summary": summary,
+        "summary_message_count": summarized,
+    }
+
+
+async def compact(service: Any, conversation: dict[str, Any]) -> None:
+    """Store the conversation in the fake repository and compact it."""
+    service.conversation_repository.conversations[conversation["id"]] = conversation
+    await service.compact(conversation["id"], conversation["user_id"])
+
+
+class TestConversationMemoryService:
+    """Tests for ConversationMemoryService."""
+
+    async def test_short_history_is_sent_verbatim(self, mock_async_db: MagicMock) -> None:
+        """Test conversations within the window are not summarized."""
+        service = build_service(mock_async_db, build_rows(2))
+
+        summary, history = await service.load(build_conversation())
+        await compact(service, build_conversation())
+
+        assert summary is None
+        assert history[0] == {"role": "user", "content": "question 0"}
+        assert len(history) == 4
+        assert service.conversation_repository.summaries == []
+
+    async def test_load_does_not_summarize(self, mock_async_db: MagicMock) -> None:
+        """Test loading sends unsummarized turns verbatim without calling the LLM."""
+        service = build_service(mock_async_db, build_rows(5))
+
+        summary, history = await service.load(build_conversation(summary="earlier"))
+
+        assert summary == "earlier"
+        assert len(history) == 10
+        assert service.openrouter_service.prompts == []
+        assert service.conversation_repository.summaries == []
+
+    async def test_old_turns_are_folded_into_summary(self, mock_async_db: MagicMock) -> None:
+        """Test messages beyond the window are summarized, marked and committed."""
+        service = build_service(mock_async_db, build_rows(5))
+
+        await compact(service, build_conversation(summary="earlier"))
+
+        assert "earlier" in service.openrouter_service.prompts[0]
+        assert "question 2" in service.openrouter_service.prompts[0]
+        assert "question 3" not in service.openrouter_service.prompts[0]
+        assert service.conversation_repository.summaries == [
+            {"summary": "summary 1", "summary_message_count": 6}
+        ]
+        service.db.commit.assert_awaited_once()
+
+    async def test_folding_waits_for_a_full_batch(self, mock_async_db: MagicMock) -> None:
+        """Test fewer overflowing turns than the batch size are kept verbatim."""
+        service = build_service(mock_async_db, build_rows(4), batch_turns=3)
+
+        await compact(service, build_conversation())
+        assert service.openrouter_service.prompts == []
+
+        service.message_repository.messages = build_rows(5)
+        await compact(service, build_conversation())
+        assert service.conversation_repository.summaries == [
+            {"summary": "summary 1", "summary_message_count": 6}
+        ]
+
+    async def test_summarized_messages_are_skipped(self, mock_async_db: MagicMock) -> None:
+        """Test messages already in the summary are not read again."""
+        service = build_service(mock_async_db, build_rows(5))
+
+        summary, history = await service.load(build_conversation("summary", summarized=6))
+        await compact(service, build_conversation("summary", summarized=6))
+
+        assert summary == "summary"
+        assert len(history) == 4
+        assert service.openrouter_service.prompts == []
+
+    async def test_token_budget_limits_window(self, mock_async_db: MagicMock) -> None:
+        """Test the window shrinks to fit the token budget, counting message framing."""
+        service = build_service(mock_async_db, build_rows(2), max_tokens=8, batch_turns=5)
+
+        _, history = await service.load(build_conversation())
+        await compact(service, build_conversation())
+
+        assert [m["content"] for m in history] == ["answer 1"]
+        assert service.conversation_repository.summaries[0]["summary_message_count"] == 3
+
+    async def test_failed_summary_keeps_messages(self, mock_async_db: MagicMock) -> None:
+        """Test a summarization error leaves the conversation unchanged."""
+        service = build_service(mock_async_db, build_rows(5))
+        service.openrouter_service.agenerate_chat_response = AsyncMock(
+            side_effect=OpenRouterServerException("upstream error")
+        )
+
+        await compact(service, build_conversation())
+
+        assert service.conversation_repository.summaries == []
+        service.db.commit.assert_not_awaited()
+
+    async def test_concurrent_compaction_is_discarded(self, mock_async_db: MagicMock) -> None:
+        """Test a summary is not stored when the count advanced while summarizing."""
+        service = build_service(mock_async_db, build_rows(5))
+        conversation = build_conversation()
+        generate = service.openrouter_service.agenerate_chat_response
+
+        async def summarize_concurrently(
+            messages: list[dict[str, Any]], system_prompt: str | None = None
+        ) -> str:
+            conversation["summary_message_count"] = 6
+            summary: str = await generate(messages, system_prompt)
+            return summary
+
+        service.openrouter_service.agenerate_chat_response = summarize_concurrently
+
+        await compact(service, conversation)
+
+        assert service.conversation_repository.summaries == []
+        assert conversation["summary"] is None
+
+    async def test_missing_conversation_is_skipped(self, mock_async_db: MagicMock) -> None:
+        """Test compacting a conversation that no longer exists does nothing."""
+        service = build_service(mock_async_db, build_rows(5))
+
+        await service.compact(uuid4(), uuid4())
+
+        assert service.openrouter_service.prompts == []
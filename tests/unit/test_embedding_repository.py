@@ -0,0 +1,138 @@
+"""Unit tests for embedding repository."""
+
+from typing import Any
+from uuid import uuid4
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.repositories import EmbeddingRepository
+
+
+def build_records(count: int) -> list[dict[str, Any]]:
+    """Embedding records for one document."""
+    document_id = uuid4()
+    return [
+        {
+            "trained_document_id": document_id,
+            "chunk_index": index,
+            "content": f"chunk {index}",
+            "embedding": [float(index), 0.5],
+            "metadata": {"chunk_size": 7},
+        }
+        for index in range(count)
+    ]
+
+
+class TestSaveMany:
+    """Tests for EmbeddingRepository.save_many."""
+
+    def test_inserts_in_batches_without_read_back(self, db: Session) -> None:
+        """Test rows are sent as executemany batches and never selected back."""
+        statements: list[tuple[str, bool]] = []
+
+        def record(
+            conn: Any,
+            cursor: Any,
+            statement: str,
+            parameters: Any,
+            context: Any,
+            executemany: bool,
+        ) -> None:
+            statements.append((statement, executemany))
+
+        records = build_records(5)
+        engine = db.get_bind()
+        event.listen(engine, "before_cursor_execute", record)
+        try:
+            saved = EmbeddingRepository(db).save_many(records, batch_size=2)
+        finally:
+            event.remove(engine, "before_cursor_execute", record)
+
+        assert saved == 5
+        assert len(statements) == 3
+        assert all(sql.startswith("INSERT INTO embeddings") for sql, _ in statements)
+        assert [executemany for _, executemany in statements] == [True, True, False]
+
+    def test_all_records_are_stored(self, db: Session) -> None:
+        """Test every record is stored with its chunk index and metadata."""
+        records = build_records(3)
+        repository = EmbeddingRepository(db)
+
+        repository.save_many(records, batch_size=2)
+
+        rows = repository.find_by_document(records[0]["trained_document_id"])
+        assert [row["chunk_index"] for row in rows] == [0, 1, 2]
+        assert rows[0]["metadata"] == '{"chunk_size": 7}'
+
+    def test_empty_records(self, db: Session) -> None:
+        """Test nothing is executed for an empty batch."""
+        assert EmbeddingRepository(db).save_many([]) == 0
+
+
+class TestProjection:
+    """Tests for reading embedding rows without their vectors."""
+
+    def test_rows_exclude_vectors_by_default(self, db: Session) -> None:
+        """Test lookups and saves return every column except the vectors."""
+        record = build_records(1)[0]
+        repository = EmbeddingRepository(db)
+
+        saved = repository.save(**record)
+        found = repository.find_by_id(saved["id"])
+        listed = repository.find_by_document(record["trained_document_id"])
+
+        assert found is not None
+        for row in (saved, found, listed[0]):
+            assert "embedding" not in row
+            assert "embedding_index" not in row
+            assert row["content"] == "chunk 0"
+
+    def test_vectors_on_request(self, db: Session) -> None:
+        """Test include_vector selects the embedding as well."""
+        record = build_records(1)[0]
+        repository = EmbeddingRepository(db)
+        saved = repository.save(**record)
+
+        found = repository.find_by_id(saved["id"], include_vector=True)
+        listed = repository.find_by_document(record["trained_document_id"], include_vector=True)
+
+        assert found is not None
+        assert list(found["embedding"]) == [0.0, 0.5]
+        assert list(listed[0]["embedding"]) == [0.0, 0.5]
+
+
+class TestCountByDocument:
+    """Tests for EmbeddingRepository.count_by_document."""
+
+    def test_counts_in_sql(self, db: Session) -> None:
+        """Test the count is a single COUNT query scoped to the document."""
+        records = build_records(3)
+        repository = EmbeddingRepository(db)
+        repository.save_many(records + build_records(2))
+        statements: list[str] = []
+
+        def record(
+            conn: Any,
+            cursor: Any,
+            statement: str,
+            parameters: Any,
+            context: Any,
+            executemany: bool,
+        ) -> None:
+            statements.append(statement)
+
+        engine = db.get_bind()
+        event.listen(engine, "before_cursor_execute", record)
+        try:
+            count = repository.count_by_document(records[0]["trained_document_id"])
+        finally:
+            event.remove(engine, "before_cursor_execute", record)
+
+        assert count == 3
+        assert len(statements) == 1
+        assert "count(*)" in statements[0].lower()
+
+    def test_unknown_document_counts_zero(self, db: Session) -> None:
+        """Test a document without embeddings counts zero."""
+        assert EmbeddingRepository(db).count_by_document(uuid4()) == 0
@@ -0,0 +1,252 @@
+"""Unit tests for embedding service."""
+
+from typing import Any, cast
+from unittest.mock import AsyncMock, MagicMock
+
+import numpy as np
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.services.embedding_service import (
+    EmbeddingService,
+    ann_index_cache,
+    invalidate_corpus,
+    maximal_marginal_relevance,
+    query_embedding_cache,
+    search_result_cache,
+)
+
+
+class TestMaximalMarginalRelevance:
+    """Tests for maximal_marginal_relevance."""
+
+    def test_skips_near_duplicates(self) -> None:
+        """Test a near-duplicate of the best candidate loses to a distinct one."""
+        query = np.array([1.0, 0.0, 0.0])
+        candidates = np.array([
+            [1.0, 0.1, 0.0],
+            [1.0, 0.11, 0.0],
+            [0.7, 0.0, 0.7],
+        ])
+
+        assert maximal_marginal_relevance(query, candidates, 2, lambda_mult=0.5) == [0, 2]
+
+    def test_lambda_one_is_relevance_order(self) -> None:
+        """Test lambda 1 ranks by similarity to the query only."""
+        query = np.array([1.0, 0.0])
+        candidates = np.array([[0.5, 0.5], [1.0, 0.0], [0.9, 0.1]])
+
+        assert maximal_marginal_relevance(query, candidates, 3, lambda_mult=1.0) == [1, 2, 0]
+
+    def test_k_larger_than_candidates(self) -> None:
+        """Test every candidate is returned once when k exceeds the pool."""
+        query = np.array([1.0, 0.0])
+        candidates = np.array([[1.0, 0.0], [0.0, 1.0]])
+
+        assert sorted(maximal_marginal_relevance(query, candidates, 5)) == [0, 1]
+
+    def test_empty_candidates(self) -> None:
+        """Test no candidates selects nothing."""
+        assert maximal_marginal_relevance(np.array([1.0]), np.empty((0, 1)), 3) == []
+
+
+class TestHybridSearch:
+    """Tests for the hybrid search query."""
+
+    async def test_single_statement_without_ann_index(self) -> None:
+        """Test the fused query runs once and ranks vectors exactly without an index."""
+        db = MagicMock()
+        db.execute = AsyncMock(return_value=MagicMock())
+        service = EmbeddingService(db, MagicMock())
+
+        await service._hybrid_search("article 543", [0.1] * 4, 5, 0.7, None)
+
+        db.execute.assert_awaited_once()
+        statement, params = db.execute.call_args.args
+        sql = str(statement)
+        assert "content_tsv @@ ts_query" in sql
+        assert "websearch_to_tsquery('arabic'" in sql
+        assert "embedding_index" not in sql
+        assert params["query"] == "article 543"
+        assert "query_index_vector" not in params
+
+
+class TestBatchSimilaritySearch:
+    """Tests for batched query embedding and search."""
+
+    def setup_method(self) -> None:
+        """Start each test with an empty query embedding cache."""
+        query_embedding_cache.clear()
+
+    async def test_embed_queries_single_provider_call(self) -> None:
+        """Test uncached queries are embedded together, once per distinct query."""
+        openrouter_service = MagicMock()
+        openrouter_service.agenerate_embeddings = AsyncMock(return_value=[[1.0], [2.0]])
+        service = EmbeddingService(MagicMock(), openrouter_service)
+
+        first = await service.embed_queries(["a", "b", "a"])
+        second = await service.embed_queries(["b", "a"])
+
+        openrouter_service.agenerate_embeddings.assert_awaited_once()
+        assert sorted(openrouter_service.agenerate_embeddings.call_args.args[0]) == ["a", "b"]
+        assert first[0] == first[2]
+        assert second == [first[1], first[0]]
+
+    async def test_results_grouped_per_query(self) -> None:
+        """Test one statement serves the batch and rows are grouped by query."""
+        rows = [
+            {"query_index": 1, "content": "x", "metadata": '{"page": 1}', "similarity": 0.9},
+            {"query_index": 3, "content": "y", "metadata": None, "similarity": 0.8},
+        ]
+        result = MagicMock()
+        result.mappings.return_value.fetchall.return_value = rows
+        db = MagicMock()
+        db.execute = AsyncMock(return_value=result)
+        openrouter_service = MagicMock()
+        openrouter_service.agenerate_embeddings = AsyncMock(
+            return_value=[[1.0, 0.0], [0.0, 1.0], [1.0, 1.0]]
+        )
+        service = EmbeddingService(db, openrouter_service)
+
+        grouped = await service.batch_similarity_search(["a", "b", "c"], search_mode="exact")
+
+        db.execute.assert_awaited_once()
+        assert "LATERAL" in str(db.execute.call_args.args[0])
+        assert len(db.execute.call_args.args[1]["query_vectors"]) == 3
+        assert grouped == [
+            [{"content": "x", "metadata": {"page": 1}, "similarity": 0.9}],
+            [],
+            [{"content": "y", "metadata": None, "similarity": 0.8}],
+        ]
+
+
+class TestSearchResultCache:
+    """Tests for caching similarity search results."""
+
+    def setup_method(self) -> None:
+        """Start each test with empty query and result caches."""
+        query_embedding_cache.clear()
+        search_result_cache.clear()
+
+    def build_service(self) -> Any:
+        """Embedding service over a database returning one matching chunk."""
+        result = MagicMock()
+        result.mappings.return_value.fetchall.return_value = [
+            {"id": 1, "content": "Article 543", "metadata": None, "similarity": 0.9}
+        ]
+        db = MagicMock()
+        db.execute = AsyncMock(return_value=result)
+        openrouter_service = MagicMock()
+        openrouter_service.agenerate_embedding = AsyncMock(return_value=[0.1, 0.2])
+        return EmbeddingService(db, openrouter_service)
+
+    async def test_repeated_search_skips_database(self) -> None:
+        """Test the same query and parameters are served from the cache."""
+        service = self.build_service()
+
+        first = await service.similarity_search("article 543", 5, 0.7, search_mode="exact")
+        first[0]["content"] = "modified by caller"
+        second = await service.similarity_search("article  543", 5, 0.7, search_mode="exact")
+
+        service.db.execute.assert_awaited_once()
+        assert second[0]["content"] == "Article 543"
+        assert second[0]["rank"] == 1
+
+    async def test_different_parameters_miss(self) -> None:
+        """Test other result counts or thresholds run their own search."""
+        service = self.build_service()
+
+        await service.similarity_search("article 543", 5, 0.7, search_mode="exact")
+        await service.similarity_search("article 543", 3, 0.7, search_mode="exact")
+        await service.similarity_search("article 543", 5, 0.5, search_mode="exact")
+
+        assert service.db.execute.await_count == 3
+
+    async def test_ingestion_invalidates_results(self) -> None:
+        """Test results cached before training are not served after it."""
+        service = self.build_service()
+
+        await service.similarity_search("article 543", 5, 0.7, search_mode="exact")
+        invalidate_corpus()
+        await service.similarity_search("article 543", 5, 0.7, search_mode="exact")
+
+        assert service.db.execute.await_count == 2
+
+
+class FakeSearchDatabase:
+    """Async session answering the ANN index lookup and recording search statements."""
+
+    def __init__(self, index_definition: str | None) -> None:
+        self.index_definition = index_definition
+        self.statements: list[str] = []
+
+    async def execute(self, statement: Any, params: dict[str, Any] | None = None) -> MagicMock:
+        sql = str(statement)
+        self.statements.append(sql)
+        result = MagicMock()
+        result.scalar.return_value = self.index_definition if "pg_indexes" in sql else None
+        result.mappings.return_value.fetchall.return_value = []
+        return result
+
+    def searches(self) -> list[str]:
+        """Statements other than the index lookup and session settings."""
+        return [sql for sql in self.statements if "FROM embeddings" in sql]
+
+
+class TestAnnSearch:
+    """Tests for choosing between the ANN index and the exact scan."""
+
+    def setup_method(self) -> None:
+        """Start each test with no remembered index and no cached results."""
+        ann_index_cache.clear()
+        query_embedding_cache.clear()
+        search_result_cache.clear()
+
+    def build_service(self, db: FakeSearchDatabase) -> EmbeddingService:
+        """Embedding service over a fake database."""
+        openrouter_service = MagicMock()
+        openrouter_service.agenerate_embedding = AsyncMock(return_value=[0.1, 0.2])
+        return EmbeddingService(cast(AsyncSession, db), openrouter_service)
+
+    async def test_hnsw_index_is_used(self) -> None:
+        """Test an HNSW index is searched after sizing ef_search."""
+        db = FakeSearchDatabase(
+            "CREATE INDEX ix ON public.embeddings USING hnsw (embedding_index halfvec_cosine_ops)"
+        )
+
+        await self.build_service(db).similarity_search("article 543", 5, 0.7, search_mode="ann")
+
+        assert any("hnsw.ef_search" in sql for sql in db.statements)
+        assert "ORDER BY embedding_index <=>" in db.searches()[0]
+
+    async def test_missing_index_falls_back_to_exact_scan(self) -> None:
+        """Test the full-precision scan is used when no ANN index exists."""
+        db = FakeSearchDatabase(None)
+
+        await self.build_service(db).similarity_search("article 543", 5, 0.7, search_mode="ann")
+
+        assert "embedding_index" not in db.searches()[0]
+
+    async def test_exact_mode_skips_index_lookup(self) -> None:
+        """Test exact searches do not look the index up at all."""
+        db = FakeSearchDatabase("USING hnsw")
+
+        await self.build_service(db).similarity_search("article 543", 5, 0.7, search_mode="exact")
+
+        assert not any("pg_indexes" in sql for sql in db.statements)
+
+    async def test_index_created_later_is_picked_up(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test a missing index is looked up again once the check expires."""
+        now = [1000.0]
+        monkeypatch.setattr("app.cache.time.monotonic", lambda: now[0])
+        db = FakeSearchDatabase(None)
+        service = self.build_service(db)
+
+        await service.similarity_search("article 543", 5, 0.7, search_mode="ann")
+        db.index_definition = "USING hnsw"
+        await service.similarity_search("article 543", 4, 0.7, search_mode="ann")
+        assert "embedding_index" not in db.searches()[1]
+
+        now[0] += ann_index_cache.ttl_seconds + 1
+        await service.similarity_search("article 543", 3, 0.7, search_mode="ann")
+        assert "ORDER BY embedding_index <=>" in db.searches()[2]
@@ -0,0 +1,234 @@
+"""Unit tests for OpenRouter service."""
+
+import asyncio
+import threading
+from typing import Any
+
+import httpx
+import openai
+import pytest
+
+from app.exceptions import (
+    OpenRouterBadRequestException,
+    OpenRouterRateLimitException,
+    OpenRouterServerException,
+)
+from app.services import OpenRouterService, get_openrouter_clients
+from app.services.openrouter_service import chat_flights, embedding_flights
+
+
+def status_error(status_code: int) -> openai.APIStatusError:
+    """Provider error as raised by the OpenAI client for an HTTP status."""
+    request = httpx.Request("POST", "https://openrouter.ai/api/v1/embeddings")
+    response = httpx.Response(status_code, request=request)
+    return openai.APIStatusError(f"Error code: {status_code}", response=response, body=None)
+
+
+class FakeEmbeddingModel:
+    """Embedding model that encodes each text as its length."""
+
+    def __init__(self, failures: dict[str, list[Exception]] | None = None) -> None:
+        self.failures = failures or {}
+        self.calls: list[list[str]] = []
+        self._lock = threading.Lock()
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        with self._lock:
+            self.calls.append(texts)
+            pending = self.failures.get(texts[0])
+            if pending:
+                raise pending.pop(0)
+        return [[float(len(text))] for text in texts]
+
+
+@pytest.fixture
+def openrouter_service() -> OpenRouterService:
+    """OpenRouter service with small batches and no retry delay."""
+    service = OpenRouterService()
+    service.embedding_batch_size = 2
+    service.embedding_max_concurrency = 3
+    service.retry_backoff_seconds = 0
+    return service
+
+
+class TestGenerateEmbeddings:
+    """Tests for batched embedding generation."""
+
+    def test_batches_preserve_order(
+        self, openrouter_service: OpenRouterService, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test vectors come back in input order across batches."""
+        model = FakeEmbeddingModel()
+        monkeypatch.setattr(openrouter_service, "embedding_model", model)
+        texts = ["a" * length for length in range(1, 8)]
+
+        vectors = openrouter_service.generate_embeddings(texts)
+
+        assert vectors == [[float(length)] for length in range(1, 8)]
+        assert sorted(len(batch) for batch in model.calls) == [1, 2, 2, 2]
+
+    def test_rate_limited_batch_is_retried(
+        self, openrouter_service: OpenRouterService, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test a 429 on one batch is retried without failing the others."""
+        model = FakeEmbeddingModel({"ccc": [status_error(429)]})
+        monkeypatch.setattr(openrouter_service, "embedding_model", model)
+
+        vectors = openrouter_service.generate_embeddings(["a", "bb", "ccc", "dddd"])
+
+        assert vectors == [[1.0], [2.0], [3.0], [4.0]]
+        assert len(model.calls) == 3
+
+    def test_retries_are_bounded(
+        self, openrouter_service: OpenRouterService, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test a batch that keeps failing raises after the retry budget."""
+        openrouter_service.max_retries = 2
+        model = FakeEmbeddingModel({"a": [status_error(429)] * 3})
+        monkeypatch.setattr(openrouter_service, "embedding_model", model)
+
+        with pytest.raises(OpenRouterRateLimitException):
+            openrouter_service.generate_embeddings(["a", "bb", "ccc"])
+
+    def test_client_errors_are_not_retried(
+        self, openrouter_service: OpenRouterService, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test a 400 fails immediately."""
+        model = FakeEmbeddingModel({"a": [status_error(400)]})
+        monkeypatch.setattr(openrouter_service, "embedding_model", model)
+
+        with pytest.raises(OpenRouterBadRequestException):
+            openrouter_service.generate_embeddings(["a"])
+
+        assert len(model.calls) == 1
+
+    def test_transport_errors_are_retried(
+        self, openrouter_service: OpenRouterService, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test connection failures and timeouts are retried."""
+        request = httpx.Request("POST", "https://openrouter.ai/api/v1/embeddings")
+        model = FakeEmbeddingModel({
+            "a": [openai.APIConnectionError(request=request), httpx.ReadTimeout("timed out")]
+        })
+        monkeypatch.setattr(openrouter_service, "embedding_model", model)
+
+        assert openrouter_service.generate_embeddings(["a"]) == [[1.0]]
+        assert len(model.calls) == 3
+
+    def test_unknown_errors_are_not_retried(
+        self, openrouter_service: OpenRouterService, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test an unrecognised exception fails without retrying."""
+        model = FakeEmbeddingModel({"a": [ValueError("unexpected response shape")]})
+        monkeypatch.setattr(openrouter_service, "embedding_model", model)
+
+        with pytest.raises(OpenRouterServerException):
+            openrouter_service.generate_embeddings(["a"])
+
+        assert len(model.calls) == 1
+
+    def test_embedding_client_does_not_retry(self) -> None:
+        """Test only this service retries embeddings, not the OpenAI client as well."""
+        assert get_openrouter_clients().embedding_model.max_retries == 0
+
+
+class TestSharedClients:
+    """Tests for the application-wide OpenRouter clients."""
+
+    def test_services_reuse_shared_clients(self) -> None:
+        """Test services are built on the same models and HTTP pool."""
+        first = OpenRouterService()
+        second = OpenRouterService()
+
+        clients = get_openrouter_clients()
+        assert first.chat_model is second.chat_model is clients.chat_model
+        assert first.embedding_model is second.embedding_model is clients.embedding_model
+        assert clients.chat_model.http_async_client is clients.http_async_client
+
+
+class TestLangchainMessages:
+    """Tests for converting role/content dicts to langchain messages."""
+
+    def test_roles_map_to_message_types(self, openrouter_service: OpenRouterService) -> None:
+        """Test system, user and assistant roles map regardless of case."""
+        messages = openrouter_service._to_langchain_messages([
+            {"role": "system", "content": "context"},
+            {"role": "USER", "content": "question"},
+            {"role": "ASSISTANT", "content": "answer"},
+        ])
+
+        assert [type(m).__name__ for m in messages] == [
+            "SystemMessage",
+            "HumanMessage",
+            "AIMessage",
+        ]
+
+
+class FakeAsyncModel:
+    """Async chat and embedding model that counts requests and answers after a delay."""
+
+    def __init__(self) -> None:
+        self.calls = 0
+
+    async def ainvoke(self, messages: list[Any]) -> object:
+        self.calls += 1
+        await asyncio.sleep(0.01)
+        return type("Response", (), {"content": f"answer to {messages[-1].content}"})()
+
+    async def aembed_documents(self, texts: list[str]) -> list[list[float]]:
+        self.calls += 1
+        await asyncio.sleep(0.01)
+        return [[float(len(text))] for text in texts]
+
+
+class TestRequestCoalescing:
+    """Tests for coalescing concurrent identical requests."""
+
+    async def test_identical_chat_requests_share_one_call(
+        self, openrouter_service: OpenRouterService, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test concurrent identical chat calls reach the provider once."""
+        model = FakeAsyncModel()
+        monkeypatch.setattr(openrouter_service, "chat_model", model)
+        coalesced = chat_flights.metrics.get("coalesced")
+        question = [{"role": "user", "content": "article 543"}]
+
+        answers = await asyncio.gather(
+            *(openrouter_service.agenerate_chat_response(question) for _ in range(3)),
+            openrouter_service.agenerate_chat_response([{"role": "user", "content": "other"}]),
+        )
+
+        assert answers[:3] == ["answer to article 543"] * 3
+        assert answers[3] == "answer to other"
+        assert model.calls == 2
+        assert chat_flights.metrics.get("coalesced") - coalesced == 2
+
+    async def test_identical_embedding_requests_share_one_call(
+        self, openrouter_service: OpenRouterService, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test concurrent identical embedding calls reach the provider once."""
+        model = FakeAsyncModel()
+        monkeypatch.setattr(openrouter_service, "embedding_model", model)
+        coalesced = embedding_flights.metrics.get("coalesced")
+
+        vectors = await asyncio.gather(
+            *(openrouter_service.agenerate_embedding("article 543") for _ in range(3))
+        )
+
+        assert vectors == [[11.0]] * 3
+        assert model.calls == 1
+        assert embedding_flights.metrics.get("coalesced") - coalesced == 2
+
+    async def test_coalescing_can_be_disabled(
+        self, openrouter_service: OpenRouterService, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test every call reaches the provider when coalescing is off."""
+        openrouter_service.coalescing_enabled = False
+        model = FakeAsyncModel()
+        monkeypatch.setattr(openrouter_service, "embedding_model", model)
+
+        await asyncio.gather(
+            *(openrouter_service.agenerate_embedding("article 543") for _ in range(3))
+        )
+
+        assert model.calls == 3
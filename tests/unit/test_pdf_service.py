@@ -0,0 +1,118 @@
+"""Unit tests for PDF service."""
+
+from collections.abc import Callable
+from concurrent.futures import Future
+from io import BytesIO
+from typing import Any
+
+import pytest
+from pypdf import PdfWriter
+from pypdf.generic import DecodedStreamObject, DictionaryObject, NameObject
+
+from app.services import PdfService, shutdown_extraction_pool
+from app.services import pdf_service as pdf_service_module
+
+
+def build_pdf(page_count: int) -> bytes:
+    """Build a PDF whose pages contain the text 'Page <n>'."""
+    writer = PdfWriter()
+    font = writer._add_object(
+        DictionaryObject({
+            NameObject("/Type"): NameObject("/Font"),
+            NameObject("/Subtype"): NameObject("/Type1"),
+            NameObject("/BaseFont"): NameObject("/Helvetica"),
+        })
+    )
+
+    for number in range(page_count):
+        page = writer.add_blank_page(width=612, height=792)
+        content = DecodedStreamObject()
+        content.set_data(f"BT /F1 12 Tf 72 720 Td (Page {number}) Tj ET".encode())
+        page[NameObject("/Contents")] = writer._add_object(content)
+        page[NameObject("/Resources")] = DictionaryObject({
+            NameObject("/Font"): DictionaryObject({NameObject("/F1"): font}),
+        })
+
+    buffer = BytesIO()
+    writer.write(buffer)
+    return buffer.getvalue()
+
+
+class InlineProcessPool:
+    """Process pool stand-in that runs tasks in-process and records their arguments."""
+
+    def __init__(self) -> None:
+        self.tasks: list[tuple[Any, ...]] = []
+
+    def submit(self, func: Callable[..., Any], *args: Any) -> Future[Any]:
+        self.tasks.append(args)
+        future: Future[Any] = Future()
+        future.set_result(func(*args))
+        return future
+
+
+class TestPdfService:
+    """Tests for PdfService."""
+
+    def teardown_method(self) -> None:
+        """Stop the extraction pool started by a test."""
+        shutdown_extraction_pool()
+
+    def test_extract_text_serial(self) -> None:
+        """Test serial extraction joins pages in order."""
+        pdf_service = PdfService(extraction_workers=1)
+
+        text = pdf_service.extract_text(build_pdf(3), "serial.pdf")
+
+        assert text == "Page 0\nPage 1\nPage 2"
+
+    def test_extract_text_parallel_preserves_page_order(self) -> None:
+        """Test parallel extraction returns the same text as serial extraction."""
+        content = build_pdf(11)
+        serial_service = PdfService(extraction_workers=1)
+        parallel_service = PdfService(extraction_workers=2, pages_per_task=3, parallel_min_pages=0)
+
+        parallel_text = parallel_service.extract_text(content, "parallel.pdf")
+
+        assert parallel_text == serial_service.extract_text(content, "parallel.pdf")
+        assert parallel_text.splitlines() == [f"Page {n}" for n in range(11)]
+
+    def test_parallel_tasks_share_one_pool(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test documents reuse the shared pool and tasks are split by page range."""
+        pool = InlineProcessPool()
+        monkeypatch.setattr(pdf_service_module, "get_extraction_pool", lambda: pool)
+        content = build_pdf(10)
+        pdf_service = PdfService(extraction_workers=3, pages_per_task=2, parallel_min_pages=4)
+
+        text = pdf_service.extract_text(content, "a.pdf")
+        pdf_service.extract_text(content, "b.pdf")
+
+        checksum = pdf_service.calculate_checksum(content)
+        ranges = [(0, 2), (2, 4), (4, 6), (6, 8), (8, 10)]
+        assert pool.tasks == [(checksum, content, start, stop) for start, stop in ranges] * 2
+        assert text.splitlines() == [f"Page {n}" for n in range(10)]
+
+    def test_short_documents_are_extracted_serially(
+        self, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test documents under the page threshold never reach the pool."""
+        pool = InlineProcessPool()
+        monkeypatch.setattr(pdf_service_module, "get_extraction_pool", lambda: pool)
+        pdf_service = PdfService(extraction_workers=4, pages_per_task=2, parallel_min_pages=8)
+
+        text = pdf_service.extract_text(build_pdf(6), "short.pdf")
+
+        assert pool.tasks == []
+        assert text.splitlines() == [f"Page {n}" for n in range(6)]
+
+    def test_chunk_text_overlap(self) -> None:
+        """Test chunks overlap by the configured amount."""
+        pdf_service = PdfService(chunk_size=10, chunk_overlap=4)
+
+        chunks = pdf_service.chunk_text("abcdefghijklmnopqrstuvwxyz", "alphabet.pdf")
+
+        assert chunks[0] == "abcdefghij"
+        assert chunks[1].startswith("ghij")
+        assert "".join(chunk[4:] if i else chunk for i, chunk in enumerate(chunks)) == (
+            "abcdefghijklmnopqrstuvwxyz"
+        )
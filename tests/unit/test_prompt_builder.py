@@ -0,0 +1,167 @@
+"""Unit tests for prompt builder."""
+
+from typing import Any
+from unittest.mock import MagicMock
+
+from app.services import ConversationMemoryService, PdfService
+from app.services.prompt_builder import (
+    NO_CONTEXT_TEXT,
+    PromptBuilder,
+    merge_adjacent_chunks,
+    prompt_metrics,
+)
+from app.tokenizer import count_message_tokens, count_tokens
+
+
+def build_result(chunk_index: int, similarity: float, words: int = 50) -> dict[str, Any]:
+    """Search result with a chunk of the given length."""
+    return {
+        "trained_document_id": "doc",
+        "chunk_index": chunk_index,
+        "similarity": similarity,
+        "content": " ".join(f"word{chunk_index}" for _ in range(words)),
+    }
+
+
+class TestPromptBuilder:
+    """Tests for PromptBuilder."""
+
+    def test_everything_fits(self) -> None:
+        """Test all sections are included when within budget."""
+        builder = PromptBuilder("instructions", max_tokens=10000)
+        history = [{"role": "user", "content": "hi"}, {"role": "assistant", "content": "hello"}]
+
+        prompt = builder.build("question?", [build_result(0, 0.9)], history, summary="earlier")
+
+        assert prompt["messages"][1:] == [*history, {"role": "user", "content": "question?"}]
+        assert "word0" in prompt["messages"][0]["content"]
+        assert "earlier" in prompt["messages"][0]["content"]
+        assert len(prompt["results"]) == 1
+        assert prompt["tokens"]["total"] == sum(
+            prompt["tokens"][section] for section in ("system", "history", "context", "question")
+        )
+
+    def test_drops_lowest_scoring_chunks(self) -> None:
+        """Test chunks that do not fit are dropped from the lowest score up."""
+        results = [build_result(0, 0.7), build_result(1, 0.9), build_result(2, 0.8)]
+        chunk_tokens = count_tokens(results[0]["content"])
+        builder = PromptBuilder("instructions", max_tokens=2 * chunk_tokens + 150)
+
+        prompt = builder.build("question?", results, [])
+
+        assert [r["chunk_index"] for r in prompt["results"]] == [1, 2]
+        assert "word0" not in prompt["messages"][0]["content"]
+        assert prompt["tokens"]["total"] <= builder.max_tokens
+
+    def test_drops_lowest_ranked_chunks(self) -> None:
+        """Test the search rank, not cosine similarity, decides which chunks stay."""
+        results = [
+            {**build_result(0, 0.9), "rank": 3},
+            {**build_result(1, 0.6), "rank": 1},
+            {**build_result(2, 0.8), "rank": 2},
+        ]
+        chunk_tokens = count_tokens(results[0]["content"])
+        builder = PromptBuilder("instructions", max_tokens=2 * chunk_tokens + 150)
+
+        prompt = builder.build("question?", results, [])
+
+        assert [r["chunk_index"] for r in prompt["results"]] == [1, 2]
+
+    def test_truncates_best_chunk_when_nothing_fits(self) -> None:
+        """Test an oversized best chunk is truncated rather than dropped."""
+        builder = PromptBuilder("instructions", max_tokens=250)
+        truncated = prompt_metrics.get("chunks_truncated")
+
+        prompt = builder.build("question?", [build_result(0, 0.9, words=1000)], [])
+
+        assert len(prompt["results"]) == 1
+        assert prompt["tokens"]["context"] < count_tokens(" ".join(["word0"] * 1000))
+        assert prompt_metrics.get("chunks_truncated") == truncated + 1
+
+    def test_history_is_trimmed_oldest_first(self) -> None:
+        """Test history beyond its budget loses the oldest messages."""
+        builder = PromptBuilder("instructions", max_tokens=10000, max_history_tokens=30)
+        history = [
+            {"role": "user", "content": " ".join(["old"] * 40)},
+            {"role": "assistant", "content": "recent"},
+        ]
+
+        prompt = builder.build("question?", [], history)
+
+        assert prompt["messages"][1:-1] == [{"role": "assistant", "content": "recent"}]
+        assert NO_CONTEXT_TEXT in prompt["messages"][0]["content"]
+
+    def test_history_loaded_by_memory_is_kept(self) -> None:
+        """Test history fitted by the memory service is not trimmed again."""
+        memory = ConversationMemoryService(
+            db=MagicMock(), openrouter_service=MagicMock(), max_history_tokens=40
+        )
+        window = [
+            {"role": "user" if n % 2 == 0 else "assistant", "content": f"message number {n}"}
+            for n in range(8)
+        ]
+        history = memory._recent_messages(window)
+        builder = PromptBuilder("instructions", max_tokens=10000, max_history_tokens=40)
+
+        prompt = builder.build("question?", [], history)
+
+        assert 0 < len(history) < len(window)
+        assert prompt["messages"][1:-1] == history
+        assert prompt["tokens"]["history"] == sum(map(count_message_tokens, history))
+
+
+class TestMergeAdjacentChunks:
+    """Tests for merging neighbouring chunks."""
+
+    def test_contiguous_chunks_merge_without_overlap(self) -> None:
+        """Test a run of overlapping chunks becomes the original text once."""
+        text = " ".join(f"article {n} of the code." for n in range(200))
+        chunks = PdfService(chunk_size=300, chunk_overlap=60).chunk_text(text, "code.pdf")
+        results = [
+            {
+                "trained_document_id": "doc",
+                "chunk_index": i,
+                "similarity": 0.5 + i / 100,
+                "content": c,
+            }
+            for i, c in enumerate(chunks[:3])
+        ]
+
+        passages = merge_adjacent_chunks(list(reversed(results)))
+
+        assert len(passages) == 1
+        assert passages[0]["content"] == text[:len(passages[0]["content"])]
+        assert len(passages[0]["content"]) == 300 * 3 - 60 * 2
+        assert passages[0]["chunk_indices"] == [0, 1, 2]
+        assert passages[0]["similarity"] == 0.52
+        assert passages[0]["chunks"] == results
+
+    def test_gaps_and_documents_stay_separate(self) -> None:
+        """Test non-contiguous chunks and other documents are not merged."""
+        results = [
+            {"trained_document_id": "a", "chunk_index": 1, "similarity": 0.9, "content": "one"},
+            {"trained_document_id": "a", "chunk_index": 3, "similarity": 0.7, "content": "three"},
+            {"trained_document_id": "b", "chunk_index": 2, "similarity": 0.8, "content": "two"},
+        ]
+
+        passages = merge_adjacent_chunks(results)
+
+        assert [(p["trained_document_id"], p["chunk_indices"]) for p in passages] == [
+            ("a", [1]), ("b", [2]), ("a", [3]),
+        ]
+
+    def test_passages_keep_retrieval_order(self) -> None:
+        """Test passages are ordered by their best chunk's rank, not similarity."""
+        results = [
+            {"trained_document_id": "a", "chunk_index": 1, "similarity": 0.9, "rank": 3,
+             "content": "one"},
+            {"trained_document_id": "b", "chunk_index": 4, "similarity": 0.6, "rank": 2,
+             "content": "four"},
+            {"trained_document_id": "b", "chunk_index": 5, "similarity": 0.5, "rank": 1,
+             "content": "five"},
+        ]
+
+        passages = merge_adjacent_chunks(results)
+
+        assert [(p["trained_document_id"], p["rank"]) for p in passages] == [("b", 1), ("a", 3)]
+        assert passages[0]["similarity"] == 0.6
@@ -0,0 +1,145 @@
+"""Unit tests for RAG service."""
+
+from collections.abc import AsyncIterator
+from typing import Any
+from unittest.mock import AsyncMock, MagicMock
+from uuid import uuid4
+
+import pytest
+
+from app.exceptions import OpenRouterServerException
+from app.services import RAGService
+from app.services.embedding_service import corpus_version
+from app.services.rag_service import answer_cache
+from tests.conftest import FakeConversationRepository, FakeMessageRepository
+
+
+def build_service(db: MagicMock, embedding: list[float]) -> Any:
+    """RAG service whose retrieval and generation are stubbed."""
+    openrouter_service = MagicMock()
+    openrouter_service.agenerate_chat_response = AsyncMock(return_value="Article 543 applies.")
+
+    service: Any = RAGService(db, openrouter_service)
+    service.conversation_repository = FakeConversationRepository()
+    service.message_repository = FakeMessageRepository()
+    service.embedding_service = MagicMock()
+    service.embedding_service.embed_query = AsyncMock(return_value=embedding)
+    service.embedding_service.similarity_search = AsyncMock(return_value=[])
+    return service
+
+
+class TestAnswerCache:
+    """Tests for the semantic answer cache of questions without history."""
+
+    def setup_method(self) -> None:
+        """Start each test with an empty answer cache."""
+        answer_cache.clear()
+
+    async def test_similar_question_is_served_from_cache(self, mock_async_db: MagicMock) -> None:
+        """Test a near-identical first question skips retrieval and generation."""
+        first = build_service(mock_async_db, [1.0, 0.0])
+        await first.ask_question("What does article 543 say?", uuid4())
+
+        second = build_service(mock_async_db, [0.999, 0.01])
+        answer, _, conversation_id = await second.ask_question(
+            "What does article 543 state?", uuid4()
+        )
+
+        assert answer == "Article 543 applies."
+        second.embedding_service.similarity_search.assert_not_awaited()
+        second.openrouter_service.agenerate_chat_response.assert_not_awaited()
+        assert [m["content"] for m in second.message_repository.messages] == [
+            "What does article 543 state?",
+            "Article 543 applies.",
+        ]
+        messages = second.message_repository.messages
+        assert all(m["conversation_id"] == conversation_id for m in messages)
+
+    async def test_streamed_question_is_served_from_cache(self, mock_async_db: MagicMock) -> None:
+        """Test a cached answer streams as one token event and the turn is saved."""
+        first = build_service(mock_async_db, [1.0, 0.0])
+        await first.ask_question("What does article 543 say?", uuid4())
+
+        service = build_service(mock_async_db, [1.0, 0.0])
+        service.openrouter_service.astream_chat_response = MagicMock()
+        events = await service.stream_question("What does article 543 say?", uuid4())
+        events = [event async for event in events]
+
+        assert [event["event"] for event in events] == ["token", "citations"]
+        assert events[0]["data"] == {"content": "Article 543 applies."}
+        service.embedding_service.similarity_search.assert_not_awaited()
+        service.openrouter_service.astream_chat_response.assert_not_called()
+        assert len(service.message_repository.messages) == 2
+
+    async def test_training_invalidates_cached_answers(self, mock_async_db: MagicMock) -> None:
+        """Test answers cached before the corpus changed are not served."""
+        first = build_service(mock_async_db, [1.0, 0.0])
+        await first.ask_question("What does article 543 say?", uuid4())
+        corpus_version.bump()
+
+        service = build_service(mock_async_db, [1.0, 0.0])
+        await service.ask_question("What does article 543 say?", uuid4())
+
+        service.openrouter_service.agenerate_chat_response.assert_awaited_once()
+
+
+class TestUnitOfWorkScope:
+    """Tests for keeping the unit of work to the write phase of a turn."""
+
+    def setup_method(self) -> None:
+        """Start each test with an empty answer cache."""
+        answer_cache.clear()
+
+    async def test_generation_runs_outside_unit_of_work(self, mock_async_db: MagicMock) -> None:
+        """Test the answer is generated before the turn's unit of work starts."""
+        service = build_service(mock_async_db, [1.0, 0.0])
+        depths: list[int] = []
+
+        async def generate(messages: list[dict[str, Any]]) -> str:
+            depths.append(service.db.info.get("unit_of_work_depth", 0))
+            return "Article 543 applies."
+
+        service.openrouter_service.agenerate_chat_response = generate
+
+        await service.ask_question("What does article 543 say?", uuid4())
+
+        assert depths == [0]
+        service.db.commit.assert_awaited_once()
+        assert len(service.message_repository.messages) == 2
+
+    async def test_failed_generation_writes_nothing(self, mock_async_db: MagicMock) -> None:
+        """Test no conversation or message is written when generation fails."""
+        service = build_service(mock_async_db, [1.0, 0.0])
+        service.openrouter_service.agenerate_chat_response = AsyncMock(
+            side_effect=OpenRouterServerException("upstream error")
+        )
+        service.conversation_repository.create = AsyncMock()
+
+        with pytest.raises(OpenRouterServerException):
+            await service.ask_question("What does article 543 say?", uuid4())
+
+        service.conversation_repository.create.assert_not_awaited()
+        assert service.message_repository.messages == []
+        service.db.commit.assert_not_awaited()
+
+
+class TestStreamQuestion:
+    """Tests for saving streamed turns."""
+
+    async def test_disconnect_saves_nothing(self, mock_async_db: MagicMock) -> None:
+        """Test a stream closed by the client before the end stores no turn."""
+        service = build_service(mock_async_db, [1.0, 0.0])
+
+        async def stream(messages: list[dict[str, Any]]) -> AsyncIterator[str]:
+            for token in ("Article ", "543 ", "applies."):
+                yield token
+
+        service.openrouter_service.astream_chat_response = stream
+        events = await service.stream_question("What does article 543 say?", uuid4())
+
+        first = await anext(events)
+        await events.aclose()
+
+        assert first == {"event": "token", "data": {"content": "Article "}}
+        assert service.message_repository.messages == []
+        service.db.commit.assert_not_awaited()
@@ -0,0 +1,60 @@
+"""Unit tests for security utilities."""
+
+import threading
+
+import pytest
+
+from app import security
+from app.exceptions import ServiceUnavailableException
+from app.security import (
+    _arun_password_task,
+    _run_password_task,
+    averify_password,
+    hash_password,
+    verify_password,
+)
+
+
+class TestPasswordWorkerPool:
+    """Tests for the bounded bcrypt executor."""
+
+    def test_hash_and_verify_round_trip(self) -> None:
+        """Test hashing and verification run on the executor."""
+        password_hash = hash_password("password123")
+
+        assert verify_password("password123", password_hash)
+        assert not verify_password("wrongpassword", password_hash)
+
+    def test_rejects_when_queue_is_full(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test calls beyond the admission limit are shed."""
+        monkeypatch.setattr(security, "_password_slots", threading.BoundedSemaphore(1))
+        security._password_slots.acquire()
+
+        with pytest.raises(ServiceUnavailableException):
+            _run_password_task(str.upper, "password")
+
+    def test_times_out_after_deadline(self) -> None:
+        """Test a call that misses its deadline raises and frees its slot later."""
+        release = threading.Event()
+
+        with pytest.raises(ServiceUnavailableException):
+            _run_password_task(lambda _: release.wait(5), "password", timeout=0.05)
+
+        release.set()
+        assert _run_password_task(str.upper, "password") == "PASSWORD"
+
+    async def test_async_verify_round_trip(self) -> None:
+        """Test passwords are verified from async code through the same executor."""
+        password_hash = hash_password("password123")
+
+        assert await averify_password("password123", password_hash)
+        assert not await averify_password("wrongpassword", password_hash)
+
+    async def test_async_times_out_after_deadline(self) -> None:
+        """Test an async call that misses its deadline raises instead of waiting."""
+        release = threading.Event()
+
+        with pytest.raises(ServiceUnavailableException):
+            await _arun_password_task(lambda _: release.wait(5), "password", timeout=0.05)
+
+        release.set()
@@ -0,0 +1,84 @@
+"""Unit tests for single-flight call coalescing."""
+
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from app.singleflight import SingleFlight
+
+
+class TestSingleFlight:
+    """Tests for SingleFlight."""
+
+    def test_concurrent_sync_calls_share_one_execution(self) -> None:
+        """Test threads calling with the same key wait for the first call."""
+        flight = SingleFlight("test_singleflight_sync")
+        started = threading.Event()
+        release = threading.Event()
+        calls: list[str] = []
+
+        def fetch(text: str) -> str:
+            calls.append(text)
+            started.set()
+            release.wait(5)
+            return text.upper()
+
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            leader = executor.submit(flight.do, "key", fetch, "a")
+            started.wait(5)
+            followers = [executor.submit(flight.do, "key", fetch, "a") for _ in range(2)]
+            while flight.metrics.get("coalesced") < 2:
+                time.sleep(0.001)
+            release.set()
+            results = [leader.result(), *(f.result() for f in followers)]
+
+        assert results == ["A", "A", "A"]
+        assert calls == ["a"]
+        assert flight.metrics.snapshot() == {"executed": 1, "coalesced": 2}
+
+    def test_sync_exception_is_shared_and_not_kept(self) -> None:
+        """Test a failure reaches the caller and the next call runs again."""
+        flight = SingleFlight("test_singleflight_sync_error")
+
+        def fail() -> None:
+            raise ValueError("rate limited")
+
+        with pytest.raises(ValueError):
+            flight.do("key", fail)
+        assert flight.do("key", lambda: "ok") == "ok"
+
+    async def test_concurrent_async_calls_share_one_execution(self) -> None:
+        """Test coroutines awaiting the same key share one task."""
+        flight = SingleFlight("test_singleflight_async")
+        calls: list[str] = []
+
+        async def fetch(text: str) -> str:
+            calls.append(text)
+            await asyncio.sleep(0.01)
+            return text.upper()
+
+        results = await asyncio.gather(
+            *(flight.ado("key", fetch, "a") for _ in range(3)), flight.ado("other", fetch, "b")
+        )
+
+        assert results == ["A", "A", "A", "B"]
+        assert sorted(calls) == ["a", "b"]
+        assert flight.metrics.snapshot() == {"executed": 2, "coalesced": 2}
+
+    async def test_cancelled_caller_does_not_cancel_others(self) -> None:
+        """Test the shared call completes for the remaining callers."""
+        flight = SingleFlight("test_singleflight_cancel")
+
+        async def fetch() -> str:
+            await asyncio.sleep(0.01)
+            return "done"
+
+        first = asyncio.create_task(flight.ado("key", fetch))
+        second = asyncio.create_task(flight.ado("key", fetch))
+        await asyncio.sleep(0)
+        first.cancel()
+
+        assert await second == "done"
@@ -0,0 +1,38 @@
+"""Unit tests for the unit of work."""
+
+import pytest
+from sqlalchemy.orm import Session
+
+from app.database import UnitOfWork
+from app.models import UserRole
+from app.repositories import UserRepository
+from tests.conftest import TestingSessionLocal
+
+
+class TestUnitOfWork:
+    """Tests for UnitOfWork."""
+
+    def test_commits_on_success(self, db: Session) -> None:
+        """Test work is visible to other sessions after the unit of work ends."""
+        with UnitOfWork(db):
+            UserRepository(db).create("commit@example.com", "hash", UserRole.USER)
+
+        with TestingSessionLocal() as other:
+            assert UserRepository(other).find_by_email("commit@example.com") is not None
+
+    def test_rolls_back_on_error(self, db: Session) -> None:
+        """Test work is discarded when the unit of work raises."""
+        with pytest.raises(RuntimeError), UnitOfWork(db):
+            UserRepository(db).create("rollback@example.com", "hash", UserRole.USER)
+            raise RuntimeError("boom")
+
+        assert UserRepository(db).find_by_email("rollback@example.com") is None
+
+    def test_nested_units_join_the_outer_one(self, db: Session) -> None:
+        """Test only the outermost unit of work commits."""
+        with pytest.raises(RuntimeError), UnitOfWork(db):
+            with UnitOfWork(db):
+                UserRepository(db).create("nested@example.com", "hash", UserRole.USER)
+            raise RuntimeError("boom")
+
+        assert UserRepository(db).find_by_email("nested@example.com") is None
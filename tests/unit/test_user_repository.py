@@ -0,0 +1,39 @@
+"""Unit tests for user repository."""
+
+from typing import Any
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.models import UserRole
+from app.repositories import UserRepository
+
+
+class TestUserRepository:
+    """Tests for UserRepository."""
+
+    def test_create_returns_row_in_one_statement(self, db: Session) -> None:
+        """Test create reads the new row back with RETURNING instead of a second query."""
+        statements: list[str] = []
+
+        def record(
+            conn: Any,
+            cursor: Any,
+            statement: str,
+            parameters: Any,
+            context: Any,
+            executemany: bool,
+        ) -> None:
+            statements.append(statement)
+
+        engine = db.get_bind()
+        event.listen(engine, "before_cursor_execute", record)
+        try:
+            user = UserRepository(db).create("new@example.com", "hash", UserRole.USER)
+        finally:
+            event.remove(engine, "before_cursor_execute", record)
+
+        assert user["email"] == "new@example.com"
+        assert user["role"] == UserRole.USER
+        assert len(statements) == 1
+        assert "RETURNING" in statements[0]